@@ -0,0 +1,151 @@
+"""Contains the headless game logic of the tic tac toe game, which doesn't depend on the console.
+
+A strategy is any callable with the signature
+strategy(game_field, own_key, opponent_key, starting_key) -> int,
+which returns the field that should be ticked next (or None if there is no move left).
+
+The console game (TicTacToeGame.play_next_round) and the self-play harness both play their
+rounds with play_round; the console game wraps its players as strategies.
+
+This contains the following classes:
+- ComputerStrategy
+- HeuristicStrategy
+- RandomStrategy
+
+And the following global methods:
+- play_round
+
+"""
+
+import random
+from typing import Callable
+
+from mnk_search import IterativeDeepeningSearch
+from opening_book import OpeningBook
+
+
+class ComputerStrategy():
+    """The strategy of the computer player.
+    On the classic game field the turn is looked up in the precomputed opening book,
+    larger game fields are handled by an iterative deepening search.
+    """
+
+    def __init__(self, time_budget: float = 1.0):
+        self.__opening_book = OpeningBook()
+        self.__search = IterativeDeepeningSearch(time_budget=time_budget)
+
+    def __call__(self, game_field, own_key: str, opponent_key: str, starting_key: str) -> int:
+        if not game_field.is_classic():
+            return self.__search.find_best_move(game_field, own_key, opponent_key)
+
+        if starting_key == own_key:
+            first_key, second_key = own_key, opponent_key
+        else:
+            first_key, second_key = opponent_key, own_key
+
+        return self.__opening_book.get_best_move(
+            game_field.get_taken_fields(), first_key, second_key
+        )
+
+
+class HeuristicStrategy():
+    """The rule based heuristic of the original make_next_computer_turn (classic field only):
+    take the middle, answer an edge with a corner, complete an own row, block a row of the
+    opponent, otherwise take the first available field.
+    """
+    ROWS = [
+        [1, 2, 3], [4, 5, 6], [7, 8, 9],
+        [1, 4, 7], [2, 5, 8], [3, 6, 9],
+        [1, 5, 9], [3, 5, 7]
+    ]
+
+    def __call__(self, game_field, own_key: str, opponent_key: str, starting_key: str) -> int:
+        if not game_field.is_classic():
+            raise ValueError("The heuristic only supports the classic game field")
+
+        middle = 5
+        available_fields = game_field.get_available_fields()
+        if not available_fields:
+            return None
+        taken_fields = game_field.get_taken_fields()
+        taken_by_opponent = taken_fields[opponent_key]
+        own_fields = taken_fields[own_key]
+        current_round = (len(taken_by_opponent) + len(own_fields)) // 2
+
+        if current_round == 0:
+            return middle if middle in available_fields else 1
+
+        if current_round == 1 and starting_key == own_key:
+            edges = [1, 3, 7, 9]
+            for current_row in [[1, 2, 3], [7, 8, 9], [1, 4], [3, 6]]:
+                if taken_by_opponent[0] in current_row:
+                    corner = next(
+                        (x for x in current_row if x in edges and x in available_fields), None
+                    )
+                    if corner is not None:
+                        return corner
+                    break
+
+        # take the win first, then defend
+        for fields in [own_fields, taken_by_opponent]:
+            for row in self.ROWS:
+                free_in_row = [x for x in row if x in available_fields]
+                if len(free_in_row) == 1 and sum(x in row for x in fields) == 2:
+                    return free_in_row[0]
+
+        return available_fields[0]
+
+
+class RandomStrategy():
+    """Ticks a random available field."""
+
+    def __init__(self, seed: int = None):
+        self.__random = random.Random(seed)
+
+    def __call__(self, game_field, own_key: str, opponent_key: str, starting_key: str) -> int:
+        available_fields = game_field.get_available_fields()
+        if not available_fields:
+            return None
+        return self.__random.choice(available_fields)
+
+
+def play_round(
+        game_field, strategies: list, keys: list, starting_index: int,
+        on_turn: Callable[[int], None] = None
+    ) -> int:
+    """Plays a complete round between two strategies without any console output.
+
+    Args:
+        game_field (GameField): Game field which is reset before the round starts
+        strategies (list): The strategies of both players
+        keys (list): The marks of both players; usually X and O
+        starting_index (int): Index of the player who makes the first turn
+        on_turn (Callable[[int], None], optional): Called with the field name after every turn,
+        e.g. to render the game field. Defaults to None.
+
+    Raises:
+        ValueError: If a strategy returns a field which can't be ticked
+
+    Returns:
+        int: Index of the player who won the round or None if it's a tie
+    """
+    game_field.reset()
+    current_index = starting_index
+    starting_key = keys[starting_index]
+
+    while not game_field.is_game_finished(keys[0], keys[1]):
+        own_key = keys[current_index]
+        opponent_key = keys[1 - current_index]
+
+        turn = strategies[current_index](game_field, own_key, opponent_key, starting_key)
+        if turn is None or not game_field.try_make_turn(turn, own_key):
+            raise ValueError(f"'{turn}' is not a valid turn for player {own_key}")
+        if on_turn is not None:
+            on_turn(turn)
+
+        current_index = 1 - current_index
+
+    winner = game_field.get_winner()
+    if winner is None:
+        return None
+    return keys.index(winner)
@@ -0,0 +1,294 @@
+"""Contains a networked multiplayer server for the tic tac toe game.
+
+All matches run on a single asyncio event loop. The clients talk newline-delimited JSON over TCP:
+
+client -> server
+- {"type": "join", "name": "Bob"}                   enter the matchmaking queue
+- {"type": "move", "field": 5}                      tick a field
+server -> client
+- {"type": "waiting"}                               waiting for an opponent
+- {"type": "round", "key": "X", "opponent": "Alice", "size": [3, 3, 3], "next": "O"}
+- {"type": "moved", "key": "O", "field": 5, "next": "X"}   ("next" is null after the last turn)
+- {"type": "round_end", "winner": "X", "score": {"Bob": 1, "Alice": 0, "ties": 0}}
+- {"type": "match_end", "score": {...}, "reason": "finished"}
+- {"type": "error", "message": "..."}
+
+After "match_end" the client can send "join" again to play the next match.
+Clients which don't read their messages are dropped, once MAX_WRITE_BUFFER bytes are waiting
+to be sent to them. Lines over 64 KB drop the client as well.
+
+Usage:
+py game_server.py --port 8484 --rounds 3
+
+This contains the following classes:
+- Connection
+- Match
+- GameServer
+
+And the following global Constants:
+- MAX_WRITE_BUFFER
+
+"""
+
+import argparse
+import asyncio
+import json
+
+from hcs_tic_tac_toe_game import GameField, Player, Scoreboard
+
+# bytes which may wait in the transport of a client, e.g. 1 MB are thousands of moves
+MAX_WRITE_BUFFER = 1 << 20
+
+
+class Connection():
+    """Represents a connected client"""
+    __slots__ = ("reader", "writer", "name", "match", "index")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.name = None
+        self.match = None
+        self.index = None
+
+    def send(self, message: dict):
+        """Queues a message for the client; the data is flushed by the event loop.
+        A client which stalls (more than MAX_WRITE_BUFFER bytes are waiting) is dropped.
+
+        Args:
+            message (dict): The message which is sent as a single JSON line
+        """
+        if self.writer.is_closing():
+            return
+        if self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            # the connection is closed without flushing; the reader ends with the disconnect
+            self.writer.transport.abort()
+            return
+        self.writer.write(json.dumps(message).encode() + b"\n")
+
+
+class Match():
+    """Represents a running match between two connections and its state"""
+    __slots__ = ("connections", "players", "scoreboard", "game_field", "current_index", "rounds_left")
+
+    def __init__(self, connections: list, size: tuple, rounds: int):
+        self.connections = connections
+        self.players = [
+            Player(connections[0].name, "X", False),
+            Player(connections[1].name, "O", False)
+        ]
+        self.scoreboard = Scoreboard(self.players[0], self.players[1])
+        self.game_field = GameField(*size)
+        self.current_index = 0
+        self.rounds_left = rounds
+
+        for i, connection in enumerate(connections):
+            connection.match = self
+            connection.index = i
+
+    def start_round(self):
+        """Resets the game field and informs both players about the new round"""
+        self.game_field.reset()
+        self.current_index = self.scoreboard.who_starts()
+        size = [self.game_field.rows, self.game_field.columns, self.game_field.win_length]
+        next_key = self.players[self.current_index].key
+
+        for i, connection in enumerate(self.connections):
+            connection.send({
+                "type": "round",
+                "key": self.players[i].key,
+                "opponent": self.players[1 - i].name,
+                "size": size,
+                "next": next_key
+            })
+
+    def make_turn(self, index: int, field_name) -> bool:
+        """Tries to make the turn of a player and informs both players about the result.
+
+        Args:
+            index (int): Index of the player in this match
+            field_name (int): The field to tick
+
+        Returns:
+            bool: Returns true if the match is finished
+        """
+        player = self.players[index]
+
+        if index != self.current_index:
+            self.connections[index].send({"type": "error", "message": "It's not your turn"})
+            return False
+
+        if (
+                not isinstance(field_name, int) or isinstance(field_name, bool) or
+                not 1 <= field_name <= self.game_field.rows * self.game_field.columns or
+                not self.game_field.try_make_turn(field_name, player.key)
+            ):
+            self.connections[index].send({"type": "error", "message": f"'{field_name}' is not allowed"})
+            return False
+
+        finished = self.game_field.is_game_finished(self.players[0].key, self.players[1].key)
+        self.current_index = 1 - self.current_index
+        message = {
+            "type": "moved",
+            "key": player.key,
+            "field": field_name,
+            "next": None if finished else self.players[self.current_index].key
+        }
+        for connection in self.connections:
+            connection.send(message)
+
+        if not finished:
+            return False
+
+        winner = self.game_field.get_winner()
+        if winner is None:
+            self.scoreboard.increment_ties()
+        else:
+            self.players[0 if winner == self.players[0].key else 1].increment_score()
+
+        message = {"type": "round_end", "winner": winner, "score": self.get_score()}
+        for connection in self.connections:
+            connection.send(message)
+
+        self.rounds_left -= 1
+        if self.rounds_left > 0:
+            self.start_round()
+            return False
+        return True
+
+    def get_score(self) -> dict:
+        """Returns the current score of this match
+
+        Returns:
+            dict: The wins per player name and the amount of ties
+        """
+        return {
+            self.players[0].name: self.players[0].get_score(),
+            self.players[1].name: self.players[1].get_score(),
+            "ties": self.scoreboard.get_ties()
+        }
+
+    def end(self, reason: str):
+        """Informs both players that the match is over and detaches them from it.
+
+        Args:
+            reason (str): Why the match ended
+        """
+        message = {"type": "match_end", "score": self.get_score(), "reason": reason}
+        for connection in self.connections:
+            connection.send(message)
+            connection.match = None
+            connection.index = None
+
+
+class GameServer():
+    """Accepts clients, pairs them in a matchmaking queue and hosts their matches."""
+
+    def __init__(self, size: tuple = (3, 3, 3), rounds: int = 1):
+        self.size = size
+        self.rounds = rounds
+        self.__waiting = None
+        self.__amount_of_matches = 0
+
+    def get_amount_of_matches(self) -> int:
+        """Returns the amount of currently running matches
+
+        Returns:
+            int: running matches
+        """
+        return self.__amount_of_matches
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8484) -> asyncio.AbstractServer:
+        """Starts listening for clients.
+
+        Args:
+            host (str, optional): Address to bind. Defaults to "127.0.0.1".
+            port (int, optional): Port to bind. Defaults to 8484.
+
+        Returns:
+            asyncio.AbstractServer: The running server
+        """
+        return await asyncio.start_server(self.__handle_client, host, port)
+
+    async def __handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = Connection(reader, writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    message = None
+                if not isinstance(message, dict):
+                    connection.send({"type": "error", "message": "Invalid message"})
+                    continue
+                self.__handle_message(connection, message)
+                await writer.drain()
+        except (ConnectionError, ValueError, asyncio.LimitOverrunError):
+            # a lost connection or a line over the limit of the reader (64 KB) drops the client
+            pass
+        finally:
+            self.__handle_disconnect(connection)
+            writer.close()
+
+    def __handle_message(self, connection: Connection, message: dict):
+        message_type = message.get("type")
+
+        if message_type == "join" and connection.match is None:
+            if self.__waiting is connection:
+                return
+            connection.name = str(message.get("name") or "Anonymous")
+            self.__join_queue(connection)
+        elif message_type == "move" and connection.match is not None:
+            match = connection.match
+            if match.make_turn(connection.index, message.get("field")):
+                self.__amount_of_matches -= 1
+                match.end("finished")
+        else:
+            connection.send({"type": "error", "message": "Unexpected message"})
+
+    def __join_queue(self, connection: Connection):
+        opponent = self.__waiting
+        if opponent is None:
+            self.__waiting = connection
+            connection.send({"type": "waiting"})
+            return
+
+        self.__waiting = None
+        if opponent.name == connection.name:
+            connection.name += " (2)"
+
+        self.__amount_of_matches += 1
+        Match([opponent, connection], self.size, self.rounds).start_round()
+
+    def __handle_disconnect(self, connection: Connection):
+        if self.__waiting is connection:
+            self.__waiting = None
+
+        if connection.match is not None:
+            self.__amount_of_matches -= 1
+            connection.match.end("opponent left")
+
+
+async def _serve(host: str, port: int, size: tuple, rounds: int):
+    server = await GameServer(size, rounds).start(host, port)
+    print(f"Listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hosts multiplayer tic tac toe matches")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8484)
+    parser.add_argument("--rounds", type=int, default=1, help="rounds per match")
+    parser.add_argument("--size", type=int, nargs=3, default=[3, 3, 3],
+                        metavar=("ROWS", "COLUMNS", "WIN_LENGTH"))
+    arguments = parser.parse_args()
+
+    try:
+        asyncio.run(_serve(arguments.host, arguments.port, tuple(arguments.size), arguments.rounds))
+    except KeyboardInterrupt:
+        print("Server stopped")
@@ -18,135 +18,225 @@ And the following global methods:
 
 import os
 
+from game_engine import ComputerStrategy, play_round
+from input_provider import ConsoleInputProvider, InputProvider
+from match_history import MatchHistory, RoundRecord
+from renderer import create_renderer
+from replay import ReplayWriter
+
 # HELPER METHODS
 def clear_screen():
     """Empties the console output
     """
     os.system("cls||clear")
 
-def ask_yes_no(question: str) -> bool:
+def ask_yes_no(question: str, provider: InputProvider = None) -> bool:
     """Asks the user for input and handles unexpected input.
 
     Args:
         question (str): Question for the user.
+        provider (InputProvider, optional): Source of the input. Defaults to the console.
 
     Returns:
         bool: returns true if the user accepted, otherwise false.
     """
-    response = input(f"{question}\ny for yes\nn for no\n")
+    if provider is None:
+        provider = ConsoleInputProvider()
 
-    if response.lower() == "n":
-        return False
-    if response.lower() == "y":
-        return True
+    while True:
+        response = provider.read(f"{question}\ny for yes\nn for no\n")
+
+        if response.lower() == "n":
+            return False
+        if response.lower() == "y":
+            return True
 
-    print(f"'{response}' is not a valid input. Try again.\n")
-    return ask_yes_no(question)
+        provider.write(f"'{response}' is not a valid input. Try again.\n")
 
 
-def ask_for_options(question: str, options: dict) -> str:
+def ask_for_options(question: str, options: dict, provider: InputProvider = None) -> str:
     """Asks the user to choose between different options
 
     Args:
         question (str): Question for the user
         options (dict): Allowed input values
+        provider (InputProvider, optional): Source of the input. Defaults to the console.
 
     Returns:
         str: Returns the supplied input
     """
-    print(question)
-    for key, value in options.items():
-        print(f"\t{key} for {value}")
+    if provider is None:
+        provider = ConsoleInputProvider()
 
-    choice = input("Your choice? ")
+    while True:
+        provider.write(question)
+        for key, value in options.items():
+            provider.write(f"\t{key} for {value}")
 
-    if choice in options:
-        return choice
+        choice = provider.read("Your choice? ")
 
-    print(f"'{choice}' is not a valid input. Try again.\n")
-    return ask_for_options(question, options)
+        if choice in options:
+            return choice
 
+        provider.write(f"'{choice}' is not a valid input. Try again.\n")
 
-def ask_for_text(question: str, min_length: int, forbidden_inputs: list = None) -> str:
+
+def ask_for_text(
+        question: str, min_length: int,
+        forbidden_inputs: list = None, provider: InputProvider = None
+    ) -> str:
     """Asks the user to input a string and validates the input against the specified minimum length
 
     Args:
         question (str): Question for the user
         min_length (int): Minimum length of expected inputs
         forbidden_inputs (list, optional): Disallowed inputs. Defaults to None.
+        provider (InputProvider, optional): Source of the input. Defaults to the console.
 
     Returns:
         str: Returns the supplied input
     """
     if forbidden_inputs is None:
         forbidden_inputs = []
+    if provider is None:
+        provider = ConsoleInputProvider()
 
-    response = input(f"{question} (At least {min_length} characters)\n")
-
-    if len(response) < min_length:
-        print(f"'{response}' is too short. Try again.\n")
-        return ask_for_text(question, min_length)
-
-    if response in forbidden_inputs:
-        print(f"'{response}' is not allowed. Try again.\n")
-        return ask_for_text(question, min_length)
+    while True:
+        response = provider.read(f"{question} (At least {min_length} characters)\n")
 
-    return response
+        if len(response) < min_length:
+            provider.write(f"'{response}' is too short. Try again.\n")
+        elif response in forbidden_inputs:
+            provider.write(f"'{response}' is not allowed. Try again.\n")
+        else:
+            return response
 
 
-def ask_for_turn(question: str, allowed_turns: list = None) -> int:
+def ask_for_turn(question: str, allowed_turns: list = None, provider: InputProvider = None) -> int:
     """Asks the user to make a turn and returns the value if the turn is allowed
 
     Args:
         question (str): Question for the user
         allowed_turns (list, optional): A list of the allowed fields for the next turn. 
         Defaults to None.
+        provider (InputProvider, optional): Source of the input. Defaults to the console.
 
     Returns:
         int: Returns the chosen
     """
     if allowed_turns is None:
         allowed_turns = []
+    if provider is None:
+        provider = ConsoleInputProvider()
 
     allowed = ", ".join(str(x) for x in allowed_turns)
 
-    turn = input(f"{question} (Allowed fields: {allowed})\n").strip()
+    while True:
+        turn = provider.read(f"{question} (Allowed fields: {allowed})\n").strip()
 
-    if turn.isdigit() and int(turn) in allowed_turns:
-        return int(turn)
+        if turn.isdigit() and int(turn) in allowed_turns:
+            return int(turn)
 
-    print(f"'{turn}' is not allowed. Try again.\n")
-    return ask_for_turn(question, allowed_turns)
+        provider.write(f"'{turn}' is not allowed. Try again.\n")
 
 
 class TicTacToeGame:
     """Handles the tic tac toe game flow.
     """
 
-    def __init__(self):
+    def __init__(
+            self,
+            computer_strategy=None,
+            match_history: MatchHistory = None,
+            replay_writer: ReplayWriter = None,
+            input_provider: InputProvider = None,
+            renderer=None,
+            keep_history: bool = True
+        ):
+        """Creates the game
+
+        Args:
+            computer_strategy (Callable, optional): Decides the turns of the computer,
+            e.g. mcts.MctsStrategy. Defaults to game_engine.ComputerStrategy.
+            match_history (MatchHistory, optional): Stores the played rounds.
+            Defaults to match_history.db next to this module, which is closed by run().
+            replay_writer (ReplayWriter, optional): Writes the turns of every round
+            to a replay file. Defaults to None.
+            input_provider (InputProvider, optional): Source of the inputs and target
+            of the output. Defaults to the console.
+            renderer (PlainRenderer | AnsiRenderer, optional): Displays the game field.
+            Defaults to renderer.create_renderer for the input provider.
+            keep_history (bool, optional): False plays without a match history (no database
+            and no writer thread), e.g. for scripted or bot sessions. Defaults to True.
+        """
+        if computer_strategy is None:
+            computer_strategy = ComputerStrategy(time_budget=1.0)
+        self.__owns_match_history = match_history is None
+        if match_history is None and keep_history:
+            match_history = MatchHistory()
+        if input_provider is None:
+            input_provider = ConsoleInputProvider()
+        if renderer is None:
+            renderer = create_renderer(input_provider)
+
         self.__player_min_length = 2
         self.__scoreboard = None
         self.__game_field = None
+        self.__computer_strategy = computer_strategy
+        self.__match_history = match_history
+        self.__replay_writer = replay_writer
+        self.__io = input_provider
+        self.__renderer = renderer
+        self.__game_mode = None
         self.player_a = None
         self.player_b = None
 
     def run(self):
-        """Runs the tic tac toe game
+        """Runs the tic tac toe game. The played rounds are written even if the input ends
+        (EOF) or the game is interrupted (Ctrl+C).
         """
-        self.startup_and_configure()
+        try:
+            self.startup_and_configure()
+
+            continue_game = self.__scoreboard is not None
+            while continue_game:
+                self.play_next_round()
+                self.__io.write(self.__scoreboard.get_state())
+
+                if not ask_yes_no("\nDo you want to play another round?", self.__io):
+                    continue_game = False
+
+            if self.__scoreboard is not None and self.__match_history is not None:
+                self.__match_history.flush()
+                self.print_history()
+        finally:
+            if self.__match_history is None:
+                pass
+            elif self.__owns_match_history:
+                # close writes the queued rounds as well
+                self.__match_history.close()
+            else:
+                self.__match_history.flush()
 
-        continue_game = True
-        while continue_game:
-            self.play_next_round()
-            self.__scoreboard.print_state()
+    def print_history(self):
+        """Prints the all-time results of both players from the match history
+        """
+        wins_a, ties, wins_b = self.__match_history.get_head_to_head(
+            self.player_a.name, self.player_b.name
+        )
+        message = f"\nAll-time score of {self.player_a.name} vs {self.player_b.name}: "
+        message += f"{wins_a} : {wins_b} (Ties: {ties})\n"
+        message += "\nAll-time leaderboard:\n"
+        for name, wins, losses, ties in self.__match_history.get_leaderboard(5):
+            message += f"{name}: {wins} wins, {losses} losses, {ties} ties\n"
 
-            if not ask_yes_no("\nDo you want to play another round?"):
-                continue_game = False
+        self.__io.write(message)
 
     def startup_and_configure(self):
         """Startup logic of this game
         1. Greeting
         2. Choose mode (PvP or PvC)
+        3. Choose the size of the game field
         4. Set player name(s)
         5. Initialize components
         """
@@ -156,177 +246,201 @@ class TicTacToeGame:
             "1" : "PvC (Player vs Computer)"
         }
 
-        clear_screen()
-        print("Welcome to the tic tac toe game\n")
-        game_mode_key = ask_for_options("Available game modes:", game_modes)
-
-        player_1_name = ask_for_text(
-            "\nWhat is the name of player 1?",
-            min_length=self.__player_min_length
-        )
-
-        player_2_name = "Computer"
-
-        if game_mode_key == "0":
-            player_2_name = ask_for_text(
-            "\nWhat is the name of player 1?",
-            min_length=self.__player_min_length,
-            forbidden_inputs=[player_1_name]
-        )
-
-        summary = f"\nSummary:\nGame mode: {game_modes[game_mode_key]}\n"
-        summary += f"Player 1: {player_1_name}\n"
-        if game_mode_key == "0":
-            summary += f"Player 2: {player_2_name}\n"
-        summary += "Are those values correct?"
+        field_sizes = {
+            "0" : "3x3 (three in a row)",
+            "1" : "15x15 (five in a row)"
+        }
+        field_dimensions = {
+            "0" : (3, 3, 3),
+            "1" : (15, 15, 5)
+        }
 
-        should_continue = ask_yes_no(summary)
+        while True:
+            self.__io.clear_screen()
+            self.__io.write("Welcome to the tic tac toe game\n")
+            game_mode_key = ask_for_options("Available game modes:", game_modes, self.__io)
+            field_size_key = ask_for_options("\nAvailable game fields:", field_sizes, self.__io)
+
+            player_1_name = ask_for_text(
+                "\nWhat is the name of player 1?",
+                min_length=self.__player_min_length,
+                provider=self.__io
+            )
+
+            player_2_name = "Computer"
+
+            if game_mode_key == "0":
+                player_2_name = ask_for_text(
+                "\nWhat is the name of player 1?",
+                min_length=self.__player_min_length,
+                forbidden_inputs=[player_1_name],
+                provider=self.__io
+            )
+
+            summary = f"\nSummary:\nGame mode: {game_modes[game_mode_key]}\n"
+            summary += f"Game field: {field_sizes[field_size_key]}\n"
+            summary += f"Player 1: {player_1_name}\n"
+            if game_mode_key == "0":
+                summary += f"Player 2: {player_2_name}\n"
+            summary += "Are those values correct?"
+
+            if ask_yes_no(summary, self.__io):
+                break
+
+            if ask_yes_no("Do you want to quit?", self.__io):
+                self.__io.write("Exiting the game")
+                return
 
-        if not should_continue:
-            if ask_yes_no("Do you want to quit?"):
-                print("Exiting the game")
-            else:
-                print("Restarting the game\n\n")
-                self.startup_and_configure()
-            return
+            self.__io.write("Restarting the game\n\n")
 
-        print("\n\nConfiguring game...")
-        print("Creating players...")
+        self.__io.write("\n\nConfiguring game...")
+        self.__io.write("Creating players...")
         self.player_a = Player(player_1_name, "X", False)
         self.player_b = Player(player_2_name, "O", game_mode_key == "1")
+        self.__game_mode = game_modes[game_mode_key]
 
-        print("Creating scoreboard...")
+        self.__io.write("Creating scoreboard...")
         self.__scoreboard = Scoreboard(self.player_a, self.player_b)
 
-        print("Creating game field...")
-        self.__game_field = GameField()
-        print("Finished configuration\n")
+        self.__io.write("Creating game field...")
+        self.__game_field = GameField(*field_dimensions[field_size_key])
+        if self.__replay_writer is not None:
+            self.__replay_writer.attach(self.__game_field)
+        self.__io.write("Finished configuration\n")
 
 
     def play_next_round(self):
         """Handles the current round of the tic tac toe game.
+        The turns are played by game_engine.play_round, like in the self-play harness.
         """
-        self.__game_field.reset()
         players = [self.player_a, self.player_b]
-        current_player_index = self.__scoreboard.who_starts()
-        starting_player_key = players[current_player_index].key
-        clear_screen()
-        self.__game_field.print()
-
-        while not self.__game_field.is_game_finished(self.player_a.key, self.player_b.key):
-            current_player = players[current_player_index]
-            if current_player.is_computer:
-                print(f"It's the turn of {current_player.name}")
-                turn_result = self.make_next_computer_turn("O", "X", starting_player_key)
-            else:
-                turn = ask_for_turn(
-                    f"What is your next move {current_player.name}?",
-                    self.__game_field.get_available_fields()
-                )
-                turn_result =  self.__game_field.try_make_turn(turn, current_player.key)
-
-            if not turn_result:
-                print("There was an error this turn.")
-                print("Ending this round with a tie and starting again.")
-                self.__scoreboard.increment_ties()
-                return
+        starting_index = self.__scoreboard.who_starts()
+        starting_player_key = players[starting_index].key
+        self.__game_field.reset()
+        self.__renderer.draw_field(self.__game_field)
+
+        try:
+            winner_index = play_round(
+                self.__game_field,
+                [self.__create_turn_source(x) for x in players],
+                [x.key for x in players],
+                starting_index,
+                lambda field_name: self.__renderer.update_field(self.__game_field, field_name)
+            )
+        except ValueError:
+            self.__renderer.show_status("There was an error this turn.")
+            self.__io.write("Ending this round with a tie and starting again.")
+            self.__scoreboard.increment_ties()
+            self.__record_round(starting_player_key)
+            return
 
-            clear_screen()
-            self.__game_field.print()
+        if winner_index is None:
+            self.__renderer.show_status("It's a tie. Nobody wins")
+            self.__scoreboard.increment_ties()
+        else:
+            self.__renderer.show_status(f"{players[winner_index].name} won this round!")
+            players[winner_index].increment_score()
+
+        self.__record_round(starting_player_key)
+
+    def __create_turn_source(self, player):
+        """Wraps a player as strategy: the computer uses the computer strategy,
+        a human player is asked for the next turn."""
+        def next_turn(game_field, own_key: str, opponent_key: str, starting_key: str) -> int:
+            self.__renderer.show_status(f"It's the turn of {player.name}")
+            if player.is_computer:
+                return self.__computer_strategy(game_field, own_key, opponent_key, starting_key)
+            return ask_for_turn(
+                f"What is your next move {player.name}?",
+                game_field.get_available_fields(),
+                self.__io
+            )
+        return next_turn
+
+    def __record_round(self, starting_player_key: str):
+        if self.__replay_writer is not None:
+            self.__replay_writer.finish_round(self.__game_field)
+
+        if self.__match_history is None:
+            return
+        self.__match_history.record_round(RoundRecord(
+            self.__game_mode,
+            (self.__game_field.rows, self.__game_field.columns, self.__game_field.win_length),
+            self.player_a.name,
+            self.player_b.name,
+            starting_player_key,
+            self.__game_field.get_winner(),
+            self.__game_field.get_history()
+        ))
 
-            current_player_index = (current_player_index + 1) % 2
 
-        if self.__game_field.check_for_win(self.player_a.key):
-            print(f"{self.player_a.name} won this round!")
-            self.player_a.increment_score()
-        elif self.__game_field.check_for_win(self.player_b.key):
-            print(f"{self.player_b.name} won this round!")
-            self.player_b.increment_score()
-        else:
-            print("It's a tie. Nobody wins")
-            self.__scoreboard.increment_ties()
+class GameField():
+    """Represents the tic tac toe game field and its state.
+    Besides the classic 3x3 field, any field with rows x columns and
+    a custom amount of marks in a row to win (e.g. 15x15 with five in a row) is supported.
+    """
 
+    def __init__(self, rows: int = 3, columns: int = 3, win_length: int = 3):
+        self.rows = rows
+        self.columns = columns
+        self.win_length = win_length
+        self.__fields = {}
+        self.__history = []
+        self.__winner = None
+        self.__turn_listeners = []
 
-    def make_next_computer_turn(self, c_key: str, p_key: str, s_key: str) -> bool:
-        """Checks the game field and decides how the next turn of the computer should be.
+    def add_turn_listener(self, listener):
+        """Registers a listener, which is called with the field name and the value
+        after every turn (e.g. replay.ReplayWriter.record_turn).
+        After undo_turn the listener is called with the value None.
 
         Args:
-            c_key (str): Mark of the computer; usually O
-            p_key (str): Mark of the Player; usually X
-            s_key (str): Mark of the starting player of the current round
-
-        Returns:
-            bool: returns if the turn was successful or not
+            listener (Callable[[int, str], None]): The listener
         """
-        middle = 5
-
-        available_fields = self.__game_field.get_available_fields()
-        taken_fields = self.__game_field.get_taken_fields()
-        taken_by_opponent = taken_fields[p_key]
-        own_fields = taken_fields[c_key]
-
-        amount_of_taken_fields = len(taken_by_opponent) + len(own_fields)
-        current_round = int(amount_of_taken_fields/2)
-
-        if current_round == 0:
-            if middle in available_fields:
-                return self.__game_field.try_make_turn(middle, c_key)
-            else:
-                return self.__game_field.try_make_turn(1, c_key)
+        self.__turn_listeners.append(listener)
 
-        if current_round == 1 and s_key == c_key:
-            rows_to_scan = [[1, 2, 3], [7, 8, 9], [1, 4], [3, 6]]
-            edges = [1, 3, 7, 9]
-
-            for current_row in rows_to_scan:
-                if taken_by_opponent[0] in current_row:
-                    next_turn = [x for x in current_row if x in edges and x in available_fields][0]
-                    return self.__game_field.try_make_turn(next_turn, c_key)
-
-        rows_to_scan = [
-            [1, 2, 3], [4, 5, 6], [7, 8, 9],
-            [1, 4, 7], [2, 5 ,8], [3, 6, 9],
-            [1, 5, 9], [3, 5, 7]
-        ]
-
-        # take win
-        for row in rows_to_scan:
-            ticked_in_row = [x for x in own_fields if x in row]
-            free_in_row = [x for x in row if x in available_fields]
-            if len(ticked_in_row) == 2 and len(free_in_row) == 1:
-                return self.__game_field.try_make_turn(free_in_row[0], c_key)
+    def reset(self):
+        """Resets the game field
+        """
+        self.__fields = {i: i+1 for i in range(self.rows * self.columns)}
+        self.__history = []
+        self.__winner = None
 
-        # defend
-        for row in rows_to_scan:
-            opponent_in_row = [x for x in taken_by_opponent if x in row]
-            free_in_row = [x for x in row if x in available_fields]
-            if len(opponent_in_row) == 2 and len(free_in_row) == 1:
-                return self.__game_field.try_make_turn(free_in_row[0], c_key)
+    def is_classic(self) -> bool:
+        """Checks if this is the classic 3x3 field with three in a row
 
-        # default get random
-        return self.__game_field.try_make_turn(available_fields[0], c_key)
+        Returns:
+            bool: Returns true for the classic tic tac toe field
+        """
+        return self.rows == 3 and self.columns == 3 and self.win_length == 3
 
+    def get_available_fields(self):
+        """Returns all fields which can be checked
+        """
+        return [value for (key, value) in self.__fields.items() if (key + 1) == value]
 
-class GameField():
-    """Represents the tic tac toe game field and its state
-    """
+    def get_field_value(self, field_name: int):
+        """Returns the current value of a field
 
-    def __init__(self):
-        self.__fields = {}
+        Args:
+            field_name (int): The name of the field
 
-    def reset(self):
-        """Resets the game field
+        Returns:
+            int | str: The field name if the field is available, otherwise the mark of the player
         """
-        self.__fields = {i: i+1 for i in range(9)}
+        return self.__fields[field_name - 1]
 
-    def get_available_fields(self):
-        """Returns all fields which can be checked
+    def get_history(self) -> list:
+        """Returns the turns of the current round
+
+        Returns:
+            list: The ticked field names in the order they were ticked
         """
-        return [value for (key, value) in self.__fields.items() if (key + 1) == value]
+        return list(self.__history)
 
     def try_make_turn(self, field_name: int, field_value: str) -> bool:
         """Tries to make a turn.
-        
+        Only the lines through this field are checked for a win.
 
         Args:
             field_name (int): The name of the current field
@@ -338,9 +452,56 @@ class GameField():
         field_id = field_name - 1
         if self.__fields[field_id] == field_name:
             self.__fields[field_id] = field_value
+            self.__history.append(field_name)
+            if self.__is_winning_turn(field_id, field_value):
+                self.__winner = field_value
+            for listener in self.__turn_listeners:
+                listener(field_name, field_value)
             return True
         return False
 
+    def undo_turn(self) -> int:
+        """Reverts the last turn
+
+        Returns:
+            int: The name of the field which was cleared or None if there was no turn
+        """
+        if not self.__history:
+            return None
+
+        field_name = self.__history.pop()
+        self.__fields[field_name - 1] = field_name
+        # the round ends with the first win, so only the last turn can be a winning one
+        self.__winner = None
+        for listener in self.__turn_listeners:
+            listener(field_name, None)
+        return field_name
+
+    def __is_winning_turn(self, field_id: int, player: str) -> bool:
+        row, column = divmod(field_id, self.columns)
+
+        for row_step, column_step in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            in_row = 1 + self.__count_in_direction(row, column, row_step, column_step, player)
+            in_row += self.__count_in_direction(row, column, -row_step, -column_step, player)
+            if in_row >= self.win_length:
+                return True
+
+        return False
+
+    def __count_in_direction(
+            self, row: int, column: int, row_step: int, column_step: int, player: str
+        ) -> int:
+        count = 0
+        for _ in range(self.win_length - 1):
+            row += row_step
+            column += column_step
+            if not (0 <= row < self.rows and 0 <= column < self.columns):
+                break
+            if self.__fields[row * self.columns + column] != player:
+                break
+            count += 1
+        return count
+
     def get_taken_fields(self):
         """Returns all taken fields
 
@@ -356,13 +517,25 @@ class GameField():
     def print(self):
         """prints the current values to the console
         """
-        for row in range(3):
-            i = row * 3
-            print(f" {self.__fields[i]} | {self.__fields[i + 1]} | {self.__fields[i + 2]}")
-            if row < 2:
-                print('-' * (4*3))
+        print(self.format())
+
+    def format(self) -> str:
+        """Formats the current values like they are printed to the console
+
+        Returns:
+            str: The game field
+        """
+        width = len(str(self.rows * self.columns))
+        lines = []
+        for row in range(self.rows):
+            i = row * self.columns
+            cells = [str(self.__fields[i + j]).rjust(width) for j in range(self.columns)]
+            lines.append(" " + " | ".join(cells))
+            if row < self.rows - 1:
+                lines.append('-' * ((width + 3) * self.columns))
             else:
-                print("\n")
+                lines.append("\n")
+        return "\n".join(lines)
 
     def is_game_finished(self, player_a: str, player_b: str) -> bool:
         """Checks if the game is finished.
@@ -375,16 +548,23 @@ class GameField():
         Returns:
             bool: Returns true if the game is finished otherwise false
         """
-        fields_without_values = self.get_available_fields()
-
         # are there remaining turns
-        if len(fields_without_values) == 0:
+        if len(self.__history) == len(self.__fields):
             return True
 
         return self.check_for_win(player_a) or self.check_for_win(player_b)
 
+    def get_winner(self) -> str:
+        """Returns the mark of the player who has won the current round
+
+        Returns:
+            str: Mark of the winner or None if nobody has won (yet)
+        """
+        return self.__winner
+
     def check_for_win(self, player: str) -> bool:
         """Checks if the submitted player has won the game.
+        The result is determined incrementally whenever a turn is made.
 
         Args:
             player (str): Mark of the player to check
@@ -392,41 +572,7 @@ class GameField():
         Returns:
             bool: Returns true if the player has won
         """
-        # check horizontal win
-        for row in range(3):
-            row_start = row * 3
-            if (
-                self.__fields[row_start] == player and
-                self.__fields[row_start + 1] == player and
-                self.__fields[row_start + 2] == player
-                ):
-                return True
-
-        # check vertical win
-        for column in range(3):
-            if (
-                self.__fields[column] == player and
-                self.__fields[column + 3] == player and
-                self.__fields[column + 6] == player
-                ):
-                return True
-
-        # check diagonal wins
-        if (
-            self.__fields[0] == player and
-            self.__fields[4] == player and
-            self.__fields[8] == player
-            ):
-            return True
-
-        if (
-            self.__fields[6] == player and
-            self.__fields[4] == player and
-            self.__fields[2] == player
-            ):
-            return True
-
-        return False
+        return self.__winner == player
 
 class Player():
     """Represents a player of the tic tac toe game
@@ -464,6 +610,14 @@ class Scoreboard():
         """
         self.__amount_of_ties += 1
 
+    def get_ties(self) -> int:
+        """Gets the amount of ties
+
+        Returns:
+            int: Returns amount of ties
+        """
+        return self.__amount_of_ties
+
     def who_starts(self) -> int:
         """Determines which player should start the next game
 
@@ -475,9 +629,17 @@ class Scoreboard():
     def print_state(self):
         """Prints the current score to the console
         """
+        print(self.get_state())
+
+    def get_state(self) -> str:
+        """Formats the current score
+
+        Returns:
+            str: The score of both players and the amount of ties
+        """
         message = "\nCurrent score:\n"
         message += f"{self.player_a.name}: {self.player_a.get_score()}\n"
         message += f"{self.player_b.name}: {self.player_b.get_score()}\n"
         message += f"Ties: {self.__amount_of_ties}\n"
 
-        print(message)
+        return message
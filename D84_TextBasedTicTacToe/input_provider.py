@@ -0,0 +1,142 @@
+"""Contains the input providers of the tic tac toe game,
+which decouple the game from the console (e.g. to replay scripted sessions).
+
+This contains the following classes:
+- InputProvider
+- ConsoleInputProvider
+- ScriptedInputProvider
+- BotInputProvider
+
+"""
+
+import os
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable
+
+
+class InputProvider(ABC):
+    """Base class of all input providers; reads the answers and receives the output of the game."""
+
+    @abstractmethod
+    def read(self, prompt: str) -> str:
+        """Asks for the next input
+
+        Args:
+            prompt (str): Question for the user
+
+        Raises:
+            EOFError: If there is no input left
+
+        Returns:
+            str: The input without the trailing line break
+        """
+
+    @abstractmethod
+    def write(self, text: str):
+        """Shows a message
+
+        Args:
+            text (str): The message
+        """
+
+    def clear_screen(self):
+        """Empties the output; does nothing by default
+        """
+
+    def is_output_kept(self) -> bool:
+        """Returns whether the output is shown or kept, so e.g. a renderer
+        can skip formatting the game field if it's discarded anyway
+
+        Returns:
+            bool: True by default
+        """
+        return True
+
+
+class ConsoleInputProvider(InputProvider):
+    """Interactive input and output using the console."""
+
+    def read(self, prompt: str) -> str:
+        return input(prompt)
+
+    def write(self, text: str):
+        print(text)
+
+    def clear_screen(self):
+        os.system("cls||clear")
+
+
+class ScriptedInputProvider(InputProvider):
+    """Reads the inputs line by line from a script, e.g. a file or a pipe.
+    The output is discarded unless it should be captured."""
+
+    def __init__(self, lines: Iterable[str], capture_output: bool = False):
+        """Creates the provider
+
+        Args:
+            lines (Iterable[str]): The inputs, e.g. a list, an opened file or sys.stdin
+            capture_output (bool, optional): Keeps prompts and messages in output.
+            Defaults to False.
+        """
+        self.__lines = iter(lines)
+        self.__capture_output = capture_output
+        self.output = []
+
+    @classmethod
+    def from_file(cls, path: str, capture_output: bool = False):
+        """Loads a script file, which contains one input per line
+
+        Args:
+            path (str): Path of the script
+            capture_output (bool, optional): Keeps prompts and messages in output.
+            Defaults to False.
+
+        Returns:
+            ScriptedInputProvider: The provider
+        """
+        with open(path, "r", encoding="utf-8") as file:
+            return cls(file.read().splitlines(), capture_output)
+
+    def read(self, prompt: str) -> str:
+        if self.__capture_output:
+            self.output.append(prompt)
+
+        line = next(self.__lines, None)
+        if line is None:
+            raise EOFError("The script has no input left")
+        return line.rstrip("\r\n")
+
+    def write(self, text: str):
+        if self.__capture_output:
+            self.output.append(text)
+
+    def is_output_kept(self) -> bool:
+        return self.__capture_output
+
+
+class BotInputProvider(InputProvider):
+    """Answers every prompt with a callback, e.g. to fuzz the game."""
+
+    def __init__(self, answer: Callable[[str], str], capture_output: bool = False):
+        """Creates the provider
+
+        Args:
+            answer (Callable[[str], str]): Returns the input for a prompt
+            capture_output (bool, optional): Keeps prompts and messages in output.
+            Defaults to False.
+        """
+        self.__answer = answer
+        self.__capture_output = capture_output
+        self.output = []
+
+    def read(self, prompt: str) -> str:
+        if self.__capture_output:
+            self.output.append(prompt)
+        return self.__answer(prompt)
+
+    def write(self, text: str):
+        if self.__capture_output:
+            self.output.append(text)
+
+    def is_output_kept(self) -> bool:
+        return self.__capture_output
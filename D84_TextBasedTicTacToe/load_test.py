@@ -0,0 +1,140 @@
+"""Load test for the multiplayer server, which plays many bot matches over local loopback.
+
+Each bot joins the matchmaking queue, ticks random available fields and measures the latency
+between sending a move and receiving its confirmation. All bots play their matches in waves,
+so every bot of a wave finds an opponent. The result contains the moves per second
+and the p50/p99 move latency.
+
+Usage:
+py load_test.py --bots 2000 --matches 5
+(starts its own server; use --port to test an already running server)
+
+This contains the following global methods:
+- run_bot
+- run_load_test
+
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from game_server import GameServer
+
+
+async def run_bot(name: str, host: str, port: int, latencies: list):
+    """Connects a bot which plays one match with random moves.
+
+    Args:
+        name (str): Name of the bot
+        host (str): Address of the server
+        port (int): Port of the server
+        latencies (list): Receives the latency of every own move in seconds
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = random.Random(name)
+    key = None
+    available_fields = []
+    sent_at = None
+
+    def send(message: dict):
+        writer.write(json.dumps(message).encode() + b"\n")
+
+    try:
+        send({"type": "join", "name": name})
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            message = json.loads(line)
+            message_type = message["type"]
+
+            if message_type == "round":
+                key = message["key"]
+                rows, columns, _ = message["size"]
+                available_fields = list(range(1, rows * columns + 1))
+            elif message_type == "moved":
+                available_fields.remove(message["field"])
+                if message["key"] == key and sent_at is not None:
+                    latencies.append(time.perf_counter() - sent_at)
+                    sent_at = None
+            elif message_type == "match_end":
+                return
+            elif message_type == "error":
+                raise RuntimeError(message["message"])
+
+            if message_type in ("round", "moved") and message["next"] == key:
+                sent_at = time.perf_counter()
+                send({"type": "move", "field": rng.choice(available_fields)})
+    finally:
+        writer.close()
+
+
+async def run_load_test(
+        bots: int, matches: int, host: str, port: int, start_server: bool, rounds: int
+    ) -> tuple:
+    """Plays the bot matches and measures the duration.
+
+    Args:
+        bots (int): Amount of concurrent bots; two bots play one match
+        matches (int): Matches per bot, which are played in waves
+        host (str): Address of the server
+        port (int): Port of the server
+        start_server (bool): Starts a server in this process, otherwise an existing one is used
+        rounds (int): Rounds per match of the own server
+
+    Returns:
+        tuple: The latencies of all moves and the duration in seconds
+    """
+    if bots % 2 != 0:
+        raise ValueError("The amount of bots has to be even")
+
+    server = None
+    if start_server:
+        server = await GameServer(rounds=rounds).start(host, port)
+
+    latencies = []
+    try:
+        start = time.perf_counter()
+        for _ in range(matches):
+            await asyncio.gather(*(
+                run_bot(f"Bot {i}", host, port, latencies) for i in range(bots)
+            ))
+        duration = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+    return latencies, duration
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plays bot matches against the game server")
+    parser.add_argument("--bots", type=int, default=1000, help="concurrent bots (even number)")
+    parser.add_argument("--matches", type=int, default=5, help="matches per bot")
+    parser.add_argument("--rounds", type=int, default=3, help="rounds per match of the own server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="port of an already running server")
+    arguments = parser.parse_args()
+
+    move_latencies, total_duration = asyncio.run(run_load_test(
+        arguments.bots,
+        arguments.matches,
+        arguments.host,
+        8485 if arguments.port is None else arguments.port,
+        arguments.port is None,
+        arguments.rounds
+    ))
+
+    move_latencies.sort()
+    amount_of_moves = len(move_latencies)
+    print(f"{amount_of_moves} moves in {total_duration:.2f} seconds")
+    print(f"{amount_of_moves / total_duration:.0f} moves per second")
+    if amount_of_moves:
+        p50 = move_latencies[amount_of_moves // 2] * 1000
+        p99 = move_latencies[min(amount_of_moves - 1, amount_of_moves * 99 // 100)] * 1000
+        print(f"Move latency: p50 {p50:.2f} ms, p99 {p99:.2f} ms")
@@ -1,7 +1,25 @@
 """Simple module which executes the tic tac toe game.
+
+Use --script to replay the inputs of a session from a file (one input per line)
+or - to read them from a pipe.
 """
 
+import argparse
+import sys
+
 from hcs_tic_tac_toe_game import TicTacToeGame
+from input_provider import ConsoleInputProvider, ScriptedInputProvider
+
+PARSER = argparse.ArgumentParser(description="Text based tic tac toe game")
+PARSER.add_argument("--script", default=None, help="file with the inputs of a session or -")
+ARGUMENTS = PARSER.parse_args()
+
+if ARGUMENTS.script is None:
+    PROVIDER = ConsoleInputProvider()
+elif ARGUMENTS.script == "-":
+    PROVIDER = ScriptedInputProvider(sys.stdin)
+else:
+    PROVIDER = ScriptedInputProvider.from_file(ARGUMENTS.script)
 
-GAME = TicTacToeGame()
+GAME = TicTacToeGame(input_provider=PROVIDER)
 GAME.run()
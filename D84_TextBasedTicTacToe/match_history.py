@@ -0,0 +1,291 @@
+"""Contains the persistent match history of the tic tac toe game, which is stored in SQLite.
+
+Recording a round only puts it into a queue. A background thread writes the queued
+rounds in batches (one transaction per batch), so recording never blocks a turn.
+Besides the rounds, the wins, losses and ties per player are aggregated while writing,
+so the leaderboard doesn't need to scan the recorded rounds.
+
+This contains the following classes:
+- RoundRecord
+- MatchHistory
+
+"""
+
+import array
+import datetime as dt
+import os.path
+import queue
+import sqlite3
+import threading
+
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "match_history.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    ties INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY,
+    played_at TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    columns INTEGER NOT NULL,
+    win_length INTEGER NOT NULL,
+    player_x INTEGER NOT NULL REFERENCES players(id),
+    player_o INTEGER NOT NULL REFERENCES players(id),
+    starting_key TEXT NOT NULL,
+    winner_key TEXT,
+    moves BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_players_wins ON players (wins DESC, ties DESC);
+CREATE INDEX IF NOT EXISTS ix_rounds_players ON rounds (player_x, player_o, winner_key);
+CREATE INDEX IF NOT EXISTS ix_rounds_player_o ON rounds (player_o);
+"""
+
+
+class RoundRecord():
+    """Data model of a finished round"""
+    __slots__ = (
+        "played_at", "mode", "size", "player_x", "player_o", "starting_key", "winner_key", "moves"
+    )
+
+    def __init__(
+            self,
+            mode: str, size: tuple,
+            player_x: str, player_o: str,
+            starting_key: str, winner_key: str,
+            moves: list, played_at: str = None
+        ):
+        self.played_at = played_at or dt.datetime.now().isoformat(timespec="seconds")
+        self.mode = mode
+        self.size = size
+        self.player_x = player_x
+        self.player_o = player_o
+        self.starting_key = starting_key
+        self.winner_key = winner_key
+        self.moves = moves
+
+
+def _pack_moves(moves: list) -> bytes:
+    return array.array("H", moves).tobytes()
+
+
+def _unpack_moves(data: bytes) -> list:
+    moves = array.array("H")
+    moves.frombytes(data)
+    return moves.tolist()
+
+
+class MatchHistory():
+    """Stores the played rounds in a SQLite database using a write-behind buffer."""
+
+    def __init__(self, path: str = HISTORY_FILE, batch_size: int = 500):
+        self.path = path
+        self.batch_size = batch_size
+        self.__queue = queue.Queue()
+        self.__closed = False
+
+        connection = self.__connect()
+        connection.executescript(_SCHEMA)
+        connection.close()
+
+        self.__reader = None
+        self.__writer = threading.Thread(target=self.__write_rounds, daemon=True)
+        self.__writer.start()
+
+    def __connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        # readers don't block the writer thread and the other way around
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def record_round(self, record: RoundRecord):
+        """Queues a finished round; it's written by the background thread.
+
+        Args:
+            record (RoundRecord): The finished round
+        """
+        if self.__closed:
+            raise ValueError("The match history is already closed")
+        self.__queue.put(record)
+
+    def flush(self):
+        """Waits until all queued rounds are written"""
+        self.__queue.join()
+
+    def close(self):
+        """Writes the remaining rounds and stops the background thread"""
+        if self.__closed:
+            return
+        self.__closed = True
+        self.__queue.put(None)
+        self.__writer.join()
+
+        if self.__reader is not None:
+            self.__reader.close()
+            self.__reader = None
+
+    def __write_rounds(self):
+        connection = self.__connect()
+        player_ids = {}
+        running = True
+
+        while running:
+            batch = [self.__queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if batch[-1] is None:
+                running = False
+            records = [x for x in batch if x is not None]
+
+            try:
+                if records:
+                    with connection:
+                        self.__insert_rounds(connection, records, player_ids)
+            except sqlite3.Error as error:
+                # a failed batch is rolled back, but must not stop the writer
+                player_ids.clear()
+                print(f"Could not save {len(records)} rounds to the match history: {error}")
+            finally:
+                for _ in batch:
+                    self.__queue.task_done()
+
+        connection.close()
+
+    def __insert_rounds(self, connection: sqlite3.Connection, records: list, player_ids: dict):
+        for record in records:
+            for name in (record.player_x, record.player_o):
+                if name not in player_ids:
+                    connection.execute(
+                        "INSERT OR IGNORE INTO players (name) VALUES (?)", (name,)
+                    )
+                    player_ids[name] = connection.execute(
+                        "SELECT id FROM players WHERE name = ?", (name,)
+                    ).fetchone()[0]
+
+        connection.executemany(
+            "INSERT INTO rounds (played_at, mode, rows, columns, win_length, player_x, player_o, "
+            "starting_key, winner_key, moves) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    x.played_at, x.mode, *x.size,
+                    player_ids[x.player_x], player_ids[x.player_o],
+                    x.starting_key, x.winner_key, _pack_moves(x.moves)
+                )
+                for x in records
+            ]
+        )
+
+        statistics = {}
+        for record in records:
+            for key, name in (("X", record.player_x), ("O", record.player_o)):
+                counts = statistics.setdefault(player_ids[name], [0, 0, 0])
+                if record.winner_key is None:
+                    counts[2] += 1
+                elif record.winner_key == key:
+                    counts[0] += 1
+                else:
+                    counts[1] += 1
+
+        connection.executemany(
+            "UPDATE players SET wins = wins + ?, losses = losses + ?, ties = ties + ? WHERE id = ?",
+            [(*counts, player_id) for player_id, counts in statistics.items()]
+        )
+
+    def __get_reader(self) -> sqlite3.Connection:
+        if self.__reader is None:
+            self.__reader = self.__connect()
+        return self.__reader
+
+    def get_leaderboard(self, limit: int = 5) -> list:
+        """Returns the players with the most wins of all written rounds.
+
+        Args:
+            limit (int, optional): Amount of players. Defaults to 5.
+
+        Returns:
+            list: Tuples of name, wins, losses and ties
+        """
+        return self.__get_reader().execute(
+            "SELECT name, wins, losses, ties FROM players ORDER BY wins DESC, ties DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+
+    def get_head_to_head(self, player_a: str, player_b: str) -> tuple:
+        """Counts the results of all written rounds between two players.
+
+        Args:
+            player_a (str): Name of the first player
+            player_b (str): Name of the second player
+
+        Returns:
+            tuple: Wins of player a, ties and wins of player b
+        """
+        rows = self.__get_reader().execute(
+            """
+            SELECT
+                CASE WHEN r.winner_key IS NULL THEN 1
+                     WHEN (r.winner_key = 'X') = (r.player_x = a.id) THEN 0
+                     ELSE 2 END AS result,
+                COUNT(*)
+            FROM players a, players b, rounds r
+            WHERE a.name = ? AND b.name = ? AND (
+                (r.player_x = a.id AND r.player_o = b.id) OR
+                (r.player_x = b.id AND r.player_o = a.id)
+            )
+            GROUP BY result
+            """,
+            (player_a, player_b)
+        ).fetchall()
+
+        result = [0, 0, 0]
+        for index, count in rows:
+            result[index] = count
+        return tuple(result)
+
+    def get_rounds(self, player: str, limit: int = 10) -> list:
+        """Returns the latest written rounds of a player.
+
+        Args:
+            player (str): Name of the player
+            limit (int, optional): Amount of rounds. Defaults to 10.
+
+        Returns:
+            list[RoundRecord]: The latest rounds, newest first
+        """
+        rows = self.__get_reader().execute(
+            """
+            SELECT r.played_at, r.mode, r.rows, r.columns, r.win_length,
+                   px.name, po.name, r.starting_key, r.winner_key, r.moves
+            FROM rounds r
+            JOIN players px ON px.id = r.player_x
+            JOIN players po ON po.id = r.player_o
+            WHERE r.id IN (
+                SELECT id FROM rounds WHERE player_x = (SELECT id FROM players WHERE name = ?1)
+                UNION ALL
+                SELECT id FROM rounds WHERE player_o = (SELECT id FROM players WHERE name = ?1)
+            )
+            ORDER BY r.id DESC LIMIT ?2
+            """,
+            (player, limit)
+        ).fetchall()
+
+        return [
+            RoundRecord(
+                mode, (rows, columns, win_length), player_x, player_o,
+                starting_key, winner_key, _unpack_moves(moves), played_at
+            )
+            for (
+                played_at, mode, rows, columns, win_length,
+                player_x, player_o, starting_key, winner_key, moves
+            ) in rows
+        ]
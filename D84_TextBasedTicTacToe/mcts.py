@@ -0,0 +1,316 @@
+"""Contains a Monte Carlo tree search player, which is an alternative to the computer strategy
+and remains usable on large game fields where an exact search isn't feasible.
+
+The tree is kept in the main process, while the random rollouts of the selected leaves
+are played in batches on a process pool. Between two turns the subtree of the
+moves which were made in the meantime is reused.
+
+Usage of the benchmark:
+py mcts.py --field 15x15 --seconds 5 --processes 4
+
+This contains the following classes:
+- MctsStrategy
+
+And the following global methods:
+- play_rollouts
+
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import time
+
+from hcs_tic_tac_toe_game import GameField
+
+_worker_fields = {}
+
+
+class _Node():
+    """A node of the search tree, which represents the position after its move."""
+    __slots__ = ("move", "mover", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(self, move: int, mover: str, parent, untried: list):
+        self.move = move
+        self.mover = mover
+        self.parent = parent
+        self.children = {}
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+
+
+def play_rollouts(jobs: list) -> list:
+    """Plays random games from the submitted positions; used as worker of the process pool.
+
+    Args:
+        jobs (list): Tuples of field dimensions, keys (starting player first), history and seed
+
+    Returns:
+        list: The winning key (or None for a tie) per job
+    """
+    results = []
+
+    for dimensions, keys, history, seed in jobs:
+        game_field = _worker_fields.get(dimensions)
+        if game_field is None:
+            game_field = GameField(*dimensions)
+            _worker_fields[dimensions] = game_field
+
+        game_field.reset()
+        for i, field_name in enumerate(history):
+            game_field.try_make_turn(field_name, keys[i % 2])
+
+        # ticking the shuffled fields in order is the same as choosing random fields
+        available_fields = game_field.get_available_fields()
+        random.Random(seed).shuffle(available_fields)
+
+        current_index = len(history) % 2
+        for field_name in available_fields:
+            if game_field.get_winner() is not None:
+                break
+            game_field.try_make_turn(field_name, keys[current_index])
+            current_index = 1 - current_index
+
+        results.append(game_field.get_winner())
+
+    return results
+
+
+class MctsStrategy():
+    """Monte Carlo tree search strategy with parallel rollouts.
+    The search stops after the time budget or the amount of iterations, whichever comes first.
+    """
+
+    def __init__(
+            self,
+            time_budget: float = 1.0,
+            iterations: int = None,
+            processes: int = 1,
+            batch_size: int = 64,
+            exploration: float = 1.4,
+            neighbourhood: int = 1,
+            seed: int = None
+        ):
+        self.time_budget = time_budget
+        self.iterations = iterations
+        self.processes = processes or os.cpu_count()
+        self.batch_size = batch_size
+        self.exploration = exploration
+        self.neighbourhood = neighbourhood
+        self.last_rollouts = 0
+        self.__random = random.Random(seed)
+        self.__pool = None
+        self.__root = None
+        self.__root_history = []
+        self.__dimensions = None
+
+    def __call__(self, game_field, own_key: str, opponent_key: str, starting_key: str) -> int:
+        if game_field.get_winner() is not None or not game_field.get_available_fields():
+            return None
+
+        history = game_field.get_history()
+        keys = [starting_key, opponent_key if starting_key == own_key else own_key]
+        self.__reuse_tree(game_field, history, keys)
+
+        deadline = time.monotonic() + self.time_budget
+        rollouts = 0
+        while time.monotonic() < deadline:
+            if self.iterations is not None and rollouts >= self.iterations:
+                break
+            amount = self.batch_size
+            if self.iterations is not None:
+                amount = min(amount, self.iterations - rollouts)
+            rollouts += self.__run_batch(game_field, keys, amount)
+
+        self.last_rollouts = rollouts
+
+        best_child = max(self.__root.children.values(), key=lambda x: x.visits, default=None)
+        if best_child is None:
+            return self.__root.untried[0]
+
+        self.__set_root(best_child, history + [best_child.move])
+        return best_child.move
+
+    def close(self):
+        """Stops the worker processes"""
+        if self.__pool is not None:
+            self.__pool.close()
+            self.__pool.join()
+            self.__pool = None
+
+    def __reuse_tree(self, game_field, history: list, keys: list):
+        dimensions = (game_field.rows, game_field.columns, game_field.win_length)
+        root = self.__root
+        known_history = self.__root_history
+
+        if (
+                root is None or
+                dimensions != self.__dimensions or
+                history[:len(known_history)] != known_history
+            ):
+            root = None
+        else:
+            for field_name in history[len(known_history):]:
+                root = root.children.get(field_name)
+                if root is None:
+                    break
+
+        if root is None:
+            mover = keys[(len(history) - 1) % 2] if history else None
+            root = _Node(history[-1] if history else None, mover, None, [])
+            root.untried = self.__get_moves(game_field)
+
+        self.__dimensions = dimensions
+        self.__set_root(root, history)
+
+    def __set_root(self, root: _Node, history: list):
+        root.parent = None
+        self.__root = root
+        self.__root_history = history
+
+    def __get_moves(self, game_field) -> list:
+        if game_field.get_winner() is not None:
+            return []
+
+        available_fields = game_field.get_available_fields()
+        history = game_field.get_history()
+        if game_field.rows * game_field.columns <= 25 or not history:
+            moves = available_fields
+        else:
+            moves = self.__get_neighbouring_fields(game_field, history)
+
+        self.__random.shuffle(moves)
+        return moves
+
+    def __get_neighbouring_fields(self, game_field, history: list) -> list:
+        distance = self.neighbourhood
+        moves = set()
+
+        for field_name in history:
+            row, column = divmod(field_name - 1, game_field.columns)
+            for next_row in range(max(0, row - distance), min(game_field.rows, row + distance + 1)):
+                for next_column in range(
+                        max(0, column - distance),
+                        min(game_field.columns, column + distance + 1)
+                    ):
+                    next_field = next_row * game_field.columns + next_column + 1
+                    if game_field.get_field_value(next_field) == next_field:
+                        moves.add(next_field)
+
+        return list(moves)
+
+    def __run_batch(self, game_field, keys: list, amount: int) -> int:
+        dimensions = (game_field.rows, game_field.columns, game_field.win_length)
+        leaves = []
+        jobs = []
+
+        for _ in range(amount):
+            leaf, winner, finished, path = self.__select_and_expand(game_field, keys)
+            if finished:
+                self.__backpropagate(leaf, winner)
+            else:
+                leaves.append(leaf)
+                jobs.append((dimensions, keys, path, self.__random.getrandbits(32)))
+
+        if jobs:
+            for leaf, winner in zip(leaves, self.__play_rollouts(jobs)):
+                self.__backpropagate(leaf, winner)
+
+        return amount
+
+    def __select_and_expand(self, game_field, keys: list):
+        node = self.__root
+        node.visits += 1
+        made_turns = 0
+        start_index = len(game_field.get_history())
+
+        try:
+            # selection; the visits are counted on the way down as virtual loss,
+            # so the leaves of one batch differ from each other
+            while not node.untried and node.children:
+                node = self.__select_child(node)
+                node.visits += 1
+                game_field.try_make_turn(node.move, node.mover)
+                made_turns += 1
+
+            # expansion
+            if node.untried and game_field.get_winner() is None:
+                move = node.untried.pop()
+                mover = keys[(start_index + made_turns) % 2]
+                game_field.try_make_turn(move, mover)
+                made_turns += 1
+
+                child = _Node(move, mover, node, [])
+                child.untried = self.__get_moves(game_field)
+                node.children[move] = child
+                node = child
+                node.visits += 1
+
+            winner = game_field.get_winner()
+            finished = winner is not None or not game_field.get_available_fields()
+            return node, winner, finished, game_field.get_history()
+        finally:
+            for _ in range(made_turns):
+                game_field.undo_turn()
+
+    def __select_child(self, node: _Node) -> _Node:
+        log_visits = math.log(node.visits)
+        return max(
+            node.children.values(),
+            key=lambda x: x.wins / x.visits + self.exploration * math.sqrt(log_visits / x.visits)
+        )
+
+    def __backpropagate(self, node: _Node, winner: str):
+        while node is not None:
+            if winner is None:
+                node.wins += 0.5
+            elif winner == node.mover:
+                node.wins += 1
+            node = node.parent
+
+    def __play_rollouts(self, jobs: list) -> list:
+        if self.processes <= 1:
+            return play_rollouts(jobs)
+
+        if self.__pool is None:
+            self.__pool = multiprocessing.Pool(self.processes)
+
+        chunk_size = math.ceil(len(jobs) / self.processes)
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+        results = []
+        for chunk_result in self.__pool.map(play_rollouts, chunks):
+            results.extend(chunk_result)
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures the rollouts per second of MctsStrategy")
+    parser.add_argument("--field", choices=["3x3", "15x15"], default="15x15")
+    parser.add_argument("--seconds", type=float, default=5.0, help="time budget of the search")
+    parser.add_argument("--processes", type=int, default=None, help="defaults to the cpu count")
+    parser.add_argument("--batch-size", type=int, default=256, help="rollouts per batch")
+    arguments = parser.parse_args()
+
+    benchmark_field = GameField(*{"3x3": (3, 3, 3), "15x15": (15, 15, 5)}[arguments.field])
+    benchmark_field.reset()
+    benchmark_field.try_make_turn(benchmark_field.rows * benchmark_field.columns // 2 + 1, "X")
+
+    strategy = MctsStrategy(
+        time_budget=arguments.seconds,
+        processes=arguments.processes,
+        batch_size=arguments.batch_size
+    )
+    try:
+        benchmark_start = time.perf_counter()
+        strategy(benchmark_field, "O", "X", "X")
+        benchmark_duration = time.perf_counter() - benchmark_start
+    finally:
+        strategy.close()
+
+    rollouts_per_second = strategy.last_rollouts / benchmark_duration
+    print(f"{strategy.last_rollouts} rollouts in {benchmark_duration:.2f} seconds")
+    print(f"{rollouts_per_second:.0f} rollouts per second")
+    print(f"{rollouts_per_second / strategy.processes:.0f} rollouts per second and core")
@@ -0,0 +1,218 @@
+"""Contains the computer player for generalized game fields (e.g. 15x15 with five in a row),
+where the opening book of the classic game can't be used.
+
+This contains the following classes:
+- IterativeDeepeningSearch
+
+"""
+
+import time
+
+WIN_SCORE = 1_000_000
+
+_DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class _SearchTimeout(Exception):
+    """Raised internally when the time budget of a search is exceeded."""
+
+
+class IterativeDeepeningSearch():
+    """Negamax search with alpha-beta pruning, which is repeated with increasing depth
+    until the time budget is used up. Candidate moves are limited to fields next to
+    existing marks and are ordered by rating the lines through each field.
+    """
+
+    def __init__(
+            self,
+            time_budget: float = 1.0,
+            max_depth: int = 9,
+            max_candidates: int = 10,
+            neighbourhood: int = 1
+        ):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.max_candidates = max_candidates
+        self.neighbourhood = neighbourhood
+        self.last_depth = 0
+        self.last_nodes = 0
+        self.__deadline = 0
+        self.__cells = []
+        self.__rows = 0
+        self.__columns = 0
+        self.__win_length = 0
+
+    def find_best_move(self, game_field, own_key: str, opponent_key: str) -> int:
+        """Searches the best move for the player to move.
+        The result of the deepest completed iteration is returned.
+
+        Args:
+            game_field (GameField): Current game field, which is restored after the search
+            own_key (str): Mark of the player to move
+            opponent_key (str): Mark of the opponent
+
+        Returns:
+            int: The field which should be ticked next or None if there is no move left
+        """
+        self.__deadline = time.monotonic() + self.time_budget
+        self.__rows = game_field.rows
+        self.__columns = game_field.columns
+        self.__win_length = game_field.win_length
+        self.__cells = [
+            game_field.get_field_value(i + 1) for i in range(self.__rows * self.__columns)
+        ]
+        self.last_depth = 0
+        self.last_nodes = 0
+
+        candidates = self.__get_ordered_candidates(game_field, own_key, opponent_key)
+        if not candidates:
+            return None
+
+        best_move = candidates[0]
+        remaining_turns = len(game_field.get_available_fields())
+
+        for depth in range(1, min(self.max_depth, remaining_turns) + 1):
+            try:
+                score, move = self.__search_root(game_field, candidates, depth, own_key, opponent_key)
+            except _SearchTimeout:
+                break
+
+            best_move = move
+            self.last_depth = depth
+
+            # search the best move of this iteration first in the next one
+            candidates.remove(move)
+            candidates.insert(0, move)
+
+            if abs(score) >= WIN_SCORE - self.max_depth:
+                break
+
+        return best_move
+
+    def __search_root(self, game_field, candidates: list, depth: int, own: str, opponent: str):
+        alpha = -WIN_SCORE - 1
+        best_move = candidates[0]
+
+        for move in candidates:
+            score = -self.__search_child(game_field, move, depth, -WIN_SCORE - 1, -alpha, own, opponent, 1)
+            if score > alpha:
+                alpha = score
+                best_move = move
+
+        return alpha, best_move
+
+    def __search_child(
+            self, game_field, move: int, depth: int,
+            alpha: int, beta: int, mover: str, other: str, ply: int
+        ) -> int:
+        game_field.try_make_turn(move, mover)
+        self.__cells[move - 1] = mover
+        try:
+            return self.__negamax(game_field, depth - 1, alpha, beta, other, mover, ply)
+        finally:
+            game_field.undo_turn()
+            self.__cells[move - 1] = move
+
+    def __negamax(
+            self, game_field, depth: int,
+            alpha: int, beta: int, mover: str, other: str, ply: int
+        ) -> int:
+        self.last_nodes += 1
+        if time.monotonic() > self.__deadline:
+            raise _SearchTimeout()
+
+        if game_field.get_winner() is not None:
+            # the previous turn has won the game, faster wins score higher
+            return -(WIN_SCORE - ply)
+
+        candidates = self.__get_ordered_candidates(game_field, mover, other)
+        if not candidates:
+            return 0
+
+        if depth == 0:
+            return self.__evaluate(candidates, mover, other)
+
+        for move in candidates[:self.max_candidates]:
+            score = -self.__search_child(game_field, move, depth, -beta, -alpha, mover, other, ply + 1)
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+
+        return alpha
+
+    def __evaluate(self, candidates: list, mover: str, other: str) -> int:
+        best_own = max(self.__rate_field(move, mover) for move in candidates)
+        best_other = max(self.__rate_field(move, other) for move in candidates)
+        return best_own - best_other
+
+    def __get_ordered_candidates(self, game_field, mover: str, other: str) -> list:
+        history = game_field.get_history()
+        area = self.__rows * self.__columns
+
+        if len(history) == area:
+            return []
+
+        if not history:
+            return [(self.__rows // 2) * self.__columns + self.__columns // 2 + 1]
+
+        if area <= 25:
+            candidates = game_field.get_available_fields()
+        else:
+            candidates = self.__get_neighbouring_fields(history)
+
+        ratings = {
+            move: self.__rate_field(move, mover) + self.__rate_field(move, other) * 9 // 10
+            for move in candidates
+        }
+        return sorted(candidates, key=ratings.get, reverse=True)
+
+    def __get_neighbouring_fields(self, history: list) -> list:
+        distance = self.neighbourhood
+        candidates = set()
+
+        for field_name in history:
+            row, column = divmod(field_name - 1, self.__columns)
+            for next_row in range(max(0, row - distance), min(self.__rows, row + distance + 1)):
+                for next_column in range(
+                        max(0, column - distance),
+                        min(self.__columns, column + distance + 1)
+                    ):
+                    next_field = next_row * self.__columns + next_column + 1
+                    if self.__cells[next_field - 1] == next_field:
+                        candidates.add(next_field)
+
+        return list(candidates)
+
+    def __rate_field(self, field_name: int, player: str) -> int:
+        """Rates how valuable the field would be for the player,
+        based on the longest lines and their open ends through the field."""
+        row, column = divmod(field_name - 1, self.__columns)
+        rating = 0
+
+        for row_step, column_step in _DIRECTIONS:
+            length = 1
+            open_ends = 0
+            for step in (1, -1):
+                next_row = row + row_step * step
+                next_column = column + column_step * step
+                while (
+                        0 <= next_row < self.__rows and
+                        0 <= next_column < self.__columns and
+                        self.__cells[next_row * self.__columns + next_column] == player
+                    ):
+                    length += 1
+                    next_row += row_step * step
+                    next_column += column_step * step
+
+                if 0 <= next_row < self.__rows and 0 <= next_column < self.__columns:
+                    next_value = self.__cells[next_row * self.__columns + next_column]
+                    if next_value == next_row * self.__columns + next_column + 1:
+                        open_ends += 1
+
+            if length >= self.__win_length:
+                rating += WIN_SCORE // 10
+            elif open_ends > 0:
+                rating += 10 ** length * open_ends
+
+        return rating
@@ -0,0 +1,294 @@
+"""Contains the precomputed opening book of the tic tac toe game.
+
+The book stores the best move and the game-theoretic value for every legal
+position in a compact binary table. Each position is encoded as a base-3
+number over the nine fields (0 = free, 1 = starting player, 2 = other player),
+which is used as the offset of a single byte:
+- bits 0-3: best move (field name 1-9, 0 if the game is already finished)
+- bits 4-5: value for the player to move (0 = no legal position, 1 = loss, 2 = tie, 3 = win)
+
+This contains the following classes:
+- OpeningBook
+
+And the following global methods:
+- position_index
+- minimax
+- build_opening_book
+- verify_opening_book
+
+Run this module to (re)build the book file or to verify it:
+py opening_book.py [--verify]
+
+"""
+
+import argparse
+import mmap
+import os.path
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+BOOK_SIZE = 3 ** 9
+
+VALUE_NONE = 0
+VALUE_LOSS = 1
+VALUE_TIE = 2
+VALUE_WIN = 3
+
+# preferred order if several moves lead to the same result: middle, edges, rest
+_MOVE_ORDER = [5, 1, 3, 7, 9, 2, 4, 6, 8]
+_WIN_ROWS = [
+    [1, 2, 3], [4, 5, 6], [7, 8, 9],
+    [1, 4, 7], [2, 5, 8], [3, 6, 9],
+    [1, 5, 9], [3, 5, 7]
+]
+
+
+def position_index(taken_fields: dict, first_key: str, second_key: str) -> int:
+    """Converts the taken fields of a game field to the base-3 index of the book.
+
+    Args:
+        taken_fields (dict): Ticked fields per player (see GameField.get_taken_fields)
+        first_key (str): Mark of the player who started the current round
+        second_key (str): Mark of the other player
+
+    Returns:
+        int: Offset of the position inside of the book
+    """
+    index = 0
+    for field in taken_fields[first_key]:
+        index += 3 ** (field - 1)
+    for field in taken_fields[second_key]:
+        index += 2 * 3 ** (field - 1)
+    return index
+
+
+def _get_winner(cells: list) -> int:
+    for row in _WIN_ROWS:
+        value = cells[row[0] - 1]
+        if value != 0 and value == cells[row[1] - 1] and value == cells[row[2] - 1]:
+            return value
+    return 0
+
+
+def _get_mover(cells: list) -> int:
+    return 1 if cells.count(1) == cells.count(2) else 2
+
+
+def _get_index(cells: list) -> int:
+    return sum(value * 3 ** i for i, value in enumerate(cells))
+
+
+def minimax(cells: list, memo: dict = None) -> int:
+    """Searches the complete game tree of a position.
+
+    Args:
+        cells (list): Nine values (0 = free, 1 = starting player, 2 = other player)
+        memo (dict, optional): Cache of already solved positions. Defaults to None.
+
+    Returns:
+        int: Score for the player to move; positive for a win,
+        negative for a loss and 0 for a tie. Faster wins score higher.
+    """
+    if memo is not None:
+        index = _get_index(cells)
+        if index in memo:
+            return memo[index]
+
+    mover = _get_mover(cells)
+    free_fields = cells.count(0)
+
+    if _get_winner(cells) != 0:
+        # the previous move has won the game
+        score = -(free_fields + 1)
+    elif free_fields == 0:
+        score = 0
+    else:
+        score = None
+        for i, value in enumerate(cells):
+            if value != 0:
+                continue
+            cells[i] = mover
+            child_score = -minimax(cells, memo)
+            cells[i] = 0
+            if score is None or child_score > score:
+                score = child_score
+
+    if memo is not None:
+        memo[index] = score
+    return score
+
+
+def _score_to_value(score: int) -> int:
+    if score > 0:
+        return VALUE_WIN
+    if score < 0:
+        return VALUE_LOSS
+    return VALUE_TIE
+
+
+def _get_best_move(cells: list, memo: dict) -> int:
+    mover = _get_mover(cells)
+    best_move = 0
+    best_score = None
+
+    for field in _MOVE_ORDER:
+        if cells[field - 1] != 0:
+            continue
+        cells[field - 1] = mover
+        score = -minimax(cells, memo)
+        cells[field - 1] = 0
+        if best_score is None or score > best_score:
+            best_move = field
+            best_score = score
+
+    return best_move
+
+
+def build_opening_book(path: str = BOOK_FILE) -> int:
+    """Enumerates all legal positions and writes the book to the given file.
+
+    Args:
+        path (str, optional): Target file. Defaults to BOOK_FILE.
+
+    Returns:
+        int: Amount of stored positions
+    """
+    table = bytearray(BOOK_SIZE)
+    memo = {}
+    pending = [[0] * 9]
+    amount_of_positions = 0
+
+    while pending:
+        cells = pending.pop()
+        index = _get_index(cells)
+        if table[index] != VALUE_NONE:
+            continue
+
+        score = minimax(cells, memo)
+        finished = _get_winner(cells) != 0 or 0 not in cells
+        best_move = 0 if finished else _get_best_move(cells, memo)
+        table[index] = (_score_to_value(score) << 4) | best_move
+        amount_of_positions += 1
+
+        if finished:
+            continue
+
+        mover = _get_mover(cells)
+        for i, value in enumerate(cells):
+            if value == 0:
+                child = list(cells)
+                child[i] = mover
+                pending.append(child)
+
+    with open(path, "wb") as file:
+        file.write(table)
+
+    return amount_of_positions
+
+
+def verify_opening_book(path: str = BOOK_FILE) -> list:
+    """Compares every stored position against a live minimax search without cache.
+
+    Args:
+        path (str, optional): Book file to check. Defaults to BOOK_FILE.
+
+    Returns:
+        list: Indices of all positions with a wrong value or move; empty if the book is valid
+    """
+    with open(path, "rb") as file:
+        table = file.read()
+
+    errors = []
+    for index, entry in enumerate(table):
+        if entry == VALUE_NONE:
+            continue
+
+        cells = [(index // 3 ** i) % 3 for i in range(9)]
+        value = entry >> 4
+        best_move = entry & 0x0F
+
+        if value != _score_to_value(minimax(cells)):
+            errors.append(index)
+            continue
+
+        if best_move == 0:
+            if _get_winner(cells) == 0 and 0 in cells:
+                errors.append(index)
+            continue
+
+        if cells[best_move - 1] != 0:
+            errors.append(index)
+            continue
+
+        cells[best_move - 1] = _get_mover(cells)
+        if _score_to_value(-minimax(cells)) != value:
+            errors.append(index)
+
+    return errors
+
+
+class OpeningBook():
+    """Provides read access to the precomputed book.
+    The file is memory mapped on the first lookup; it's built if it doesn't exist yet.
+    """
+
+    def __init__(self, path: str = BOOK_FILE):
+        self.__path = path
+        self.__table = None
+
+    def __load(self):
+        if not os.path.exists(self.__path):
+            build_opening_book(self.__path)
+
+        with open(self.__path, "rb") as file:
+            self.__table = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def get_best_move(self, taken_fields: dict, first_key: str, second_key: str) -> int:
+        """Looks up the best move of the current position.
+
+        Args:
+            taken_fields (dict): Ticked fields per player (see GameField.get_taken_fields)
+            first_key (str): Mark of the player who started the current round
+            second_key (str): Mark of the other player
+
+        Returns:
+            int: The field which should be ticked next or None if there is no move left
+        """
+        if self.__table is None:
+            self.__load()
+
+        best_move = self.__table[position_index(taken_fields, first_key, second_key)] & 0x0F
+        if best_move == 0:
+            return None
+        return best_move
+
+    def get_value(self, taken_fields: dict, first_key: str, second_key: str) -> int:
+        """Looks up the game-theoretic value of the current position for the player to move.
+
+        Args:
+            taken_fields (dict): Ticked fields per player (see GameField.get_taken_fields)
+            first_key (str): Mark of the player who started the current round
+            second_key (str): Mark of the other player
+
+        Returns:
+            int: One of VALUE_NONE, VALUE_LOSS, VALUE_TIE or VALUE_WIN
+        """
+        if self.__table is None:
+            self.__load()
+
+        return self.__table[position_index(taken_fields, first_key, second_key)] >> 4
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds or verifies the tic tac toe opening book")
+    parser.add_argument("--verify", action="store_true", help="compare the book with minimax")
+    parser.add_argument("--path", default=BOOK_FILE, help="location of the book file")
+    arguments = parser.parse_args()
+
+    if arguments.verify:
+        wrong_positions = verify_opening_book(arguments.path)
+        if wrong_positions:
+            print(f"{len(wrong_positions)} positions don't match the minimax search")
+            raise SystemExit(1)
+        print("All positions match the minimax search")
+    else:
+        print(f"Stored {build_opening_book(arguments.path)} positions in {arguments.path}")
@@ -0,0 +1,187 @@
+"""Contains a position cache, which can be shared by all strategies (see game_engine.py).
+
+Positions are reduced to a canonical form before they are stored: the marks are encoded relative
+to the player to move and the field is mapped to the smallest of its rotations/reflections
+(8 for square fields, 4 otherwise). So all symmetric positions share one cache entry.
+
+This contains the following classes:
+- PositionCache
+- CachedStrategy
+
+And the following global methods:
+- get_symmetries
+
+"""
+
+import operator
+from collections import OrderedDict
+
+_symmetries = {}
+
+
+def get_symmetries(rows: int, columns: int) -> list:
+    """Returns the rotations and reflections of a game field.
+
+    Args:
+        rows (int): Amount of rows
+        columns (int): Amount of columns
+
+    Returns:
+        list: One list per symmetry, which contains the source field id for every target field id
+    """
+    if (rows, columns) in _symmetries:
+        return _symmetries[(rows, columns)]
+
+    def transform(mapping):
+        return [
+            mapping(row, column)
+            for row in range(rows)
+            for column in range(columns)
+        ]
+
+    last_row = rows - 1
+    last_column = columns - 1
+    mappings = [
+        lambda r, c: r * columns + c,
+        lambda r, c: r * columns + last_column - c,
+        lambda r, c: (last_row - r) * columns + c,
+        lambda r, c: (last_row - r) * columns + last_column - c
+    ]
+    if rows == columns:
+        # transposed variants, which only keep the shape on square fields
+        mappings += [
+            lambda r, c: c * columns + r,
+            lambda r, c: c * columns + last_column - r,
+            lambda r, c: (last_row - c) * columns + r,
+            lambda r, c: (last_row - c) * columns + last_column - r
+        ]
+
+    result = []
+    for mapping in mappings:
+        sources = transform(mapping)
+        inverse = [0] * len(sources)
+        for target, source in enumerate(sources):
+            inverse[source] = target
+        result.append((operator.itemgetter(*sources), sources, inverse))
+
+    _symmetries[(rows, columns)] = result
+    return result
+
+
+class PositionCache():
+    """Least recently used cache for canonical positions with hit and miss counters."""
+
+    def __init__(self, max_size: int = 100000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get(self, key):
+        """Returns a cached value and marks it as recently used.
+
+        Args:
+            key (Hashable): The key of the entry
+
+        Returns:
+            Any: The cached value or None if the key isn't cached
+        """
+        value = self.__entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.__entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Stores a value; the least recently used entry is evicted if the cache is full.
+
+        Args:
+            key (Hashable): The key of the entry
+            value (Any): The value, which must not be None
+        """
+        self.__entries[key] = value
+        self.__entries.move_to_end(key)
+        if len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
+
+    def get_hit_rate(self) -> float:
+        """Returns the share of lookups which were answered by the cache
+
+        Returns:
+            float: hits / lookups or 0 if there were no lookups
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        """Removes all entries and resets the counters"""
+        self.__entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_canonical_position(self, game_field, own_key: str) -> tuple:
+        """Reduces the position to its canonical form.
+
+        Args:
+            game_field (GameField): The game field
+            own_key (str): Mark of the player to move
+
+        Returns:
+            tuple: The canonical cells (0 = free, 1 = player to move, 2 = opponent)
+            and the symmetry which maps the field onto them
+        """
+        cells = [
+            0 if isinstance(value, int) else 1 if value == own_key else 2
+            for value in (
+                game_field.get_field_value(i + 1)
+                for i in range(game_field.rows * game_field.columns)
+            )
+        ]
+
+        best_cells = None
+        best_symmetry = None
+        for symmetry in get_symmetries(game_field.rows, game_field.columns):
+            transformed = symmetry[0](cells)
+            if best_cells is None or transformed < best_cells:
+                best_cells = transformed
+                best_symmetry = symmetry
+
+        return best_cells, best_symmetry
+
+
+class CachedStrategy():
+    """Wraps a strategy and caches its moves per canonical position.
+    Only deterministic strategies should be wrapped; for searching strategies with a time budget
+    the first decision for a position is reused.
+    """
+
+    def __init__(self, strategy, cache: PositionCache, name: str):
+        """Creates the wrapper
+
+        Args:
+            strategy (Callable): The wrapped strategy
+            cache (PositionCache): Cache, which can be shared with other strategies
+            name (str): Separates the entries of this strategy from the ones of other strategies
+        """
+        self.strategy = strategy
+        self.cache = cache
+        self.name = name
+
+    def __call__(self, game_field, own_key: str, opponent_key: str, starting_key: str) -> int:
+        cells, (_, sources, inverse) = self.cache.get_canonical_position(game_field, own_key)
+        key = (self.name, game_field.rows, game_field.columns, game_field.win_length, cells)
+
+        canonical_move = self.cache.get(key)
+        if canonical_move is not None:
+            return sources[canonical_move - 1] + 1
+
+        move = self.strategy(game_field, own_key, opponent_key, starting_key)
+        if move is not None:
+            self.cache.put(key, inverse[move - 1] + 1)
+        return move
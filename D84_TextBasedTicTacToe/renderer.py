@@ -0,0 +1,182 @@
+"""Contains the renderers, which display the game field during a round.
+
+The ANSI renderer draws the game field once per round and afterwards only redraws
+the changed field and the status line using cursor positioning. Everything else
+(prompts, messages) is written below the status line and removed after each turn.
+The positions are absolute rows, so they are only valid as long as the screen doesn't scroll.
+If the game field and the prompt (e.g. the allowed fields of a 15x15 field) don't fit into
+the terminal, the renderer redraws the whole screen after every turn instead.
+The plain renderer is the fallback for terminals without ANSI support and for
+scripted sessions; it writes the complete game field after every turn, unless the input
+provider discards the output.
+
+This contains the following classes:
+- PlainRenderer
+- AnsiRenderer
+
+And the following global methods:
+- create_renderer
+
+"""
+
+import math
+import os
+import shutil
+import sys
+from typing import TextIO
+
+from input_provider import ConsoleInputProvider, InputProvider
+
+_vt_mode_enabled = False
+# lines below the prompt for the input and an error message, plus a margin
+_PROMPT_RESERVE = 4
+
+
+class PlainRenderer():
+    """Writes the complete game field through the input provider after every turn."""
+
+    def __init__(self, provider: InputProvider):
+        self.__provider = provider
+
+    def draw_field(self, game_field):
+        """Draws the game field at the start of a round
+
+        Args:
+            game_field (GameField): The game field
+        """
+        if self.__provider.is_output_kept():
+            self.__provider.write(game_field.format())
+
+    def update_field(self, game_field, field_name: int):
+        """Shows the game field after a turn
+
+        Args:
+            game_field (GameField): The game field
+            field_name (int): The field which was ticked
+        """
+        if self.__provider.is_output_kept():
+            self.__provider.write(game_field.format())
+
+    def show_status(self, text: str):
+        """Shows a status message, e.g. whose turn it is
+
+        Args:
+            text (str): The message
+        """
+        self.__provider.write(text)
+
+
+class AnsiRenderer():
+    """Redraws only changed parts of the screen using ANSI escape sequences."""
+
+    def __init__(self, stream: TextIO = None):
+        self.__stream = stream or sys.stdout
+        self.__width = 1
+        self.__status_row = 1
+        self.__prompt_row = 1
+        self.__game_field = None
+        self.__status = ""
+        # the layout doesn't fit into the terminal, so the cursor positions would be wrong
+        self.__full_redraw = False
+
+    def __write(self, text: str):
+        self.__stream.write(text)
+        self.__stream.flush()
+
+    def draw_field(self, game_field):
+        """Clears the screen and draws the game field at the start of a round
+
+        Args:
+            game_field (GameField): The game field
+        """
+        self.__width = len(str(game_field.rows * game_field.columns))
+        board_lines = 2 * game_field.rows - 1
+        self.__status_row = board_lines + 2
+        self.__prompt_row = self.__status_row + 2
+        self.__game_field = game_field
+        self.__status = ""
+
+        # the prompt lists all allowed fields, which wraps on large game fields
+        terminal = shutil.get_terminal_size()
+        board_width = game_field.columns * (self.__width + 3)
+        fields = game_field.rows * game_field.columns
+        prompt_lines = math.ceil((40 + fields * (self.__width + 2)) / max(terminal.columns, 1))
+        self.__full_redraw = (
+            board_width > terminal.columns or
+            self.__prompt_row + prompt_lines + _PROMPT_RESERVE > terminal.lines
+        )
+
+        self.__redraw()
+
+    def __redraw(self):
+        board = self.__game_field.format().rstrip("\n")
+        self.__write(
+            f"\x1b[2J\x1b[H{board}\n\x1b[{self.__status_row};1H{self.__status}"
+            f"\x1b[{self.__prompt_row};1H"
+        )
+
+    def update_field(self, game_field, field_name: int):
+        """Redraws the ticked field and removes the prompts of the last turn
+
+        Args:
+            game_field (GameField): The game field
+            field_name (int): The field which was ticked
+        """
+        if self.__full_redraw:
+            self.__redraw()
+            return
+
+        row, column = divmod(field_name - 1, game_field.columns)
+        screen_row = 1 + 2 * row
+        screen_column = 2 + column * (self.__width + 3)
+        value = str(game_field.get_field_value(field_name)).rjust(self.__width)
+
+        self.__write(
+            f"\x1b[{screen_row};{screen_column}H{value}"
+            f"\x1b[{self.__prompt_row};1H\x1b[J"
+        )
+
+    def show_status(self, text: str):
+        """Replaces the status line below the game field
+
+        Args:
+            text (str): The message
+        """
+        self.__status = text
+        if self.__full_redraw:
+            self.__redraw()
+            return
+
+        self.__write(
+            f"\x1b[{self.__status_row};1H\x1b[2K{text}"
+            f"\x1b[{self.__prompt_row};1H\x1b[J"
+        )
+
+
+def create_renderer(provider: InputProvider, plain: bool = False):
+    """Chooses the renderer for the input provider.
+    ANSI is only used for the console if the output is a terminal which supports it.
+
+    Args:
+        provider (InputProvider): Input provider of the game
+        plain (bool, optional): Forces the plain renderer. Defaults to False.
+
+    Returns:
+        PlainRenderer | AnsiRenderer: The renderer
+    """
+    global _vt_mode_enabled
+
+    if (
+            plain or
+            not isinstance(provider, ConsoleInputProvider) or
+            not sys.stdout.isatty() or
+            os.environ.get("TERM") == "dumb"
+        ):
+        return PlainRenderer(provider)
+
+    if os.name == "nt" and not _vt_mode_enabled:
+        # running an empty command once enables the escape sequences in the windows console
+        os.system("")
+        _vt_mode_enabled = True
+
+    return AnsiRenderer()
@@ -0,0 +1,142 @@
+"""Contains the binary replay format of the tic tac toe game.
+
+A replay file starts with the magic bytes b"TTTR" and a version byte,
+followed by one record per round:
+- header (6 bytes, little endian): rows, columns, win length, flags, amount of moves (uint16)
+- flags: bit 0 = starting player (0 = X, 1 = O), bits 1-2 = result (see RESULT_*)
+- moves: the ticked field names (uint8, or uint16 if the field has more than 255 fields)
+
+This contains the following classes:
+- ReplayWriter
+
+And the following global methods:
+- pack_replay
+- read_replays
+
+"""
+
+import array
+import struct
+
+MAGIC = b"TTTR"
+VERSION = 1
+FILE_HEADER = MAGIC + bytes([VERSION])
+RECORD_HEADER = struct.Struct("<BBBBH")
+
+RESULT_TIE = 0
+RESULT_X_WON = 1
+RESULT_O_WON = 2
+RESULT_ABORTED = 3
+
+
+def _get_move_type(rows: int, columns: int) -> str:
+    return "B" if rows * columns <= 255 else "H"
+
+
+def pack_replay(size: tuple, starting_key: str, result: int, moves: list) -> bytes:
+    """Packs a single round into a replay record.
+
+    Args:
+        size (tuple): Rows, columns and win length of the game field
+        starting_key (str): Mark of the player who made the first turn; X or O
+        result (int): One of RESULT_TIE, RESULT_X_WON, RESULT_O_WON or RESULT_ABORTED
+        moves (list): The ticked field names in the order they were ticked
+
+    Returns:
+        bytes: The record
+    """
+    rows, columns, win_length = size
+    flags = (1 if starting_key == "O" else 0) | (result << 1)
+    header = RECORD_HEADER.pack(rows, columns, win_length, flags, len(moves))
+    return header + array.array(_get_move_type(rows, columns), moves).tobytes()
+
+
+def read_replays(data: bytes):
+    """Iterates over the records of a replay file.
+
+    Args:
+        data (bytes): Content of a replay file
+
+    Raises:
+        ValueError: If the data isn't a replay file
+
+    Yields:
+        tuple: size, starting key, result and the list of moves
+    """
+    if data[:len(FILE_HEADER)] != FILE_HEADER:
+        raise ValueError("The data isn't a replay file of a supported version")
+
+    offset = len(FILE_HEADER)
+    while offset < len(data):
+        rows, columns, win_length, flags, amount_of_moves = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+
+        moves = array.array(_get_move_type(rows, columns))
+        end = offset + amount_of_moves * moves.itemsize
+        moves.frombytes(data[offset:end])
+        offset = end
+
+        starting_key = "O" if flags & 1 else "X"
+        yield (rows, columns, win_length), starting_key, flags >> 1, moves.tolist()
+
+
+class ReplayWriter():
+    """Records the turns of a game field and appends every finished round to a replay file.
+    The file header is written if the file is empty."""
+
+    def __init__(self, file):
+        """Creates the writer
+
+        Args:
+            file (BinaryIO): File (or buffer) opened for appending binary data
+        """
+        self.__file = file
+        self.__moves = []
+        self.__starting_key = None
+
+        if file.tell() == 0:
+            file.write(FILE_HEADER)
+
+    def attach(self, game_field):
+        """Records all turns of the game field
+
+        Args:
+            game_field (GameField): The observed game field
+        """
+        game_field.add_turn_listener(self.record_turn)
+
+    def record_turn(self, field_name: int, field_value: str):
+        """Listener for GameField turns; undone turns (field_value None) are removed again.
+
+        Args:
+            field_name (int): The ticked field
+            field_value (str): The mark of the player or None if the turn was undone
+        """
+        if field_value is None:
+            self.__moves.pop()
+            return
+
+        if not self.__moves:
+            self.__starting_key = field_value
+        self.__moves.append(field_name)
+
+    def finish_round(self, game_field):
+        """Writes the recorded turns of the current round and starts a new one.
+
+        Args:
+            game_field (GameField): The observed game field
+        """
+        winner = game_field.get_winner()
+        if winner == "X":
+            result = RESULT_X_WON
+        elif winner == "O":
+            result = RESULT_O_WON
+        elif game_field.get_available_fields():
+            result = RESULT_ABORTED
+        else:
+            result = RESULT_TIE
+
+        size = (game_field.rows, game_field.columns, game_field.win_length)
+        self.__file.write(pack_replay(size, self.__starting_key or "X", result, self.__moves))
+        self.__moves = []
+        self.__starting_key = None
@@ -0,0 +1,356 @@
+"""Bulk analysis of replay files (see replay.py), which is vectorized with NumPy.
+
+The replays are loaded into arrays (one row per game). For games on the classic 3x3 field
+the positions are encoded like in the opening book, so the book serves as perfect-play oracle.
+
+Usage:
+py replay_analysis.py replays.bin [more_replays.bin ...]
+
+This contains the following classes:
+- ReplayArrays
+
+And the following global methods:
+- load_replays
+- get_opening_frequencies
+- get_positions
+- get_position_statistics
+- find_blunders
+- format_position
+
+And the following global Constants:
+- HEADER_DTYPE
+
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from opening_book import BOOK_FILE, BOOK_SIZE
+from replay import FILE_HEADER, RECORD_HEADER, RESULT_O_WON, RESULT_X_WON
+
+# layout of replay.RECORD_HEADER
+HEADER_DTYPE = np.dtype([
+    ("rows", "u1"), ("columns", "u1"), ("win_length", "u1"), ("flags", "u1"), ("moves", "<u2")
+])
+# records per step when the chain of records is followed
+_CHAIN_STEP = 16
+
+
+class ReplayArrays():
+    """Holds the loaded replays as arrays with one row per game"""
+
+    def __init__(
+            self,
+            sizes: np.ndarray, starting: np.ndarray,
+            results: np.ndarray, lengths: np.ndarray, moves: np.ndarray
+        ):
+        # rows, columns and win length per game
+        self.sizes = sizes
+        # 0 if X started, 1 if O started
+        self.starting = starting
+        self.results = results
+        self.lengths = lengths
+        # ticked field names, padded with 0
+        self.moves = moves
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def select(self, mask: np.ndarray):
+        """Returns the games which match the mask
+
+        Args:
+            mask (np.ndarray): Boolean mask with one entry per game
+
+        Returns:
+            ReplayArrays: The selected games
+        """
+        lengths = self.lengths[mask]
+        max_length = int(lengths.max()) if len(lengths) else 0
+        return ReplayArrays(
+            self.sizes[mask], self.starting[mask], self.results[mask],
+            lengths, self.moves[mask, :max_length]
+        )
+
+    def select_classic(self):
+        """Returns the games on the classic 3x3 field with three in a row
+
+        Returns:
+            ReplayArrays: The selected games
+        """
+        return self.select(np.all(self.sizes == (3, 3, 3), axis=1))
+
+    def get_starting_player_results(self) -> tuple:
+        """Converts the results to the view of the starting player
+
+        Returns:
+            tuple: Boolean arrays for wins, ties and losses of the starting player
+        """
+        x_won = self.results == RESULT_X_WON
+        o_won = self.results == RESULT_O_WON
+        started_x = self.starting == 0
+        wins = (x_won & started_x) | (o_won & ~started_x)
+        losses = (o_won & started_x) | (x_won & ~started_x)
+        return wins, ~(wins | losses), losses
+
+
+def _find_records(data: bytes) -> np.ndarray:
+    """Finds the offsets of all records. Every byte which could start a valid header is
+    a candidate; each candidate points to the candidate behind its record. The records are
+    the chain of candidates from the first byte. The pointers are squared vectorized, so
+    the chain is only walked in steps of _CHAIN_STEP records and the records in between
+    are filled in vectorized again.
+    """
+    start = len(FILE_HEADER)
+    body = np.frombuffer(data, dtype=np.uint8)[start:]
+    header_size = RECORD_HEADER.size
+    count = len(body) - header_size + 1
+    if len(body) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if count <= 0:
+        raise ValueError("The replay file is truncated")
+
+    # contiguous slices of the header bytes of every position
+    rows, columns, flags = [body[i:i + count].astype(np.int32) for i in (0, 1, 3)]
+    amount_of_moves = body[4:4 + count] | body[5:5 + count].astype(np.int32) << 8
+    fields = rows * columns
+    candidates = np.flatnonzero(
+        (rows > 0) & (columns > 0) & (flags < 8) & (amount_of_moves <= fields)
+    )
+    if len(candidates) == 0 or candidates[0] != 0:
+        raise ValueError("The replay file is corrupt")
+
+    ends = (
+        candidates + header_size +
+        amount_of_moves[candidates] * np.where(fields[candidates] <= 255, 1, 2)
+    )
+    following = np.searchsorted(candidates, ends)
+    sentinel = len(candidates)
+    following[candidates[np.minimum(following, sentinel - 1)] != ends] = sentinel
+    jump = np.append(following, sentinel)
+
+    stride = jump
+    for _ in range(_CHAIN_STEP.bit_length() - 1):
+        stride = stride[stride]
+    coarse = []
+    node = 0
+    stride = stride.tolist()
+    while node != sentinel:
+        coarse.append(node)
+        node = stride[node]
+
+    steps = [np.array(coarse, dtype=np.int64)]
+    for _ in range(_CHAIN_STEP - 1):
+        steps.append(jump[steps[-1]])
+    chain = np.stack(steps, axis=1).ravel()
+    chain = chain[chain != sentinel]
+
+    if ends[chain[-1]] != len(body):
+        raise ValueError("The replay file is corrupt or truncated")
+    return candidates[chain] + start
+
+
+def load_replays(data: bytes) -> ReplayArrays:
+    """Loads the content of a replay file into arrays.
+    The record headers are found vectorized (see _find_records) and parsed with a structured
+    dtype, the moves are gathered vectorized as well.
+
+    Args:
+        data (bytes): Content of a replay file
+
+    Raises:
+        ValueError: If the data isn't a replay file or it's corrupt
+
+    Returns:
+        ReplayArrays: The loaded games
+    """
+    if data[:len(FILE_HEADER)] != FILE_HEADER:
+        raise ValueError("The data isn't a replay file of a supported version")
+
+    offsets = _find_records(data)
+    # a view of the header at every byte, of which the record offsets are picked
+    all_headers = np.ndarray(
+        (max(len(data) - RECORD_HEADER.size + 1, 0),), dtype=HEADER_DTYPE,
+        buffer=data, strides=(1,)
+    )
+    headers = all_headers[offsets]
+    move_offsets = offsets + RECORD_HEADER.size
+
+    sizes = np.stack([headers["rows"], headers["columns"], headers["win_length"]], axis=1)
+    flags = headers["flags"]
+    lengths = headers["moves"].astype(np.int64)
+    item_sizes = np.where(sizes[:, 0].astype(np.int64) * sizes[:, 1] <= 255, 1, 2)
+
+    # gather the moves of all games at once
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    amount_of_games = len(lengths)
+    game_of_move = np.repeat(np.arange(amount_of_games), lengths)
+    ply = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    byte_offsets = (
+        np.repeat(move_offsets, lengths) +
+        ply * np.repeat(item_sizes, lengths)
+    )
+
+    values = buffer[byte_offsets].astype(np.uint16)
+    wide = np.repeat(item_sizes == 2, lengths)
+    values[wide] |= buffer[byte_offsets[wide] + 1].astype(np.uint16) << 8
+
+    max_length = int(lengths.max()) if amount_of_games else 0
+    moves = np.zeros((amount_of_games, max_length), dtype=np.uint16)
+    moves[game_of_move, ply] = values
+
+    return ReplayArrays(sizes, flags & 1, flags >> 1, lengths, moves)
+
+
+def get_opening_frequencies(replays: ReplayArrays, depth: int = 1) -> tuple:
+    """Counts how often each opening was played.
+
+    Args:
+        replays (ReplayArrays): The games
+        depth (int, optional): Amount of moves of an opening. Defaults to 1.
+
+    Returns:
+        tuple: The openings (one row per opening) and their counts, most frequent first
+    """
+    played = replays.select(replays.lengths >= depth)
+    openings, counts = np.unique(played.moves[:, :depth], axis=0, return_counts=True)
+    order = np.argsort(counts)[::-1]
+    return openings[order], counts[order]
+
+
+def get_positions(replays: ReplayArrays) -> np.ndarray:
+    """Encodes the positions of classic games like the opening book does
+    (base-3 index; 1 = starting player, 2 = other player).
+
+    Args:
+        replays (ReplayArrays): Games on the classic field
+
+    Returns:
+        np.ndarray: One row per game with the position before every move and after the last one;
+        the entries after the end of a game repeat the final position
+    """
+    moves = replays.moves.astype(np.int64)
+    plies = np.arange(moves.shape[1])
+    digits = np.where(plies % 2 == 0, 1, 2)
+    contributions = np.where(moves > 0, digits * 3 ** np.maximum(moves - 1, 0), 0)
+
+    positions = np.zeros((len(replays), moves.shape[1] + 1), dtype=np.int64)
+    np.cumsum(contributions, axis=1, out=positions[:, 1:])
+    return positions
+
+
+def get_position_statistics(replays: ReplayArrays, positions: np.ndarray) -> tuple:
+    """Counts for every position how often it was reached and how the games ended.
+
+    Args:
+        replays (ReplayArrays): Games on the classic field
+        positions (np.ndarray): Result of get_positions
+
+    Returns:
+        tuple: Arrays indexed by position: games, wins, ties and losses of the starting player
+    """
+    reached = np.arange(positions.shape[1]) <= replays.lengths[:, None]
+    flat_positions = positions[reached]
+    games_of_positions = np.nonzero(reached)[0]
+
+    wins, ties, losses = replays.get_starting_player_results()
+    counts = np.bincount(flat_positions, minlength=BOOK_SIZE)
+    return (
+        counts,
+        np.bincount(flat_positions, weights=wins[games_of_positions], minlength=BOOK_SIZE),
+        np.bincount(flat_positions, weights=ties[games_of_positions], minlength=BOOK_SIZE),
+        np.bincount(flat_positions, weights=losses[games_of_positions], minlength=BOOK_SIZE)
+    )
+
+
+def find_blunders(replays: ReplayArrays, positions: np.ndarray, book_file: str = BOOK_FILE) -> np.ndarray:
+    """Compares every move with the opening book. A move is a blunder if it makes
+    the game-theoretic value worse for the player who made it (e.g. from a win to a tie).
+
+    Args:
+        replays (ReplayArrays): Games on the classic field
+        positions (np.ndarray): Result of get_positions
+        book_file (str, optional): The opening book. Defaults to BOOK_FILE.
+
+    Returns:
+        np.ndarray: Boolean array (games x moves), true for every blunder
+    """
+    book = np.fromfile(book_file, dtype=np.uint8)
+    values = book[positions] >> 4
+
+    before = values[:, :-1].astype(np.int8)
+    # values are stored for the player to move, so the value after a move is mirrored
+    after = 4 - values[:, 1:].astype(np.int8)
+
+    made = np.arange(replays.moves.shape[1]) < replays.lengths[:, None]
+    return made & (after < before)
+
+
+def format_position(position: int) -> str:
+    """Formats an encoded position as 3x3 field (S = starting player, O = other player)
+
+    Args:
+        position (int): The encoded position
+
+    Returns:
+        str: The field in a single line, rows are separated by |
+    """
+    marks = ".SO"
+    cells = [marks[(position // 3 ** i) % 3] for i in range(9)]
+    return "|".join("".join(cells[i:i + 3]) for i in range(0, 9, 3))
+
+
+def _print_report(replays: ReplayArrays):
+    classic = replays.select_classic()
+    print(f"{len(replays)} games, {len(classic)} on the classic field")
+    if len(classic) == 0:
+        return
+
+    wins, ties, losses = classic.get_starting_player_results()
+    print(
+        f"Starting player: {wins.mean() * 100:.1f} % wins, "
+        f"{ties.mean() * 100:.1f} % ties, {losses.mean() * 100:.1f} % losses"
+    )
+
+    positions = get_positions(classic)
+    counts, position_wins, _, _ = get_position_statistics(classic, positions)
+
+    print("\nOpenings:")
+    openings, opening_counts = get_opening_frequencies(classic)
+    for opening, count in zip(openings, opening_counts):
+        position = 3 ** (int(opening[0]) - 1)
+        win_rate = position_wins[position] * 100 / counts[position]
+        print(f"\tfield {opening[0]}: {count} games, starting player wins {win_rate:.1f} %")
+
+    blunders = find_blunders(classic, positions)
+    games_with_blunder = blunders.any(axis=1)
+    print(f"\n{blunders.sum()} blunders in {games_with_blunder.sum()} games")
+    print("Blunders per move: " + ", ".join(str(x) for x in blunders.sum(axis=0)))
+
+    blunder_positions = np.bincount(positions[:, :-1][blunders], minlength=BOOK_SIZE)
+    print("\nPositions with the most blunders:")
+    for position in np.argsort(blunder_positions)[::-1][:5]:
+        if blunder_positions[position] == 0:
+            break
+        print(
+            f"\t{format_position(position)}: {blunder_positions[position]} blunders "
+            f"in {counts[position]} games"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyzes tic tac toe replay files")
+    parser.add_argument("files", nargs="+", help="replay files")
+    arguments = parser.parse_args()
+
+    for file_name in arguments.files:
+        load_start = time.perf_counter()
+        with open(file_name, "rb") as file:
+            loaded_replays = load_replays(file.read())
+        load_duration = time.perf_counter() - load_start
+
+        print(f"{file_name} (loaded in {load_duration:.2f} seconds)")
+        _print_report(loaded_replays)
+        print()
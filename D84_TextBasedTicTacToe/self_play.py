@@ -0,0 +1,259 @@
+"""Headless self-play harness, which evaluates the strength of the computer strategies.
+
+Every pair of the selected strategies plays the requested amount of games on a process pool.
+The starting player alternates between the games. The result is printed as win/tie/loss
+matrix (from the view of the row strategy) together with the amount of games per second.
+
+The strategies are:
+- computer: the computer player of the console game (opening book, search on larger fields)
+- heuristic: the rule based make_next_computer_turn of the original game (3x3 only)
+- random: random available fields
+- mcts: Monte Carlo tree search (see mcts.py)
+
+Usage:
+py self_play.py --games 1000000 --strategies computer heuristic random [--replays replays.bin]
+
+With --cache-size the deterministic strategies (computer and mcts) share a position cache
+per worker process (see position_cache.py).
+
+This contains the following global methods:
+- create_strategy
+- play_games
+- run_self_play
+- format_matrix
+
+"""
+
+import argparse
+import io
+import itertools
+import multiprocessing
+import time
+
+from game_engine import ComputerStrategy, HeuristicStrategy, RandomStrategy, play_round
+from hcs_tic_tac_toe_game import GameField
+from mcts import MctsStrategy
+from position_cache import CachedStrategy, PositionCache
+from replay import FILE_HEADER, ReplayWriter
+
+STRATEGIES = ["computer", "heuristic", "random", "mcts"]
+CACHEABLE_STRATEGIES = ["computer", "mcts"]
+FIELD_SIZES = {
+    "3x3": (3, 3, 3),
+    "15x15": (15, 15, 5)
+}
+
+_worker_cache = None
+
+
+def create_strategy(name: str, seed: int, time_budget: float, cache: PositionCache = None):
+    """Creates a strategy by its name
+
+    Args:
+        name (str): One of STRATEGIES
+        seed (int): Seed for random decisions
+        time_budget (float): Time budget per turn for searching strategies
+        cache (PositionCache, optional): Cache for the strategies in CACHEABLE_STRATEGIES.
+        Defaults to None.
+
+    Returns:
+        Callable: The strategy
+    """
+    if name == "computer":
+        strategy = ComputerStrategy(time_budget=time_budget)
+    elif name == "heuristic":
+        strategy = HeuristicStrategy()
+    elif name == "random":
+        strategy = RandomStrategy(seed)
+    elif name == "mcts":
+        # the strategies already run inside of a worker process
+        strategy = MctsStrategy(time_budget=time_budget, processes=1, seed=seed)
+    else:
+        raise ValueError(f"'{name}' is not a known strategy")
+
+    if cache is not None and name in CACHEABLE_STRATEGIES:
+        strategy = CachedStrategy(strategy, cache, name)
+    return strategy
+
+
+def play_games(job: tuple) -> tuple:
+    """Plays a batch of games between two strategies; used as worker of the process pool.
+
+    Args:
+        job (tuple): strategy a, strategy b, field dimensions, amount of games, seed,
+        time budget, if the replays should be recorded and the size of the position cache
+
+    Returns:
+        tuple: strategy a, strategy b, wins of a, ties, wins of b,
+        the replay records (without file header), cache hits and cache misses
+    """
+    global _worker_cache
+    (
+        name_a, name_b, dimensions, amount_of_games,
+        seed, time_budget, record_replays, cache_size
+    ) = job
+
+    cache = None
+    if cache_size > 0:
+        # the cache is kept between the jobs of the same worker process
+        if _worker_cache is None or _worker_cache.max_size != cache_size:
+            _worker_cache = PositionCache(cache_size)
+        cache = _worker_cache
+    hits = cache.hits if cache else 0
+    misses = cache.misses if cache else 0
+
+    strategies = [
+        create_strategy(name_a, seed, time_budget, cache),
+        create_strategy(name_b, seed + 1, time_budget, cache)
+    ]
+    keys = ["X", "O"]
+    game_field = GameField(*dimensions)
+    results = [0, 0, 0]
+
+    replays = None
+    replay_writer = None
+    if record_replays:
+        replays = io.BytesIO()
+        replay_writer = ReplayWriter(replays)
+        replay_writer.attach(game_field)
+
+    for i in range(amount_of_games):
+        winner = play_round(game_field, strategies, keys, (seed + i) % 2)
+        if winner is None:
+            results[1] += 1
+        else:
+            results[2 * winner] += 1
+        if replay_writer is not None:
+            replay_writer.finish_round(game_field)
+
+    records = b"" if replays is None else replays.getvalue()[len(FILE_HEADER):]
+    if cache is not None:
+        hits = cache.hits - hits
+        misses = cache.misses - misses
+    return (name_a, name_b, *results, records, hits, misses)
+
+
+def run_self_play(
+        strategies: list, games: int, dimensions: tuple,
+        processes: int = None, batch_size: int = 10000, time_budget: float = 0.1,
+        replay_file=None, cache_size: int = 0
+    ) -> tuple:
+    """Plays every pair of strategies against each other on a process pool.
+
+    Args:
+        strategies (list): Names of the strategies
+        games (int): Amount of games per pair
+        dimensions (tuple): Rows, columns and win length of the game field
+        processes (int, optional): Amount of worker processes. Defaults to the cpu count.
+        batch_size (int, optional): Games per job. Defaults to 10000.
+        time_budget (float, optional): Time budget per turn for searching strategies.
+        Defaults to 0.1.
+        replay_file (BinaryIO, optional): Receives the replays of all games. Defaults to None.
+        cache_size (int, optional): Entries of the position cache per worker; 0 disables it.
+        Defaults to 0.
+
+    Returns:
+        tuple: dict with [wins, ties, losses] per pair, the amount of games per second
+        and the hit rate of the position cache
+    """
+    jobs = []
+    seed = 0
+    for name_a, name_b in itertools.product(strategies, repeat=2):
+        remaining = games
+        while remaining > 0:
+            amount = min(batch_size, remaining)
+            jobs.append((
+                name_a, name_b, dimensions, amount, seed,
+                time_budget, replay_file is not None, cache_size
+            ))
+            remaining -= amount
+            seed += amount
+
+    matrix = {pair: [0, 0, 0] for pair in itertools.product(strategies, repeat=2)}
+
+    if replay_file is not None and replay_file.tell() == 0:
+        replay_file.write(FILE_HEADER)
+
+    cache_lookups = [0, 0]
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        for result in pool.imap_unordered(play_games, jobs):
+            name_a, name_b, wins, ties, losses, records, hits, misses = result
+            counts = matrix[(name_a, name_b)]
+            counts[0] += wins
+            counts[1] += ties
+            counts[2] += losses
+            cache_lookups[0] += hits
+            cache_lookups[1] += misses
+            if replay_file is not None:
+                replay_file.write(records)
+    duration = time.perf_counter() - start
+
+    total_games = games * len(matrix)
+    hit_rate = cache_lookups[0] / sum(cache_lookups) if sum(cache_lookups) else 0.0
+    return matrix, total_games / duration, hit_rate
+
+
+def format_matrix(strategies: list, matrix: dict) -> str:
+    """Formats the results as win/tie/loss percentages of the row strategy.
+
+    Args:
+        strategies (list): Names of the strategies
+        matrix (dict): [wins, ties, losses] per pair of strategies
+
+    Returns:
+        str: Printable table
+    """
+    width = max(len(x) for x in strategies + ["20.0/20.0/20.0"]) + 2
+    lines = ["W/T/L %".ljust(width) + "".join(x.ljust(width) for x in strategies)]
+
+    for name_a in strategies:
+        line = name_a.ljust(width)
+        for name_b in strategies:
+            counts = matrix[(name_a, name_b)]
+            total = sum(counts) or 1
+            cell = "/".join(f"{x * 100 / total:.1f}" for x in counts)
+            line += cell.ljust(width)
+        lines.append(line)
+
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluates the tic tac toe strategies")
+    parser.add_argument("--games", type=int, default=100000, help="games per pair of strategies")
+    parser.add_argument("--strategies", nargs="+", choices=STRATEGIES, default=STRATEGIES[:3])
+    parser.add_argument("--field", choices=FIELD_SIZES.keys(), default="3x3")
+    parser.add_argument("--processes", type=int, default=None, help="defaults to the cpu count")
+    parser.add_argument("--batch-size", type=int, default=10000, help="games per job")
+    parser.add_argument(
+        "--time-budget", type=float, default=0.1,
+        help="seconds per turn for searching strategies (mcts and computer on larger fields)"
+    )
+    parser.add_argument("--replays", default=None, help="appends the replays to this file")
+    parser.add_argument(
+        "--cache-size", type=int, default=0,
+        help="entries of the shared position cache per worker process (0 disables the cache)"
+    )
+    arguments = parser.parse_args()
+
+    replays_output = None if arguments.replays is None else open(arguments.replays, "ab")
+    try:
+        result_matrix, games_per_second, cache_hit_rate = run_self_play(
+            arguments.strategies,
+            arguments.games,
+            FIELD_SIZES[arguments.field],
+            arguments.processes,
+            arguments.batch_size,
+            arguments.time_budget,
+            replays_output,
+            arguments.cache_size
+        )
+    finally:
+        if replays_output is not None:
+            replays_output.close()
+
+    print(format_matrix(arguments.strategies, result_matrix))
+    print(f"\n{games_per_second:.0f} games per second")
+    if arguments.cache_size > 0:
+        print(f"Position cache hit rate: {cache_hit_rate * 100:.1f} %")
@@ -0,0 +1,199 @@
+"""Contains the incremental alignment of a typed word against its target word.
+
+The edit distance is computed with the bit-parallel algorithm of Myers in the variant of
+Hyyrö for the global distance: a column of the dynamic programming matrix (one entry per
+character of the target) is stored as two bit vectors of vertical deltas (+1 and -1), so a
+typed character updates the whole column with a few operations on a single integer.
+The columns are kept on a stack, so BackSpace just drops the last one.
+
+A keystroke is an error, if it increases the distance of the typed text to the closest
+prefix of the target. Following keystrokes after a typo are therefore correct again, as long as
+they match the target. Errors which are removed with BackSpace are corrected typos; the errors
+left in a submitted word are classified by a traceback as substitutions, insertions
+(extra characters) and omissions (missing characters).
+
+This contains the following classes:
+- WordAligner
+
+"""
+
+_CHUNK_BITS = 4
+_CHUNK_MASK = (1 << _CHUNK_BITS) - 1
+
+
+def _get_chunk(positive: int, negative: int) -> tuple[int, int]:
+    value = low = 0
+    for i in range(_CHUNK_BITS):
+        value += (positive >> i & 1) - (negative >> i & 1)
+        low = min(low, value)
+    return value, low
+
+
+# sum and minimal running sum of the vertical deltas of 4 rows (index: positive << 4 | negative)
+_CHUNKS = [
+    _get_chunk(x >> _CHUNK_BITS, x & _CHUNK_MASK) for x in range(1 << 2 * _CHUNK_BITS)
+]
+
+
+class WordAligner:
+    """Aligns the typed characters of a word against the target, one keystroke at a time."""
+    def __init__(self, target: str):
+        """Creates the aligner with an empty input
+
+        Args:
+            target (str): the word which should be typed
+        """
+        self.target = target
+        self._length = len(target)
+        self._mask = (1 << self._length) - 1
+        self._last_bit = 1 << (self._length - 1) if target else 0
+        # bit i is set in _matches[c] if target[i] == c
+        self._matches = {}
+        for i, char in enumerate(target):
+            self._matches[char] = self._matches.get(char, 0) | 1 << i
+        self._text = []
+        # column j: vertical deltas +1/-1 of D[i][j] over i and D[len(target)][j]
+        self._columns = [(self._mask, 0, self._length)]
+        # prefix distance after every typed character and whether the character was an error
+        self._prefix_distances = [0]
+        self._errors = []
+
+    def get_text(self) -> str:
+        """Returns the aligned input
+
+        Returns:
+            str: the typed characters
+        """
+        return "".join(self._text)
+
+    def get_distance(self) -> int:
+        """Returns the edit distance between the input and the target
+
+        Returns:
+            int: 0 if the word is typed correctly
+        """
+        return self._columns[-1][2]
+
+    def get_prefix_distance(self) -> int:
+        """Returns the edit distance between the input and the closest prefix of the target
+
+        Returns:
+            int: 0 if the input is a prefix of the target
+        """
+        return self._prefix_distances[-1]
+
+    def push(self, char: str) -> bool:
+        """Adds a typed character
+
+        Args:
+            char (str): the character
+
+        Returns:
+            bool: True if the character is an error
+        """
+        positive, negative, distance = self._columns[-1]
+        matches = self._matches.get(char, 0)
+        mask = self._mask
+
+        vertical = matches | negative
+        horizontal = (((matches & positive) + positive) ^ positive) | matches
+        horizontal_positive = negative | (~(horizontal | positive) & mask)
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & self._last_bit or not self._length:
+            # an empty target has no rows, so every typed character is an insertion
+            distance += 1
+        elif horizontal_negative & self._last_bit:
+            distance -= 1
+        # D[0][j] = j, so the delta above the first row is always +1
+        horizontal_positive = ((horizontal_positive << 1) | 1) & mask
+        horizontal_negative = (horizontal_negative << 1) & mask
+        positive = horizontal_negative | (~(vertical | horizontal_positive) & mask)
+        negative = horizontal_positive & vertical
+
+        self._text.append(char)
+        self._columns.append((positive, negative, distance))
+
+        # minimum of D[i][j] for i = 0..len(target), starting with D[0][j] = j (4 rows per step)
+        value = len(self._text)
+        prefix_distance = value
+        while positive or negative:
+            total, low = _CHUNKS[(positive & _CHUNK_MASK) << _CHUNK_BITS | negative & _CHUNK_MASK]
+            if value + low < prefix_distance:
+                prefix_distance = value + low
+            value += total
+            positive >>= _CHUNK_BITS
+            negative >>= _CHUNK_BITS
+        is_error = prefix_distance > self._prefix_distances[-1]
+        self._prefix_distances.append(prefix_distance)
+        self._errors.append(is_error)
+        return is_error
+
+    def pop(self) -> bool:
+        """Removes the last typed character (BackSpace)
+
+        Returns:
+            bool: True if the removed character was an error (a corrected typo)
+        """
+        if not self._text:
+            return False
+        self._text.pop()
+        self._columns.pop()
+        self._prefix_distances.pop()
+        return self._errors.pop()
+
+    def update(self, text: str) -> tuple[int, int]:
+        """Aligns a new input, e.g. the content of an entry, by removing and adding
+        the characters behind the common prefix with the current input.
+
+        Args:
+            text (str): the new input
+
+        Returns:
+            tuple[int, int]: new errors and corrected typos
+        """
+        common = 0
+        for typed, char in zip(self._text, text):
+            if typed != char:
+                break
+            common += 1
+
+        corrected = 0
+        while len(self._text) > common:
+            corrected += self.pop()
+        errors = 0
+        for char in text[common:]:
+            errors += self.push(char)
+        return errors, corrected
+
+    def _get_value(self, i: int, j: int) -> int:
+        positive, negative, _ = self._columns[j]
+        mask = (1 << i) - 1
+        return j + (positive & mask).bit_count() - (negative & mask).bit_count()
+
+    def get_edits(self) -> tuple[int, int, int]:
+        """Classifies the differences between the input and the target by a traceback
+
+        Returns:
+            tuple[int, int, int]: substitutions, insertions and omissions
+        """
+        substitutions = insertions = omissions = 0
+        i, j = self._length, len(self._text)
+        value = self.get_distance()
+        while i > 0 or j > 0:
+            if i > 0 and j > 0:
+                diagonal = self._get_value(i - 1, j - 1)
+                if self.target[i - 1] == self._text[j - 1] and diagonal == value:
+                    i, j = i - 1, j - 1
+                    continue
+                if diagonal + 1 == value:
+                    substitutions += 1
+                    i, j, value = i - 1, j - 1, diagonal
+                    continue
+            if j > 0 and self._get_value(i, j - 1) + 1 == value:
+                insertions += 1
+                j -= 1
+            else:
+                omissions += 1
+                i -= 1
+            value = self._get_value(i, j)
+        return substitutions, insertions, omissions
@@ -0,0 +1,349 @@
+"""Trend analytics over the typing history, which are vectorized with NumPy.
+
+The results are loaded straight from data.db into arrays (one entry per run),
+so every aggregate is computed without creating a Python object per run.
+The speed is measured in net words per minute (5 correct keys count as one word).
+
+Usage:
+py analytics.py [--data FILE] [--bucket day|week|month] [--user NAME]
+py analytics.py --benchmark 1000000
+
+This contains the following classes:
+- ResultArrays
+
+And the following global methods:
+- load_results
+- get_buckets
+- get_rollup
+- get_percentiles
+- get_user_progression
+
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import data
+
+# the tests of older versions didn't store their duration
+DEFAULT_DURATION = 60
+
+_RECORD_TYPE = np.dtype([
+    ("day", np.int64),
+    ("words", np.int64),
+    ("words_wrong", np.int64),
+    ("keys", np.int64),
+    ("keys_wrong", np.int64),
+    ("user", object),
+    ("duration", np.float64)
+])
+
+
+class ResultArrays():
+    """Holds the loaded results as arrays with one entry per run, ordered by insertion."""
+
+    def __init__(
+            self,
+            days: np.ndarray, users: np.ndarray, user_names: np.ndarray,
+            words: np.ndarray, words_wrong: np.ndarray,
+            keys: np.ndarray, keys_wrong: np.ndarray,
+            durations: np.ndarray = None
+        ):
+        # days since 1970-01-01
+        self.days = days
+        # index into user_names
+        self.users = users
+        self.user_names = user_names
+        self.words = words
+        self.words_wrong = words_wrong
+        self.keys = keys
+        self.keys_wrong = keys_wrong
+        # seconds per run
+        if durations is None:
+            durations = np.full(len(days), DEFAULT_DURATION, dtype=np.float64)
+        self.durations = durations
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def select(self, mask: np.ndarray):
+        """Returns the runs which match the mask
+
+        Args:
+            mask (np.ndarray): Boolean mask with one entry per run
+
+        Returns:
+            ResultArrays: The selected runs
+        """
+        return ResultArrays(
+            self.days[mask], self.users[mask], self.user_names,
+            self.words[mask], self.words_wrong[mask],
+            self.keys[mask], self.keys_wrong[mask],
+            self.durations[mask]
+        )
+
+    def select_user(self, user_name: str):
+        """Returns the runs of a user
+
+        Args:
+            user_name (str): Name of the user
+
+        Returns:
+            ResultArrays: The selected runs (empty if the user is unknown)
+        """
+        matches = np.nonzero(self.user_names == user_name)[0]
+        user = matches[0] if len(matches) else -1
+        return self.select(self.users == user)
+
+    def get_wpm(self) -> np.ndarray:
+        """Returns the net words per minute of every run
+
+        Returns:
+            np.ndarray: Correct keys / 5 per minute
+        """
+        return (self.keys - self.keys_wrong) / 5 * 60 / self.durations
+
+    def get_accuracy(self) -> np.ndarray:
+        """Returns the key accuracy of every run
+
+        Returns:
+            np.ndarray: Correct keys / keys in percent (0 for runs without keys)
+        """
+        correct = (self.keys - self.keys_wrong) * 100.0
+        return np.divide(correct, self.keys, out=np.zeros(len(self)), where=self.keys > 0)
+
+
+def load_results(data_service: data.DataService) -> ResultArrays:
+    """Loads all stored results into arrays.
+    The dates are converted to day numbers by SQLite, so only the user names are strings.
+
+    Args:
+        data_service (data.DataService): Service of the database
+
+    Returns:
+        ResultArrays: The loaded runs
+    """
+    cursor = data_service.get_connection().execute(
+        "SELECT CAST(julianday(date) - 2440587.5 AS INTEGER), "
+        f"words, words_wrong, keys, keys_wrong, user, COALESCE(duration, {DEFAULT_DURATION}) "
+        "FROM results ORDER BY id"
+    )
+    records = np.fromiter(cursor, dtype=_RECORD_TYPE)
+    user_names, users = np.unique(records["user"].astype(str), return_inverse=True)
+
+    return ResultArrays(
+        records["day"], users, user_names,
+        records["words"], records["words_wrong"],
+        records["keys"], records["keys_wrong"],
+        records["duration"]
+    )
+
+
+def get_buckets(days: np.ndarray, bucket: str = "day") -> np.ndarray:
+    """Maps day numbers to time buckets
+
+    Args:
+        days (np.ndarray): Days since 1970-01-01
+        bucket (str, optional): "day", "week" (starting on monday) or "month". Defaults to "day".
+
+    Raises:
+        ValueError: If the bucket is unknown
+
+    Returns:
+        np.ndarray: First day of the bucket of every entry
+    """
+    if bucket == "day":
+        return days
+    if bucket == "week":
+        # 1970-01-01 was a thursday
+        return (days + 3) // 7 * 7 - 3
+    if bucket == "month":
+        months = days.astype("datetime64[D]").astype("datetime64[M]")
+        return months.astype("datetime64[D]").astype(np.int64)
+    raise ValueError(f"Unknown bucket: {bucket}")
+
+
+def get_rollup(results: ResultArrays, bucket: str = "day") -> dict[str, np.ndarray]:
+    """Aggregates the runs per time bucket
+
+    Args:
+        results (ResultArrays): The runs
+        bucket (str, optional): "day", "week" or "month". Defaults to "day".
+
+    Returns:
+        dict[str, np.ndarray]: Arrays with one entry per bucket (ascending):
+        bucket (first day), runs, mean_wpm, best_wpm and accuracy (of all keys)
+    """
+    buckets, groups = np.unique(get_buckets(results.days, bucket), return_inverse=True)
+    wpm = results.get_wpm()
+    runs = np.bincount(groups, minlength=len(buckets))
+
+    best_wpm = np.full(len(buckets), -np.inf)
+    np.maximum.at(best_wpm, groups, wpm)
+
+    keys = np.bincount(groups, weights=results.keys, minlength=len(buckets))
+    keys_correct = np.bincount(
+        groups, weights=results.keys - results.keys_wrong, minlength=len(buckets)
+    )
+
+    return {
+        "bucket": buckets,
+        "runs": runs,
+        "mean_wpm": np.bincount(groups, weights=wpm, minlength=len(buckets)) / np.maximum(runs, 1),
+        "best_wpm": best_wpm,
+        "accuracy": np.divide(
+            keys_correct * 100, keys, out=np.zeros(len(buckets)), where=keys > 0
+        )
+    }
+
+
+def get_percentiles(
+        values: np.ndarray, groups: np.ndarray, percentiles=(10, 50, 90)
+    ) -> tuple[np.ndarray, np.ndarray]:
+    """Computes percentiles per group with one sort (linear interpolation like np.percentile)
+
+    Args:
+        values (np.ndarray): Values, e.g. the wpm of every run
+        groups (np.ndarray): Group of every value, e.g. the day
+        percentiles (tuple, optional): The percentiles. Defaults to (10, 50, 90).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The groups (ascending) and
+        the percentiles (one row per group, one column per percentile)
+    """
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    sorted_groups = groups[order]
+    # the groups are sorted, so every group starts where the value changes
+    starts = np.flatnonzero(np.diff(sorted_groups, prepend=sorted_groups[:1] - 1))
+    counts = np.diff(starts, append=len(sorted_groups))
+    unique_groups = sorted_groups[starts]
+
+    positions = starts[:, None] + (counts[:, None] - 1) * (np.asarray(percentiles) / 100)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, (starts + counts - 1)[:, None])
+    fraction = positions - lower
+
+    result = sorted_values[lower] * (1 - fraction) + sorted_values[upper] * fraction
+    return unique_groups, result
+
+
+def get_user_progression(results: ResultArrays, window: int = 10) -> dict[str, np.ndarray]:
+    """Compares the first and the latest runs of every user
+
+    Args:
+        results (ResultArrays): The runs
+        window (int, optional): Amount of runs at the start and at the end. Defaults to 10.
+
+    Returns:
+        dict[str, np.ndarray]: Arrays with one entry per user: user (name), runs,
+        first_wpm and last_wpm (mean of the first and last runs) and best_wpm
+    """
+    order = np.lexsort((np.arange(len(results)), results.days, results.users))
+    users = results.users[order]
+    wpm = results.get_wpm()[order]
+
+    runs = np.bincount(users, minlength=len(results.user_names))
+    starts = np.concatenate(([0], np.cumsum(runs)[:-1]))
+    rank = np.arange(len(users)) - starts[users]
+
+    first = rank < window
+    last = rank >= (runs[users] - window)
+    taken = np.minimum(runs, window)
+    divisor = np.maximum(taken, 1)
+
+    best_wpm = np.full(len(runs), -np.inf)
+    np.maximum.at(best_wpm, users, wpm)
+
+    return {
+        "user": results.user_names,
+        "runs": runs,
+        "first_wpm": np.bincount(users[first], weights=wpm[first], minlength=len(runs)) / divisor,
+        "last_wpm": np.bincount(users[last], weights=wpm[last], minlength=len(runs)) / divisor,
+        "best_wpm": best_wpm
+    }
+
+
+def _format_day(day: int) -> str:
+    return str(np.datetime64(int(day), "D"))
+
+
+def _print_report(results: ResultArrays, bucket: str):
+    print(f"{len(results)} runs of {len(np.unique(results.users))} users")
+    if len(results) == 0:
+        return
+
+    rollup = get_rollup(results, bucket)
+    buckets, percentiles = get_percentiles(
+        results.get_wpm(), get_buckets(results.days, bucket)
+    )
+    print(f"\n{'Bucket':<12}{'Runs':>8}{'WPM p10':>10}{'p50':>8}{'p90':>8}{'Best':>8}{'Accuracy':>10}")
+    for i, first_day in enumerate(buckets):
+        print(
+            f"{_format_day(first_day):<12}{rollup['runs'][i]:>8}"
+            f"{percentiles[i, 0]:>10.1f}{percentiles[i, 1]:>8.1f}{percentiles[i, 2]:>8.1f}"
+            f"{rollup['best_wpm'][i]:>8.1f}{rollup['accuracy'][i]:>9.1f} %"
+        )
+
+    progression = get_user_progression(results)
+    print(f"\n{'User':<20}{'Runs':>8}{'First WPM':>12}{'Last WPM':>12}{'Best':>8}")
+    for i, user in enumerate(progression["user"]):
+        if progression["runs"][i] == 0:
+            continue
+        print(
+            f"{user or '(unknown)':<20}{progression['runs'][i]:>8}"
+            f"{progression['first_wpm'][i]:>12.1f}{progression['last_wpm'][i]:>12.1f}"
+            f"{progression['best_wpm'][i]:>8.1f}"
+        )
+
+
+def _create_random_results(amount: int) -> ResultArrays:
+    generator = np.random.default_rng(0)
+    keys = generator.integers(100, 450, amount)
+    words = keys // 5
+    return ResultArrays(
+        np.sort(generator.integers(19000, 20500, amount)),
+        generator.integers(0, 50, amount),
+        np.array([f"user{i}" for i in range(50)]),
+        words, generator.binomial(words, 0.05),
+        keys, generator.binomial(keys, 0.03)
+    )
+
+
+def _benchmark(amount: int):
+    results = _create_random_results(amount)
+    measurements = {
+        "daily rollup": lambda: get_rollup(results, "day"),
+        "monthly rollup": lambda: get_rollup(results, "month"),
+        "daily wpm percentiles": lambda: get_percentiles(results.get_wpm(), results.days),
+        "user progression": lambda: get_user_progression(results)
+    }
+
+    print(f"{amount} runs")
+    for name, measurement in measurements.items():
+        start = time.perf_counter()
+        measurement()
+        print(f"\t{name:<24}{(time.perf_counter() - start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shows trends of the typing history")
+    parser.add_argument("--data", default=None,
+                        help="database of the typing test (default: data.db in the data directory)")
+    parser.add_argument("--bucket", default="day", choices=["day", "week", "month"])
+    parser.add_argument("--user", help="only show the runs of this user")
+    parser.add_argument("--benchmark", type=int, metavar="RUNS",
+                        help="measure the aggregates over random runs instead")
+    arguments = parser.parse_args()
+
+    if arguments.benchmark:
+        _benchmark(arguments.benchmark)
+    else:
+        service = data.DataService(arguments.data)
+        loaded = load_results(service)
+        service.close()
+        if arguments.user is not None:
+            loaded = loaded.select_user(arguments.user)
+        _print_report(loaded, arguments.bucket)
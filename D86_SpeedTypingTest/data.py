@@ -1,13 +1,101 @@
 """Contains the logic to save and load test summaries.
 
+The test results are stored in a SQLite database (data.db). An index on
+(keys_correct DESC, keys_wrong ASC) serves the scoreboard order, so saving a run
+is a single insert and loading the best runs doesn't read the whole history.
+The best runs are additionally kept in a bounded heap, which is seeded from the index and
+updated on every save. It's only seeded again if another connection (e.g. another instance)
+committed in the meantime (PRAGMA data_version), so the scoreboard usually doesn't read
+any results.
+The statistics of every typed key and bigram are accumulated for the adaptive
+word selection (see word_selection.py).
+Results of older versions (data.csv) are imported once when the database is created.
+The database is opened on first use, so importing this module and creating the service
+stay cheap at application startup.
+
+The files are stored in the directory of the environment variable SPEED_TYPING_DATA_DIR
+or next to this module (independent of the working directory). The database runs in WAL mode
+with a busy timeout, so several instances of the application can use it at the same time.
+Runs and statistics are written behind on a background thread in batched transactions,
+so saving never blocks the UI. The scoreboard and the statistics include the queued writes
+in memory; only get_data waits until the pending writes are done. A queued run is added to the
+heap of the best runs when its transaction is committed, so a failed write doesn't leave it
+on the scoreboard. The error of a failed write is raised by the next save_entry or flush.
+
 This contains the following classes:
 - TestSummaryModel
 - DataService
 
+And the following global methods:
+- get_data_directory
+
+And the following global Constants:
+- DATA_DIR_VARIABLE
+
 """
 
+import heapq
+import itertools
 import os.path
-import pandas as pd
+
+DATA_DIR_VARIABLE = "SPEED_TYPING_DATA_DIR"
+# seconds a connection waits for the lock of another instance
+_BUSY_TIMEOUT = 10
+# attempts of the writer, if the database stays locked
+_WRITE_ATTEMPTS = 3
+
+# every entry upgrades the schema by one version (PRAGMA user_version)
+_MIGRATIONS = [
+    """
+    CREATE TABLE results (
+        id INTEGER PRIMARY KEY,
+        date TEXT NOT NULL,
+        words INTEGER NOT NULL,
+        words_wrong INTEGER NOT NULL,
+        keys INTEGER NOT NULL,
+        keys_wrong INTEGER NOT NULL,
+        keys_correct INTEGER NOT NULL
+    );
+    CREATE INDEX results_by_score ON results (keys_correct DESC, keys_wrong ASC);
+    """,
+    """
+    ALTER TABLE results ADD COLUMN user TEXT NOT NULL DEFAULT ''
+    """,
+    """
+    CREATE TABLE ngram_statistics (
+        ngram TEXT PRIMARY KEY,
+        count INTEGER NOT NULL,
+        errors INTEGER NOT NULL,
+        latency_count INTEGER NOT NULL,
+        latency_ms REAL NOT NULL
+    )
+    """,
+    """
+    ALTER TABLE results ADD COLUMN started_at TEXT;
+    ALTER TABLE results ADD COLUMN ended_at TEXT;
+    ALTER TABLE results ADD COLUMN duration REAL
+    """
+]
+
+_RESULT_COLUMNS = "date, words, words_wrong, keys, keys_wrong, user, started_at, ended_at, duration"
+_INSERT_RESULT = f"INSERT INTO results ({_RESULT_COLUMNS}, keys_correct) VALUES ({', '.join('?' * 10)})"
+_UPSERT_NGRAM = (
+    "INSERT INTO ngram_statistics VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (ngram) DO UPDATE SET "
+    "count = count + excluded.count, errors = errors + excluded.errors, "
+    "latency_count = latency_count + excluded.latency_count, "
+    "latency_ms = latency_ms + excluded.latency_ms"
+)
+
+
+def get_data_directory() -> str:
+    """Returns the directory of data.db and data.csv
+
+    Returns:
+        str: SPEED_TYPING_DATA_DIR or the directory of this module
+    """
+    return os.environ.get(DATA_DIR_VARIABLE) or os.path.dirname(os.path.abspath(__file__))
+
 
 class TestSummaryModel:
     """Data model which stores information about a speed typing test.
@@ -16,9 +104,16 @@ class TestSummaryModel:
             self,
             date: str,
             words: int, words_wrong: int,
-            keys: int, keys_wrong: int
+            keys: int, keys_wrong: int,
+            user: str = "",
+            started_at: str = None, ended_at: str = None, duration: float = None
         ):
         self.date = date
+        self.user = user
+        # precise wall clock times (ISO format) and the measured duration in seconds
+        self.started_at = started_at
+        self.ended_at = ended_at
+        self.duration = duration
 
         self.words = words
         self.words_wrong = words_wrong
@@ -31,56 +126,326 @@ class TestSummaryModel:
         self.keys_accuracy = round(self.keys_correct * 100 / self.keys, 2)
 
 class DataService:
-    """This service is used to connect to data.csv which holds the past test results.
+    """This service is used to connect to data.db which holds the past test results.
     """
-    def __init__(self):
-        self._data_file = "data.csv"
+    def __init__(self, data_file: str = None, csv_file: str = None, top_size: int = 10):
+        """Creates the service; the database is opened on first use.
 
-    def get_data(self) -> list[TestSummaryModel]:
-        """Loads the past test results from data.csv, 
-        orders the list (correct keys (descending); wrong keys (ascending)) 
-        and converts the entries to TestSummaryModel.
+        Args:
+            data_file (str, optional): the database. Defaults to data.db in get_data_directory().
+            csv_file (str, optional): results of older versions. Defaults to data.csv
+            in the directory of the database.
+            top_size (int, optional): amount of best runs kept in memory. Defaults to 10.
+        """
+        self._data_file = data_file or os.path.join(get_data_directory(), "data.db")
+        self._csv_file = csv_file or os.path.join(os.path.dirname(self._data_file), "data.csv")
+        self._top_size = top_size
+        # min-heap of (keys_correct, -keys_wrong, -id, entry), so the root is the worst top entry
+        self._top_entries = None
+        # PRAGMA data_version when the heap was seeded
+        self._data_version = None
+        # ids of runs which aren't written yet; they rank behind the stored runs like new rows
+        self._pending_ids = itertools.count(2**62)
+        self._connection = None
+        self._writes = None
+        self._writer = None
+        self._write_error = None
+        self._write_ids = itertools.count()
+        self._lock = None
+        # statistics and runs of queued writes by their id, which aren't committed yet
+        self._pending_statistics = {}
+        self._pending_entries = {}
+
+    def _connect(self):
+        import sqlite3
+
+        connection = sqlite3.connect(self._data_file, timeout=_BUSY_TIMEOUT)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    def get_connection(self):
+        """Opens the database and upgrades its schema on first use.
+        The connection can be used for bulk queries, e.g. by the analytics.
+
+        Returns:
+            sqlite3.Connection: connection to data.db
+        """
+        if self._connection is None:
+            self._connection = self._connect()
+            self._migrate()
+        return self._connection
+
+    def _migrate(self):
+        """Upgrades the database schema and imports data.csv when the database is created."""
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version >= len(_MIGRATIONS):
+            return
+
+        with self._connection:
+            # another instance may have migrated in the meantime
+            self._connection.execute("BEGIN IMMEDIATE")
+            version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+            for migration in _MIGRATIONS[version:]:
+                for statement in migration.split(";"):
+                    if statement.strip():
+                        self._connection.execute(statement)
+            if version == 0:
+                self._import_csv()
+            self._connection.execute(f"PRAGMA user_version = {len(_MIGRATIONS)}")
+
+    def _import_csv(self):
+        """Imports the results of data.csv (the file is kept as it is)."""
+        if not os.path.exists(self._csv_file):
+            return
+
+        import csv
+
+        with open(self._csv_file, "r", encoding="utf-8", newline="") as file:
+            rows = [
+                (
+                    row["date"],
+                    int(row["words"]), int(row["words_wrong"]),
+                    int(row["keys"]), int(row["keys_wrong"]),
+                    row.get("user", ""),
+                    None, None, None,
+                    int(row["keys"]) - int(row["keys_wrong"])
+                )
+                for row in csv.DictReader(file)
+            ]
+
+        self._connection.executemany(_INSERT_RESULT, rows)
+
+    def get_data(self, limit: int = None) -> list[TestSummaryModel]:
+        """Loads the past test results from data.db,
+        ordered by correct keys (descending) and wrong keys (ascending).
+
+        Args:
+            limit (int, optional): Maximum amount of results. Defaults to None (all results).
 
         Returns:
             list[TestSummaryModel]: List of previous speed typing tests
         """
-        result = []
-        if not os.path.exists(self._data_file):
-            return result
-
-        df = pd.read_csv(self._data_file).sort_values(
-            ["keys_correct", "keys_wrong"],
-            ascending=[False,True])
-
-        for _, row in df.iterrows():
-            date = row["date"]
-            words = row["words"]
-            words_wrong = row["words_wrong"]
-            keys = row["keys"]
-            keys_wrong = row["keys_wrong"]
-
-            result.append(TestSummaryModel(date, words, words_wrong, keys, keys_wrong))
-        return result
+        query = (
+            f"SELECT {_RESULT_COLUMNS} FROM results "
+            "ORDER BY keys_correct DESC, keys_wrong ASC, id ASC"
+        )
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+
+        connection = self.get_connection()
+        self.flush()
+        return [TestSummaryModel(*row) for row in connection.execute(query)]
+
+    def get_top_entries(self, amount: int = 5) -> list[TestSummaryModel]:
+        """Returns the best test results in scoreboard order. The database is only queried
+        on the first call and if another connection committed since the last call.
+
+        Args:
+            amount (int, optional): Amount of results, at most top_size. Defaults to 5.
+
+        Returns:
+            list[TestSummaryModel]: The best speed typing tests
+        """
+        if amount > self._top_size:
+            return self.get_data(amount)
+
+        connection = self.get_connection()
+        if self._lock is None:
+            self._seed_top_entries(connection)
+            return [x[3] for x in heapq.nlargest(amount, self._top_entries)]
+
+        # the writer can't commit in the meantime, so a run is either read or still queued
+        with self._lock:
+            self._seed_top_entries(connection)
+            # queued runs rank behind the committed ones with the same score
+            items = self._top_entries + [
+                (entry.keys_correct, -entry.keys_wrong, -(2**63 + write_id), entry)
+                for write_id, entry in self._pending_entries.items()
+            ]
+        return [x[3] for x in heapq.nlargest(amount, items)]
+
+    def _seed_top_entries(self, connection):
+        data_version = connection.execute("PRAGMA data_version").fetchone()[0]
+        if self._top_entries is not None and data_version == self._data_version:
+            return
+
+        query = (
+            f"SELECT id, {_RESULT_COLUMNS} FROM results "
+            "ORDER BY keys_correct DESC, keys_wrong ASC, id ASC LIMIT ?"
+        )
+        self._data_version = data_version
+        self._top_entries = []
+        for row_id, *values in connection.execute(query, (self._top_size,)):
+            self._push_top_entry(row_id, TestSummaryModel(*values))
+
+    def _push_top_entry(self, row_id: int, entry: TestSummaryModel):
+        item = (entry.keys_correct, -entry.keys_wrong, -row_id, entry)
+        if len(self._top_entries) < self._top_size:
+            heapq.heappush(self._top_entries, item)
+        elif item[:3] > self._top_entries[0][:3]:
+            heapq.heapreplace(self._top_entries, item)
+
+    def _write_behind(
+            self, statement: str, rows: list[tuple],
+            statistics: dict[str, list] = None, entry: TestSummaryModel = None
+        ):
+        """Queues rows for the writer thread, which is started on first use. Queued statistics
+        and runs stay visible to get_ngram_statistics and get_top_entries until they are committed."""
+        if self._writer is None:
+            import queue
+            import threading
+
+            # the schema must be up to date before the writer inserts
+            self.get_connection()
+            self._writes = queue.Queue()
+            self._lock = threading.Lock()
+            self._writer = threading.Thread(target=self._write_loop, name="data-writer", daemon=True)
+            self._writer.start()
+
+        write_id = next(self._write_ids)
+        with self._lock:
+            if statistics is not None:
+                self._pending_statistics[write_id] = statistics
+            if entry is not None:
+                self._pending_entries[write_id] = entry
+        self._writes.put((statement, rows, write_id))
+
+    def _write_loop(self):
+        """Writes the queued rows; everything queued in the meantime is written in one transaction."""
+        connection = None
+        stop = False
+        while not stop:
+            batch = [self._writes.get()]
+            while not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            stop = batch[-1] is None
+            writes = [x for x in batch if x is not None]
+
+            try:
+                if writes:
+                    if connection is None:
+                        connection = self._connect()
+                    self._write_batch(connection, writes)
+            except Exception as error:  # pylint: disable=broad-except
+                # the thread has to survive, otherwise flush would wait forever
+                self._write_error = error
+            finally:
+                # the runs of a failed write are dropped, not added to the best runs
+                with self._lock:
+                    for _, _, write_id in writes:
+                        self._pending_statistics.pop(write_id, None)
+                        self._pending_entries.pop(write_id, None)
+                for _ in batch:
+                    self._writes.task_done()
+
+        if connection is not None:
+            connection.close()
+
+    def _write_batch(self, connection, writes: list[tuple]):
+        import sqlite3
+        import time
+
+        for attempt in range(_WRITE_ATTEMPTS):
+            try:
+                for statement, rows, _ in writes:
+                    connection.executemany(statement, rows)
+                # the queued statistics and runs are moved together with the commit,
+                # so get_ngram_statistics and get_top_entries never count them twice or miss them
+                with self._lock:
+                    connection.commit()
+                    for _, _, write_id in writes:
+                        self._pending_statistics.pop(write_id, None)
+                        entry = self._pending_entries.pop(write_id, None)
+                        if entry is not None and self._top_entries is not None:
+                            self._push_top_entry(next(self._pending_ids), entry)
+                return
+            except sqlite3.OperationalError:
+                connection.rollback()
+                # retry if the lock of another instance outlasted the busy timeout
+                if attempt == _WRITE_ATTEMPTS - 1:
+                    raise
+                time.sleep(1)
+
+    def flush(self):
+        """Waits until all queued writes are stored.
+
+        Raises:
+            sqlite3.Error: if queued rows couldn't be written, e.g. the database stayed locked
+        """
+        if self._writer is not None:
+            self._writes.join()
+        self._raise_write_error()
+
+    def _raise_write_error(self):
+        if self._write_error is not None:
+            error, self._write_error = self._write_error, None
+            raise error
 
     def save_entry(self, new_entry: TestSummaryModel):
-        """Loads all existing entries from data.csv, 
-        extends the list with the new entry and saves the result.
+        """Queues the new entry for data.db; the best results include it immediately.
 
         Args:
             new_entry (TestSummaryModel): test result to add
+
+        Raises:
+            sqlite3.Error: if an earlier run couldn't be written; the new entry isn't queued
+        """
+        self._raise_write_error()
+        self._write_behind(_INSERT_RESULT, [(
+            new_entry.date,
+            new_entry.words, new_entry.words_wrong,
+            new_entry.keys, new_entry.keys_wrong,
+            new_entry.user,
+            new_entry.started_at, new_entry.ended_at, new_entry.duration,
+            new_entry.keys_correct
+        )], entry=new_entry)
+
+    def save_ngram_statistics(self, statistics: dict[str, list]):
+        """Queues the key and bigram statistics of a run, which are added to the stored ones.
+
+        Args:
+            statistics (dict[str, list]): count, errors, amount of latencies and their sum (ms)
+            per key/bigram (see word_selection.collect_ngram_statistics)
+        """
+        self._write_behind(
+            _UPSERT_NGRAM, [(ngram, *values) for ngram, values in statistics.items()], statistics
+        )
+
+    def get_ngram_statistics(self) -> dict[str, list]:
+        """Loads the accumulated key and bigram statistics of all runs.
+        Queued statistics are added in memory, so this doesn't wait for the writer.
+
+        Returns:
+            dict[str, list]: count, errors, amount of latencies and their sum (ms) per key/bigram
         """
-        new_row = pd.DataFrame({
-            "date": [new_entry.date],
-            "words": [new_entry.words],
-            "words_wrong": [new_entry.words_wrong],
-            "keys": [new_entry.keys],
-            "keys_wrong": [new_entry.keys_wrong],
-            "keys_correct": [new_entry.keys_correct]
-        })
-
-        if os.path.exists(self._data_file):
-            df = pd.concat([pd.read_csv(self._data_file), new_row], ignore_index=True)
-        else:
-            df = new_row
-
-        df.to_csv(self._data_file, index=False)
+        connection = self.get_connection()
+        if self._lock is None:
+            return self._read_ngram_statistics(connection)
+
+        with self._lock:
+            result = self._read_ngram_statistics(connection)
+            for statistics in self._pending_statistics.values():
+                for ngram, values in statistics.items():
+                    stored = result.setdefault(ngram, [0, 0, 0, 0.0])
+                    for i, value in enumerate(values):
+                        stored[i] += value
+        return result
+
+    @staticmethod
+    def _read_ngram_statistics(connection) -> dict[str, list]:
+        return {
+            ngram: list(values)
+            for ngram, *values in connection.execute("SELECT * FROM ngram_statistics")
+        }
+
+    def close(self):
+        """Writes the queued entries, stops the writer and closes the database connection."""
+        if self._writer is not None:
+            self._writes.put(None)
+            self._writer.join()
+            self._writer = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        self.flush()
@@ -0,0 +1,271 @@
+"""Contains the latency instrumentation of the Tk user interface.
+
+The instrumentation is only created if it's enabled (main.py --profile or the environment
+variable SPEED_TYPING_PROFILE). Otherwise nothing is wrapped or bound, so it has no overhead.
+When enabled, it measures:
+- key queue delay: time a key event waited in the event queue (arrival in Python compared to
+  the timestamp of the window system, relative to the smallest difference seen)
+- key to idle: time from the arrival of a key event until the main loop is idle again,
+  i.e. the handlers ran and the widgets were redrawn
+- the duration of instrumented methods, e.g. RunTestFrame.pressed or WordTable.apply_changes
+  (the reconfigures of the word table happen there since the typing engine marks the words)
+- main loop stalls: lateness of an after() callback, which is scheduled every few milliseconds
+
+The measurements are printed as histograms when the window is closed and can be exported as
+Chrome trace events (open the JSON file in chrome://tracing or https://ui.perfetto.dev).
+
+This contains the following classes:
+- Histogram
+- Instrumentation
+
+And the following global methods:
+- create
+
+And the following global Constants:
+- PROFILE_VARIABLE
+- HISTOGRAM_BUCKETS
+
+"""
+
+import bisect
+import functools
+import os
+import time
+from array import array
+
+PROFILE_VARIABLE = "SPEED_TYPING_PROFILE"
+# upper bounds of the histogram buckets in ms
+HISTOGRAM_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 16, 33, 50, 100, 250, 1000]
+# more trace events are dropped, so a long session doesn't fill the memory
+_MAX_TRACE_EVENTS = 1_000_000
+# binding tag in front of the tags of a watched widget, so its handlers run first
+_ARRIVAL_TAG = "KeyArrival"
+
+
+class Histogram:
+    """Distribution of durations in ms."""
+    def __init__(self):
+        self.counts = array("L", [0]) * (len(HISTOGRAM_BUCKETS) + 1)
+        self._samples = array("d")
+
+    def add(self, value_ms: float):
+        """Adds a duration
+
+        Args:
+            value_ms (float): the duration in ms
+        """
+        self.counts[bisect.bisect_left(HISTOGRAM_BUCKETS, value_ms)] += 1
+        self._samples.append(value_ms)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def get_percentile(self, percentile: float) -> float:
+        """Returns a percentile of the durations
+
+        Args:
+            percentile (float): e.g. 99
+
+        Returns:
+            float: the duration in ms (0 without durations)
+        """
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+    def get_buckets(self) -> list[tuple[str, int]]:
+        """Returns the histogram
+
+        Returns:
+            list[tuple[str, int]]: label of the bucket (e.g. "< 16 ms") and amount of durations
+        """
+        labels = [f"< {x} ms" for x in HISTOGRAM_BUCKETS] + [f">= {HISTOGRAM_BUCKETS[-1]} ms"]
+        return list(zip(labels, self.counts))
+
+    def format(self, name: str) -> str:
+        """Formats the statistics and the used buckets of the histogram
+
+        Args:
+            name (str): name of the measurement
+
+        Returns:
+            str: one line with the statistics and one line per used bucket
+        """
+        lines = [
+            f"{name}: {len(self)} samples, p50 {self.get_percentile(50):.3f} ms, "
+            f"p99 {self.get_percentile(99):.3f} ms, max {max(self._samples, default=0):.3f} ms"
+        ]
+        total = max(len(self), 1)
+        for label, count in self.get_buckets():
+            if count:
+                lines.append(f"\t{label:>12} {count:8} {'#' * round(count * 40 / total)}")
+        return "\n".join(lines)
+
+
+class Instrumentation:
+    """Measures key handling, method durations and stalls of a Tk main loop."""
+    def __init__(self, root, trace_file: str = None, stall_interval_ms: int = 10):
+        """Creates the instrumentation and starts the stall sampler
+
+        Args:
+            root (tk.Tk): the main window
+            trace_file (str, optional): file of the Chrome trace events. Defaults to None.
+            stall_interval_ms (int, optional): interval of the stall sampler. Defaults to 10.
+        """
+        self._root = root
+        self._trace_file = trace_file
+        self._stall_interval_ms = stall_interval_ms
+        self.histograms = {}
+        self._events = [] if trace_file else None
+        self._origin_ns = time.monotonic_ns()
+        # smallest difference between arrival and timestamp of the window system
+        self._event_offset_ms = None
+        self._pending_keys = []
+        self._idle_job = None
+        self._stall_due_ns = None
+        self._sample_stalls()
+
+    def _get_histogram(self, name: str) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def _trace(self, name: str, start_ns: int, end_ns: int, args: dict = None):
+        if self._events is None or len(self._events) >= _MAX_TRACE_EVENTS:
+            return
+        event = {
+            "name": name, "ph": "X", "pid": 1, "tid": 1,
+            "ts": (start_ns - self._origin_ns) / 1000, "dur": (end_ns - start_ns) / 1000
+        }
+        if args:
+            event["args"] = args
+        self._events.append(event)
+
+    def record(self, name: str, start_ns: int, end_ns: int, args: dict = None):
+        """Records a measured duration in its histogram and as trace event
+
+        Args:
+            name (str): name of the measurement
+            start_ns (int): monotonic timestamp of the start
+            end_ns (int): monotonic timestamp of the end
+            args (dict, optional): details of the trace event. Defaults to None.
+        """
+        self._get_histogram(name).add((end_ns - start_ns) / 1e6)
+        self._trace(name, start_ns, end_ns, args)
+
+    def instrument(self, instance, method_name: str, name: str = None):
+        """Replaces a method of an instance by a timed one. This must happen before the
+        method is bound to an event, because a binding keeps the original method.
+
+        Args:
+            instance (object): e.g. a widget
+            method_name (str): name of the method
+            name (str, optional): name of the measurement.
+            Defaults to the class name and the method name.
+        """
+        method = getattr(instance, method_name)
+        name = name or f"{type(instance).__name__}.{method_name}"
+        clock = time.monotonic_ns
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start_ns = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(name, start_ns, clock())
+
+        setattr(instance, method_name, timed)
+
+    def watch_keys(self, widget):
+        """Timestamps the key events of a widget on arrival (before any other handler)
+        and measures the time until the main loop is idle again.
+        A key event only runs the tags of the widget with the focus, so watching a window and
+        one of its widgets doesn't count an event twice.
+
+        Args:
+            widget (tk.Widget): e.g. the main window or the input of the test
+        """
+        if _ARRIVAL_TAG in widget.bindtags():
+            return
+        widget.bindtags((_ARRIVAL_TAG,) + widget.bindtags())
+        widget.bind_class(_ARRIVAL_TAG, "<KeyPress>", self._key_arrived)
+        widget.bind_class(_ARRIVAL_TAG, "<KeyRelease>", self._key_arrived)
+
+    def _key_arrived(self, event):
+        arrival_ns = time.monotonic_ns()
+        # the window system timestamp has its own origin, so only the delay relative to
+        # the fastest event is meaningful
+        offset_ms = arrival_ns / 1e6 - event.time
+        if self._event_offset_ms is None or offset_ms < self._event_offset_ms:
+            self._event_offset_ms = offset_ms
+        delay_ms = offset_ms - self._event_offset_ms
+        self._get_histogram("key queue delay").add(delay_ms)
+
+        self._pending_keys.append((arrival_ns, f"{event.type} {event.keysym}"))
+        if self._idle_job is None:
+            self._idle_job = self._root.after_idle(self._keys_handled)
+
+    def _keys_handled(self):
+        self._idle_job = None
+        now_ns = time.monotonic_ns()
+        for arrival_ns, key in self._pending_keys:
+            self.record("key to idle", arrival_ns, now_ns, {"key": key})
+        self._pending_keys = []
+
+    def _sample_stalls(self):
+        now_ns = time.monotonic_ns()
+        if self._stall_due_ns is not None:
+            lateness_ns = max(0, now_ns - self._stall_due_ns)
+            self._get_histogram("main loop stall").add(lateness_ns / 1e6)
+            if lateness_ns >= 5_000_000:
+                self._trace("main loop stall", self._stall_due_ns, now_ns)
+        self._stall_due_ns = now_ns + self._stall_interval_ms * 1_000_000
+        self._root.after(self._stall_interval_ms, self._sample_stalls)
+
+    def get_report(self) -> str:
+        """Formats all histograms
+
+        Returns:
+            str: the report
+        """
+        return "\n".join(
+            histogram.format(name) for name, histogram in sorted(self.histograms.items())
+        )
+
+    def export_trace(self, path: str):
+        """Writes the trace events in the Chrome trace event format
+
+        Args:
+            path (str): the JSON file
+        """
+        import json
+
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": self._events or [], "displayTimeUnit": "ms"}, file)
+
+    def close(self):
+        """Prints the report and writes the trace file (if any)."""
+        print(self.get_report())
+        if self._trace_file:
+            self.export_trace(self._trace_file)
+            print(f"Trace events written to {self._trace_file}")
+
+
+def create(root, profile: str = None) -> Instrumentation:
+    """Creates the instrumentation, if it's enabled
+
+    Args:
+        root (tk.Tk): the main window
+        profile (str, optional): "1" for histograms only or the path of a trace file (.json).
+        Defaults to the environment variable SPEED_TYPING_PROFILE.
+
+    Returns:
+        Instrumentation: the instrumentation or None if it's disabled
+    """
+    profile = profile or os.environ.get(PROFILE_VARIABLE)
+    if not profile or profile == "0":
+        return None
+    return Instrumentation(root, profile if profile.endswith(".json") else None)
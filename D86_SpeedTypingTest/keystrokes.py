@@ -0,0 +1,264 @@
+"""Contains the keystroke log and the live metrics of a speed typing test.
+
+This contains the following classes:
+- KeystrokeLog
+- MetricsEngine
+
+"""
+
+import time
+from array import array
+
+NOT_A_CHARACTER = -1
+WRONG = 0
+CORRECT = 1
+
+# upper bounds (ms) of the inter-key latency histogram; the last bucket is open
+LATENCY_BUCKETS = [25, 50, 75, 100, 150, 200, 300, 500, 1000, 2000]
+
+
+class KeystrokeLog:
+    """Ring buffer, which stores timestamp, keysym and correctness of the latest keystrokes
+    in compact arrays. Every keystroke gets a sequence number, starting at 0.
+    """
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self._timestamps = array("q", [0]) * capacity
+        self._keysyms = array("H", [0]) * capacity
+        self._correctness = array("b", [0]) * capacity
+        self._keysym_ids = {}
+        self._keysym_names = []
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def get_count(self) -> int:
+        """Returns the amount of keystrokes since the last reset, including overwritten ones.
+
+        Returns:
+            int: sequence number of the next keystroke
+        """
+        return self._count
+
+    def append(self, timestamp_ns: int, keysym: str, correctness: int):
+        """Adds a keystroke and overwrites the oldest one if the buffer is full.
+
+        Args:
+            timestamp_ns (int): monotonic timestamp of the keystroke in nanoseconds
+            keysym (str): tkinter keysym, e.g. "a", "space" or "BackSpace"
+            correctness (int): CORRECT, WRONG or NOT_A_CHARACTER
+        """
+        keysym_id = self._keysym_ids.get(keysym)
+        if keysym_id is None:
+            keysym_id = len(self._keysym_names)
+            self._keysym_ids[keysym] = keysym_id
+            self._keysym_names.append(keysym)
+
+        i = self._count % self.capacity
+        self._timestamps[i] = timestamp_ns
+        self._keysyms[i] = keysym_id
+        self._correctness[i] = correctness
+        self._count += 1
+
+    def get(self, sequence: int) -> tuple:
+        """Returns a keystroke by its sequence number.
+
+        Args:
+            sequence (int): sequence number of the keystroke
+
+        Raises:
+            IndexError: if the keystroke was overwritten or doesn't exist yet
+
+        Returns:
+            tuple: timestamp (ns), keysym and correctness
+        """
+        if not self._count - len(self) <= sequence < self._count:
+            raise IndexError(f"Keystroke {sequence} isn't available")
+        i = sequence % self.capacity
+        return (
+            self._timestamps[i],
+            self._keysym_names[self._keysyms[i]],
+            self._correctness[i]
+        )
+
+    def get_timestamp(self, sequence: int) -> int:
+        """Returns the timestamp of a keystroke without creating a tuple.
+
+        Args:
+            sequence (int): sequence number of a keystroke in the buffer
+
+        Returns:
+            int: timestamp in nanoseconds
+        """
+        return self._timestamps[sequence % self.capacity]
+
+    def get_correctness(self, sequence: int) -> int:
+        """Returns the correctness of a keystroke without creating a tuple.
+
+        Args:
+            sequence (int): sequence number of a keystroke in the buffer
+
+        Returns:
+            int: CORRECT, WRONG or NOT_A_CHARACTER
+        """
+        return self._correctness[sequence % self.capacity]
+
+    def __iter__(self):
+        for sequence in range(self._count - len(self), self._count):
+            yield self.get(sequence)
+
+    def reset(self):
+        """Removes all keystrokes (the buffers are reused)."""
+        self._count = 0
+
+
+class _SlidingWindow:
+    """Counts the character keystrokes of the last window_ns nanoseconds."""
+    def __init__(self, log: KeystrokeLog, window_ns: int):
+        self.window_ns = window_ns
+        self._log = log
+        self._start = 0
+        self.characters = 0
+        self.correct = 0
+
+    def add(self, sequence: int, now_ns: int):
+        """Adds a keystroke and drops the ones which left the window; amortized O(1)."""
+        correctness = self._log.get_correctness(sequence)
+        if correctness != NOT_A_CHARACTER:
+            self.characters += 1
+            self.correct += correctness
+        self.expire(now_ns)
+
+    def expire(self, now_ns: int):
+        """Drops the keystrokes which are older than the window."""
+        log = self._log
+        oldest = log.get_count() - len(log)
+        # keystrokes which were overwritten in the buffer already left the window
+        self._start = max(self._start, oldest)
+
+        while self._start < log.get_count() and log.get_timestamp(self._start) <= now_ns - self.window_ns:
+            correctness = log.get_correctness(self._start)
+            if correctness != NOT_A_CHARACTER:
+                self.characters -= 1
+                self.correct -= correctness
+            self._start += 1
+
+    def reset(self):
+        """Empties the window."""
+        self._start = 0
+        self.characters = 0
+        self.correct = 0
+
+
+class MetricsEngine:
+    """Computes live metrics from the keystrokes; every update is O(1) (amortized).
+    Only keystrokes which produce a character count as keys; e.g. Shift and BackSpace don't.
+    """
+    def __init__(
+            self,
+            log: KeystrokeLog = None,
+            window_seconds: float = 10,
+            burst_window_seconds: float = 2
+        ):
+        self.log = log or KeystrokeLog()
+        self._window = _SlidingWindow(self.log, int(window_seconds * 1e9))
+        self._burst_window = _SlidingWindow(self.log, int(burst_window_seconds * 1e9))
+        self.latency_histogram = array("L", [0]) * (len(LATENCY_BUCKETS) + 1)
+        self.keys = 0
+        self.keys_wrong = 0
+        self.burst_cpm = 0.0
+        self._first_ns = None
+        self._last_character_ns = None
+
+    def record(self, keysym: str, correctness: int, timestamp_ns: int = None):
+        """Records a keystroke and updates the metrics.
+
+        Args:
+            keysym (str): tkinter keysym, e.g. "a", "space" or "BackSpace"
+            correctness (int): CORRECT, WRONG or NOT_A_CHARACTER
+            timestamp_ns (int, optional): monotonic timestamp. Defaults to time.monotonic_ns().
+        """
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+        if self._first_ns is None:
+            self._first_ns = timestamp_ns
+
+        sequence = self.log.get_count()
+        self.log.append(timestamp_ns, keysym, correctness)
+        self._window.add(sequence, timestamp_ns)
+        self._burst_window.add(sequence, timestamp_ns)
+
+        if correctness == NOT_A_CHARACTER:
+            return
+
+        self.keys += 1
+        if correctness == WRONG:
+            self.keys_wrong += 1
+
+        if self._last_character_ns is not None:
+            latency_ms = (timestamp_ns - self._last_character_ns) // 1_000_000
+            bucket = 0
+            while bucket < len(LATENCY_BUCKETS) and latency_ms >= LATENCY_BUCKETS[bucket]:
+                bucket += 1
+            self.latency_histogram[bucket] += 1
+        self._last_character_ns = timestamp_ns
+
+        # a burst is only meaningful once the burst window is filled
+        if timestamp_ns - self._first_ns >= self._burst_window.window_ns:
+            self.burst_cpm = max(self.burst_cpm, self._get_cpm(self._burst_window, timestamp_ns))
+
+    def _get_cpm(self, window: _SlidingWindow, now_ns: int) -> float:
+        if self._first_ns is None:
+            return 0.0
+        duration_ns = min(window.window_ns, now_ns - self._first_ns)
+        if duration_ns <= 0:
+            return 0.0
+        return window.characters * 60e9 / duration_ns
+
+    def get_cpm(self, now_ns: int = None) -> float:
+        """Returns the characters per minute of the sliding window.
+
+        Args:
+            now_ns (int, optional): monotonic timestamp. Defaults to time.monotonic_ns().
+
+        Returns:
+            float: characters per minute
+        """
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        self._window.expire(now_ns)
+        return self._get_cpm(self._window, now_ns)
+
+    def get_wpm(self, now_ns: int = None) -> float:
+        """Returns the words per minute of the sliding window (5 characters count as one word).
+
+        Args:
+            now_ns (int, optional): monotonic timestamp. Defaults to time.monotonic_ns().
+
+        Returns:
+            float: words per minute
+        """
+        return self.get_cpm(now_ns) / 5
+
+    def get_latency_histogram(self) -> list[tuple[str, int]]:
+        """Returns the inter-key latencies as histogram.
+
+        Returns:
+            list[tuple[str, int]]: label of the bucket (e.g. "< 25 ms") and amount of keystrokes
+        """
+        labels = [f"< {x} ms" for x in LATENCY_BUCKETS] + [f">= {LATENCY_BUCKETS[-1]} ms"]
+        return list(zip(labels, self.latency_histogram))
+
+    def reset(self):
+        """Resets the log and all metrics for the next test."""
+        self.log.reset()
+        self._window.reset()
+        self._burst_window.reset()
+        for i in range(len(self.latency_histogram)):
+            self.latency_histogram[i] = 0
+        self.keys = 0
+        self.keys_wrong = 0
+        self.burst_cpm = 0.0
+        self._first_ns = None
+        self._last_character_ns = None
@@ -1,5 +1,46 @@
 """A Desktop program that allows you to test 
-your typing speed and compare the results with previous entries."""
+your typing speed and compare the results with previous entries.
+
+Usage:
+py main.py [--data-dir DIR] [--profile 1|TRACE.json] [--dictionary FILE] [--min-length 3] [--max-length 8] [--bands 0-2]
+"""
+import argparse
+import functools
+import os.path
+
 from ui_main import StartPage
 
-APP = StartPage()
+PARSER = argparse.ArgumentParser(description="Speed typing tester")
+PARSER.add_argument("--dictionary",
+                    help="large dictionary (one word and optionally its frequency per line), "
+                    "which is used through a memory-mapped index instead of words.txt")
+PARSER.add_argument("--min-length", type=int, default=1, help="minimal word length")
+PARSER.add_argument("--max-length", type=int, default=None, help="maximal word length")
+PARSER.add_argument("--bands", default=None,
+                    help="frequency bands of the dictionary, e.g. 0-2 for the most frequent words")
+PARSER.add_argument("--data-dir",
+                    help="directory of data.db (default: SPEED_TYPING_DATA_DIR or the program directory)")
+PARSER.add_argument("--profile",
+                    help="prints latency histograms on exit (1) and writes Chrome trace events "
+                    "to a .json file (default: SPEED_TYPING_PROFILE)")
+ARGUMENTS = PARSER.parse_args()
+
+WORD_SOURCE = None
+if ARGUMENTS.dictionary:
+    import word_index
+
+    DICTIONARY = word_index.WordIndex.open(ARGUMENTS.dictionary)
+    try:
+        BANDS = word_index.parse_bands(ARGUMENTS.bands) if ARGUMENTS.bands else None
+    except ValueError:
+        PARSER.error(f"Invalid bands '{ARGUMENTS.bands}', e.g. 2 or 0-3")
+    if DICTIONARY.count(ARGUMENTS.min_length, ARGUMENTS.max_length, BANDS) == 0:
+        PARSER.error("No word of the dictionary matches the filter")
+    WORD_SOURCE = functools.partial(
+        DICTIONARY.sample, ARGUMENTS.min_length, ARGUMENTS.max_length, BANDS
+    )
+
+DATA_FILE = os.path.join(ARGUMENTS.data_dir, "data.db") if ARGUMENTS.data_dir else None
+
+APP = StartPage(word_source=WORD_SOURCE, data_file=DATA_FILE, profile=ARGUMENTS.profile)
+APP.mainloop()
@@ -0,0 +1,188 @@
+"""Load test for the race server, which runs many rooms with bots over local loopback.
+
+Each bot joins a room, derives the words of the race from the seed of the room and types them
+with a given speed. The key events are sent in batches (like a client which flushes its input
+every few milliseconds). The latency is measured from sending a batch until a standings
+message contains its keys, so it includes the tick interval of the server.
+The result contains the key events per second, the standings messages per second and
+the p50/p99 latency.
+
+Usage:
+py race_load_test.py --rooms 200 --room-size 4 --duration 10
+(starts its own server; use --port to test an already running server)
+
+This contains the following global methods:
+- run_bot
+- run_load_test
+
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import time
+
+from race_server import RaceServer, create_word_source, load_words
+
+
+async def run_bot(
+        name: str, room: str, host: str, port: int, words: list[str],
+        wpm: float, batch_interval: float, statistics: dict
+    ):
+    """Connects a bot which types one race without mistakes.
+
+    Args:
+        name (str): Name of the bot
+        room (str): Room to join
+        host (str): Address of the server
+        port (int): Port of the server
+        words (list[str]): Word list of the server
+        wpm (float): Typing speed (5 keys per word)
+        batch_interval (float): Seconds between two batches of key events
+        statistics (dict): Receives "keys", "standings" and the "latencies" in seconds
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    # (correct keys after the batch, send time)
+    pending = collections.deque()
+    typist = None
+
+    def send(message: dict):
+        writer.write(json.dumps(message).encode() + b"\n")
+
+    async def type_words(seed: int):
+        next_word = create_word_source(words, seed)
+        keys_per_batch = wpm * 5 / 60 * batch_interval
+        queue = []
+        keys = 0
+        due = 0.0
+        start = time.perf_counter()
+        batches = 0
+        while True:
+            batches += 1
+            due += keys_per_batch
+            batch = []
+            while len(batch) < due:
+                if not queue:
+                    queue = [[x, x] for x in next_word()] + [["space", " "]]
+                batch.append(queue.pop(0))
+            due -= len(batch)
+            keys += len(batch)
+            pending.append((keys, time.perf_counter()))
+            send({"type": "keys", "keys": batch})
+            statistics["keys"] += len(batch)
+            await asyncio.sleep(max(0.0, start + batches * batch_interval - time.perf_counter()))
+
+    try:
+        send({"type": "join", "name": name, "room": room})
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            message = json.loads(line)
+            message_type = message["type"]
+
+            if message_type == "joined":
+                seed = message["seed"]
+            elif message_type == "start":
+                typist = asyncio.get_running_loop().create_task(type_words(seed))
+            elif message_type == "standings":
+                statistics["standings"] += 1
+                now = time.perf_counter()
+                keys = next(x["keys"] for x in message["players"] if x["name"] == name)
+                while pending and pending[0][0] <= keys:
+                    statistics["latencies"].append(now - pending.popleft()[1])
+            elif message_type == "finished":
+                return
+            elif message_type == "error":
+                raise RuntimeError(message["message"])
+    finally:
+        if typist is not None:
+            typist.cancel()
+        writer.close()
+
+
+async def run_load_test(
+        rooms: int, room_size: int, host: str, port: int, start_server: bool,
+        duration: float, tick_rate: float, wpm: float, batch_interval: float
+    ) -> tuple[dict, float, RaceServer]:
+    """Runs one race in every room and measures the duration.
+
+    Args:
+        rooms (int): Amount of concurrent rooms
+        room_size (int): Bots per room
+        host (str): Address of the server
+        port (int): Port of the server
+        start_server (bool): Starts a server in this process, otherwise an existing one is used
+        duration (float): Seconds per race of the own server
+        tick_rate (float): Standings per second of the own server
+        wpm (float): Typing speed of the bots
+        batch_interval (float): Seconds between two batches of key events
+
+    Returns:
+        tuple[dict, float, RaceServer]: The statistics, the duration in seconds
+        and the own server (or None)
+    """
+    words = load_words()
+    race_server = None
+    server = None
+    if start_server:
+        race_server = RaceServer(words, room_size, duration, tick_rate=tick_rate)
+        server = await race_server.start(host, port)
+
+    statistics = {"keys": 0, "standings": 0, "latencies": []}
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            run_bot(
+                f"Bot {i}", f"room {i // room_size}", host, port,
+                words, wpm, batch_interval, statistics
+            )
+            for i in range(rooms * room_size)
+        ))
+        total_duration = time.perf_counter() - start
+    finally:
+        if server is not None:
+            race_server.stop()
+            server.close()
+            await server.wait_closed()
+
+    return statistics, total_duration, race_server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs bot races against the race server")
+    parser.add_argument("--rooms", type=int, default=200, help="concurrent rooms")
+    parser.add_argument("--room-size", type=int, default=4, help="bots per room")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per race of the own server")
+    parser.add_argument("--tick-rate", type=float, default=5, help="standings per second of the own server")
+    parser.add_argument("--wpm", type=float, default=100, help="typing speed of the bots")
+    parser.add_argument("--batch-ms", type=float, default=100, help="milliseconds between key batches")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="port of an already running server")
+    arguments = parser.parse_args()
+
+    results, seconds, own_server = asyncio.run(run_load_test(
+        arguments.rooms,
+        arguments.room_size,
+        arguments.host,
+        8686 if arguments.port is None else arguments.port,
+        arguments.port is None,
+        arguments.duration,
+        arguments.tick_rate,
+        arguments.wpm,
+        arguments.batch_ms / 1000
+    ))
+
+    bots = arguments.rooms * arguments.room_size
+    print(f"{arguments.rooms} rooms with {bots} bots in {seconds:.2f} seconds")
+    print(f"{results['keys'] / seconds:,.0f} key events per second (sent)")
+    print(f"{results['standings'] / seconds:,.0f} standings messages per second (received)")
+    if own_server is not None:
+        print(f"{own_server.events} key events scored, {own_server.broadcasts} standings broadcasts")
+    latencies = sorted(results["latencies"])
+    if latencies:
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)] * 1000
+        print(f"Keys to standings latency: p50 {p50:.2f} ms, p99 {p99:.2f} ms")
@@ -0,0 +1,413 @@
+"""Contains a multi-user typing race server.
+
+All rooms run on a single asyncio event loop. Every participant of a room types the same
+word sequence, which the clients derive from the seed of the room and words.txt
+(see create_word_source). The key events are scored on the server by a typing engine per
+participant (see typing_engine.py). The standings are broadcast at a fixed tick rate and only
+if something changed, so many key events are coalesced into one message per tick, which is
+encoded once per room.
+
+The clients talk newline-delimited JSON over TCP:
+
+client -> server
+- {"type": "join", "name": "Bob", "room": "lobby"}      join a room ("room" is optional)
+- {"type": "keys", "keys": [["a", "a"], ["space", " "]]} key events (keysym and character)
+server -> client
+- {"type": "joined", "room": "lobby", "seed": 42, "players": ["Alice", "Bob"]}
+- {"type": "start", "duration": 60}
+- {"type": "standings", "elapsed": 1.2, "players": [{"name": "Bob", "words": 3,
+  "words_wrong": 0, "keys": 17, "wpm": 56.7}, ...]}  (ordered by correct keys)
+- {"type": "finished", "players": [...]}
+- {"type": "error", "message": "..."}
+
+A room starts when it's full or when the lobby time after the first join is over.
+After "finished" the client can join again. Clients which don't read their messages are
+dropped, once MAX_WRITE_BUFFER bytes are waiting to be sent to them. Lines over 64 KB drop
+the client as well.
+
+Usage:
+py race_server.py --port 8686 --room-size 4 --duration 60
+
+This contains the following classes:
+- Participant
+- Room
+- RaceServer
+
+And the following global methods:
+- create_word_source
+- load_words
+
+And the following global Constants:
+- MAX_WRITE_BUFFER
+
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Callable
+
+import timing
+import typing_engine
+import word_grid
+
+# bytes which may wait in the transport of a client, e.g. 1 MB are a few thousand standings
+MAX_WRITE_BUFFER = 1 << 20
+
+
+def load_words(path: str = "words.txt") -> list[str]:
+    """Loads the word list of the races
+
+    Args:
+        path (str, optional): one word per line. Defaults to "words.txt".
+
+    Returns:
+        list[str]: the words
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        return [x.strip() for x in file if x.strip()]
+
+
+def create_word_source(words: list[str], seed: int) -> Callable[[], str]:
+    """Creates the word sequence of a room; clients use it to show the same words
+
+    Args:
+        words (list[str]): the word list
+        seed (int): seed of the room
+
+    Returns:
+        Callable[[], str]: returns the next word of the sequence
+    """
+    generator = random.Random(seed)
+    return lambda: generator.choice(words)
+
+
+class Participant:
+    """Represents a connected client and its typing engine during a race"""
+    __slots__ = ("reader", "writer", "name", "room", "engine")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.name = None
+        self.room = None
+        self.engine = None
+
+    def send_raw(self, data: bytes):
+        """Queues an encoded message; the data is flushed by the event loop.
+        A client which stalls (more than MAX_WRITE_BUFFER bytes are waiting) is dropped.
+
+        Args:
+            data (bytes): one JSON line
+        """
+        if self.writer.is_closing():
+            return
+        if self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            # the connection is closed without flushing; the reader ends with the disconnect
+            self.writer.transport.abort()
+            return
+        self.writer.write(data)
+
+    def send(self, message: dict):
+        """Queues a message for the client.
+
+        Args:
+            message (dict): The message which is sent as a single JSON line
+        """
+        self.send_raw(json.dumps(message).encode() + b"\n")
+
+
+class Room:
+    """Represents a race with its participants"""
+    __slots__ = (
+        "name", "seed", "capacity", "duration", "participants",
+        "start_ns", "lobby_deadline", "changed"
+    )
+
+    def __init__(self, name: str, seed: int, capacity: int, duration: float, lobby_seconds: float):
+        self.name = name
+        self.seed = seed
+        self.capacity = capacity
+        self.duration = duration
+        self.participants = []
+        self.start_ns = None
+        self.lobby_deadline = time.monotonic() + lobby_seconds
+        # standings changed since the last broadcast
+        self.changed = False
+
+    def is_running(self) -> bool:
+        """Returns whether the race started
+
+        Returns:
+            bool: True after the start
+        """
+        return self.start_ns is not None
+
+    def broadcast(self, message: dict):
+        """Sends a message to all participants; it's encoded only once.
+
+        Args:
+            message (dict): The message
+        """
+        data = json.dumps(message).encode() + b"\n"
+        for participant in self.participants:
+            participant.send_raw(data)
+
+    def start(self, words: list[str]):
+        """Starts the race: every participant gets an engine with the word sequence of the room
+
+        Args:
+            words (list[str]): the word list
+        """
+        self.start_ns = time.monotonic_ns()
+        for participant in self.participants:
+            grid = word_grid.WordGridModel(words, word_source=create_word_source(words, self.seed))
+            participant.engine = typing_engine.TypingEngine(
+                grid, timing.CountdownTimer(self.duration)
+            )
+            participant.engine.reset()
+            participant.engine.timer.start(self.start_ns)
+        self.broadcast({"type": "start", "duration": self.duration})
+
+    def get_standings(self, now_ns: int) -> list[dict]:
+        """Returns the progress of all participants, best first
+
+        Args:
+            now_ns (int): monotonic timestamp
+
+        Returns:
+            list[dict]: name, words, wrong words, correct keys and wpm per participant
+        """
+        minutes = max(now_ns - self.start_ns, 1) / 60e9
+        standings = []
+        for participant in self.participants:
+            words, words_wrong, keys, keys_wrong = participant.engine.get_result()
+            standings.append({
+                "name": participant.name,
+                "words": words,
+                "words_wrong": words_wrong,
+                "keys": keys - keys_wrong,
+                "wpm": round((keys - keys_wrong) / 5 / minutes, 1)
+            })
+        standings.sort(key=lambda x: x["keys"], reverse=True)
+        return standings
+
+
+class RaceServer:
+    """Accepts clients, assigns them to rooms and broadcasts the standings."""
+    def __init__(
+            self,
+            words: list[str],
+            room_size: int = 4,
+            duration: float = 60,
+            lobby_seconds: float = 10,
+            tick_rate: float = 5
+        ):
+        self.words = words
+        self.room_size = room_size
+        self.duration = duration
+        self.lobby_seconds = lobby_seconds
+        self.tick_interval = 1 / tick_rate
+        self._rooms = {}
+        self._room_ids = itertools.count(1)
+        self._seeds = random.Random()
+        self._ticker = None
+        self.events = 0
+        self.broadcasts = 0
+
+    def get_amount_of_rooms(self) -> int:
+        """Returns the amount of open rooms (waiting or running)
+
+        Returns:
+            int: open rooms
+        """
+        return len(self._rooms)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8686) -> asyncio.AbstractServer:
+        """Starts listening for clients and the tick loop.
+
+        Args:
+            host (str, optional): Address to bind. Defaults to "127.0.0.1".
+            port (int, optional): Port to bind. Defaults to 8686.
+
+        Returns:
+            asyncio.AbstractServer: The running server
+        """
+        server = await asyncio.start_server(self._handle_client, host, port)
+        self._ticker = asyncio.get_running_loop().create_task(self._tick_loop())
+        return server
+
+    def stop(self):
+        """Stops the tick loop."""
+        if self._ticker is not None:
+            self._ticker.cancel()
+            self._ticker = None
+
+    async def _tick_loop(self):
+        # the ticks are scheduled relative to the start, so late ticks don't add up
+        start = time.monotonic()
+        ticks = 0
+        while True:
+            ticks += 1
+            await asyncio.sleep(max(0.0, start + ticks * self.tick_interval - time.monotonic()))
+            self.tick()
+
+    def tick(self):
+        """Starts full or expired rooms, broadcasts changed standings and ends finished races."""
+        now = time.monotonic()
+        now_ns = time.monotonic_ns()
+
+        for room in list(self._rooms.values()):
+            if not room.is_running():
+                if room.participants and now >= room.lobby_deadline:
+                    room.start(self.words)
+                continue
+
+            end_ns = room.start_ns + int(room.duration * 1e9)
+            if now_ns >= end_ns:
+                room.broadcast({"type": "finished", "players": room.get_standings(end_ns)})
+                self._close_room(room)
+            elif room.changed:
+                room.changed = False
+                self.broadcasts += 1
+                room.broadcast({
+                    "type": "standings",
+                    "elapsed": round((now_ns - room.start_ns) / 1e9, 3),
+                    "players": room.get_standings(now_ns)
+                })
+
+    def _close_room(self, room: Room):
+        for participant in room.participants:
+            participant.room = None
+            participant.engine = None
+        room.participants = []
+        self._rooms.pop(room.name, None)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        participant = Participant(reader, writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    message = None
+                if not isinstance(message, dict):
+                    participant.send({"type": "error", "message": "Invalid message"})
+                    continue
+                self._handle_message(participant, message)
+                await writer.drain()
+        except (ConnectionError, ValueError, asyncio.LimitOverrunError):
+            # a lost connection or a line over the limit of the reader (64 KB) drops the client
+            pass
+        finally:
+            self._handle_disconnect(participant)
+            writer.close()
+
+    def _handle_message(self, participant: Participant, message: dict):
+        message_type = message.get("type")
+
+        if message_type == "join" and participant.room is None:
+            participant.name = str(message.get("name") or "Anonymous")
+            self._join_room(participant, message.get("room"))
+        elif message_type == "keys" and participant.engine is not None:
+            self._process_keys(participant, message.get("keys"))
+        elif message_type == "keys" and participant.room is not None:
+            # keys before the start are ignored
+            pass
+        else:
+            participant.send({"type": "error", "message": "Unexpected message"})
+
+    def _process_keys(self, participant: Participant, keys):
+        if not isinstance(keys, list):
+            participant.send({"type": "error", "message": "Invalid keys"})
+            return
+
+        timestamp_ns = time.monotonic_ns()
+        engine = participant.engine
+        for key in keys:
+            if not (isinstance(key, list) and len(key) == 2):
+                continue
+            keysym, char = str(key[0]), str(key[1])
+            if engine.process(keysym, char, timestamp_ns) is None:
+                break
+            self.events += 1
+        participant.room.changed = True
+
+    def _join_room(self, participant: Participant, room_name):
+        if room_name is None:
+            # the first waiting room without a name from a client
+            room = next((
+                x for x in self._rooms.values()
+                if not x.is_running() and x.name.startswith("#")
+            ), None)
+            room_name = room.name if room is not None else f"#{next(self._room_ids)}"
+        room_name = str(room_name)
+
+        room = self._rooms.get(room_name)
+        if room is not None and room.is_running():
+            participant.send({"type": "error", "message": "The race already started"})
+            return
+        if room is None:
+            room = Room(
+                room_name, self._seeds.randrange(2**31),
+                self.room_size, self.duration, self.lobby_seconds
+            )
+            self._rooms[room_name] = room
+
+        participant.room = room
+        room.participants.append(participant)
+        room.broadcast({
+            "type": "joined",
+            "room": room.name,
+            "seed": room.seed,
+            "players": [x.name for x in room.participants]
+        })
+        if len(room.participants) >= room.capacity:
+            room.start(self.words)
+
+    def _handle_disconnect(self, participant: Participant):
+        room = participant.room
+        if room is None:
+            return
+        room.participants.remove(participant)
+        room.changed = True
+        if not room.participants:
+            self._rooms.pop(room.name, None)
+
+
+async def _serve(host: str, port: int, arguments: argparse.Namespace):
+    race_server = RaceServer(
+        load_words(arguments.words), arguments.room_size, arguments.duration,
+        arguments.lobby, arguments.tick_rate
+    )
+    server = await race_server.start(host, port)
+    print(f"Listening on {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        race_server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hosts typing races")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8686)
+    parser.add_argument("--words", default="words.txt", help="word list")
+    parser.add_argument("--room-size", type=int, default=4, help="participants per room")
+    parser.add_argument("--duration", type=float, default=60, help="seconds per race")
+    parser.add_argument("--lobby", type=float, default=10,
+                        help="seconds after the first join until a room starts without being full")
+    parser.add_argument("--tick-rate", type=float, default=5, help="standings broadcasts per second")
+    parsed = parser.parse_args()
+
+    try:
+        asyncio.run(_serve(parsed.host, parsed.port, parsed))
+    except KeyboardInterrupt:
+        print("Server stopped")
@@ -0,0 +1,118 @@
+"""Measures the cold start of the application with "python -X importtime".
+
+Every run starts a new interpreter, which imports ui_main. The median cumulative import time
+is compared with a budget and the slowest modules are listed. Modules which must not be
+imported at startup (e.g. pandas or the typing engine) are reported as failure as well.
+The exit code is 1 if a check fails, so it can be used as a CI step.
+With --window the time until the first window is drawn is measured too (requires a display).
+
+Usage:
+py startup_benchmark.py [--runs 10] [--budget 50] [--window]
+
+This contains the following global methods:
+- measure_imports
+- measure_window
+
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# heavy dependencies and modules which are only needed for a test, the results or the profiling
+FORBIDDEN_MODULES = [
+    "pandas", "numpy", "sqlite3", "hashlib", "getpass",
+    "typing_engine", "alignment", "word_selection", "instrumentation"
+]
+
+_WINDOW_SCRIPT = """
+import time
+start = time.perf_counter()
+from ui_main import StartPage
+page = StartPage()
+page.update()
+print(time.perf_counter() - start)
+page.destroy()
+"""
+
+
+def measure_imports(module: str = "ui_main") -> dict[str, tuple[int, int]]:
+    """Imports a module in a new interpreter and parses the output of -X importtime.
+
+    Args:
+        module (str, optional): Module to import. Defaults to "ui_main".
+
+    Returns:
+        dict[str, tuple[int, int]]: Self and cumulative import time (µs) per imported module
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    )
+
+    result = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        result[name.strip()] = (int(own), int(cumulative))
+    return result
+
+
+def measure_window() -> float:
+    """Creates the main window in a new interpreter and waits until it's drawn.
+
+    Returns:
+        float: Seconds from the start of the import until the window is drawn
+    """
+    process = subprocess.run(
+        [sys.executable, "-c", _WINDOW_SCRIPT],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    )
+    return float(process.stdout.strip())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures the cold start of the typing test")
+    parser.add_argument("--runs", type=int, default=10, help="amount of measured starts")
+    parser.add_argument("--budget", type=float, default=50, help="import budget in ms")
+    parser.add_argument("--window", action="store_true", help="measure the time to the first window")
+    arguments = parser.parse_args()
+
+    totals = []
+    imports = {}
+    for _ in range(arguments.runs):
+        imports = measure_imports()
+        totals.append(imports["ui_main"][1] / 1000)
+
+    median = statistics.median(totals)
+    print(f"Import of ui_main: median {median:.1f} ms, min {min(totals):.1f} ms, max {max(totals):.1f} ms")
+
+    print("\nSlowest modules (self time of the last run):")
+    for name, (own, _) in sorted(imports.items(), key=lambda x: x[1][0], reverse=True)[:10]:
+        print(f"\t{name:<20} {own / 1000:6.1f} ms")
+
+    failed = False
+    forbidden = [x for x in FORBIDDEN_MODULES if x in imports]
+    if forbidden:
+        print(
+            f"\nImported at startup, but should be loaded lazily: {', '.join(forbidden)}",
+            file=sys.stderr
+        )
+        failed = True
+
+    if median > arguments.budget:
+        print(f"\nOver budget: {median:.1f} ms > {arguments.budget:.1f} ms", file=sys.stderr)
+        failed = True
+    else:
+        print(f"\nWithin budget: {median:.1f} ms <= {arguments.budget:.1f} ms")
+
+    if arguments.window:
+        window_times = [measure_window() * 1000 for _ in range(arguments.runs)]
+        print(f"Time to first window: median {statistics.median(window_times):.1f} ms")
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,152 @@
+"""Contains the timer of a speed typing test.
+
+The remaining time is always computed from the monotonic start timestamp, so delayed
+UI callbacks don't add up. The refreshes are scheduled on a fixed grid relative to the start
+(e.g. every 100 ms), so a late refresh shortens the delay to the next one instead of
+shifting all following refreshes.
+
+This contains the following classes:
+- CountdownTimer
+
+"""
+
+import datetime as dt
+import time
+
+
+class CountdownTimer:
+    """Drift-free countdown based on time.monotonic_ns()."""
+    def __init__(self, duration_seconds: float = 60, refresh_rate: float = 10):
+        """Creates the timer
+
+        Args:
+            duration_seconds (float, optional): duration of a test. Defaults to 60.
+            refresh_rate (float, optional): refreshes of the UI per second. Defaults to 10.
+        """
+        self.duration_ns = int(duration_seconds * 1e9)
+        self.refresh_interval_ns = int(1e9 / refresh_rate)
+        self._start_ns = None
+        self._end_ns = None
+        self._start_time_ns = None
+
+    def start(self, now_ns: int = None):
+        """Starts the countdown
+
+        Args:
+            now_ns (int, optional): monotonic timestamp of the start, e.g. of the first key.
+            Defaults to time.monotonic_ns().
+        """
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        # the wall clock is only read once; the end is derived from the monotonic clock
+        self._start_time_ns = time.time_ns() - (time.monotonic_ns() - now_ns)
+        self._start_ns = now_ns
+        self._end_ns = None
+
+    def stop(self, now_ns: int = None):
+        """Stops the countdown; the end is capped at the duration
+
+        Args:
+            now_ns (int, optional): monotonic timestamp. Defaults to time.monotonic_ns().
+        """
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        self._end_ns = min(now_ns, self._start_ns + self.duration_ns)
+
+    def reset(self):
+        """Resets the timer for the next test."""
+        self._start_ns = None
+        self._end_ns = None
+        self._start_time_ns = None
+
+    def is_started(self) -> bool:
+        """Returns whether the countdown was started
+
+        Returns:
+            bool: True after start
+        """
+        return self._start_ns is not None
+
+    def get_remaining_ns(self, now_ns: int = None) -> int:
+        """Returns the remaining time
+
+        Args:
+            now_ns (int, optional): monotonic timestamp. Defaults to time.monotonic_ns().
+
+        Returns:
+            int: remaining nanoseconds, at least 0
+        """
+        if self._start_ns is None:
+            return self.duration_ns
+        if now_ns is None:
+            now_ns = time.monotonic_ns() if self._end_ns is None else self._end_ns
+        return max(0, self._start_ns + self.duration_ns - now_ns)
+
+    def get_remaining_seconds(self, now_ns: int = None) -> int:
+        """Returns the remaining time like a countdown shows it (rounded up)
+
+        Args:
+            now_ns (int, optional): monotonic timestamp. Defaults to time.monotonic_ns().
+
+        Returns:
+            int: remaining seconds
+        """
+        return -(-self.get_remaining_ns(now_ns) // 1_000_000_000)
+
+    def is_expired(self, now_ns: int = None) -> bool:
+        """Returns whether the duration is exceeded
+
+        Args:
+            now_ns (int, optional): monotonic timestamp. Defaults to time.monotonic_ns().
+
+        Returns:
+            bool: True if no time remains
+        """
+        return self._start_ns is not None and self.get_remaining_ns(now_ns) == 0
+
+    def get_next_delay_ms(self, now_ns: int = None) -> int:
+        """Returns the delay until the next refresh on the grid of the refresh interval,
+        but not later than the end of the countdown.
+
+        Args:
+            now_ns (int, optional): monotonic timestamp. Defaults to time.monotonic_ns().
+
+        Returns:
+            int: delay in milliseconds for tkinter's after
+        """
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        elapsed_ns = now_ns - self._start_ns
+        next_refresh_ns = (elapsed_ns // self.refresh_interval_ns + 1) * self.refresh_interval_ns
+        delay_ns = min(next_refresh_ns, self.duration_ns) - elapsed_ns
+        return max(1, -(-delay_ns // 1_000_000))
+
+    def get_duration_seconds(self) -> float:
+        """Returns the measured duration of the test
+
+        Returns:
+            float: seconds from start to stop (or until now)
+        """
+        if self._start_ns is None:
+            return 0.0
+        return (self.duration_ns - self.get_remaining_ns()) / 1e9
+
+    def get_start_time(self) -> dt.datetime:
+        """Returns the wall clock time of the start
+
+        Returns:
+            dt.datetime: local time of the start or None
+        """
+        if self._start_time_ns is None:
+            return None
+        return dt.datetime.fromtimestamp(self._start_time_ns / 1e9)
+
+    def get_end_time(self) -> dt.datetime:
+        """Returns the wall clock time of the end (start + measured duration)
+
+        Returns:
+            dt.datetime: local time of the end or None
+        """
+        if self._start_time_ns is None:
+            return None
+        return self.get_start_time() + dt.timedelta(seconds=self.get_duration_seconds())
@@ -0,0 +1,216 @@
+"""Replays keystroke streams through the headless typing engine (see typing_engine.py)
+and reports the throughput and the latency per event.
+
+A stream is either recorded (a text file with "timestamp_ns keysym" per line) or synthetic:
+a simulated typist types the words of the engine with a given speed and error rate,
+including typos, corrections with BackSpace and Shift for capital letters.
+By default, every event is replayed with the content of the input like ui_test.RunTestFrame
+passes it (the entry text is rebuilt from the keys); --tracked-input lets the engine track
+the input instead.
+
+Usage:
+py typing_benchmark.py [--events 200000] [--wpm 200] [--error-rate 0.05] [--budget-us 50] [--tracked-input]
+py typing_benchmark.py --stream recorded.txt
+
+This contains the following global methods:
+- create_engine
+- generate_stream
+- load_stream
+- save_stream
+- replay
+
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+import timing
+import typing_engine
+import word_grid
+
+# characters of keysyms which aren't the character itself
+_KEYSYM_CHARS = {"space": " ", "BackSpace": "", "Shift_L": "", "Shift_R": ""}
+
+
+def create_engine(words: list[str], duration_seconds: float = 60, seed: int = 0) -> typing_engine.TypingEngine:
+    """Creates an engine with reproducible words
+
+    Args:
+        words (list[str]): the word list
+        duration_seconds (float, optional): duration of the test. Defaults to 60.
+        seed (int, optional): seed of the word order. Defaults to 0.
+
+    Returns:
+        typing_engine.TypingEngine: the engine (already reset)
+    """
+    generator = random.Random(seed)
+    grid = word_grid.WordGridModel(words, word_source=lambda: generator.choice(words))
+    engine = typing_engine.TypingEngine(grid, timing.CountdownTimer(duration_seconds))
+    engine.reset()
+    return engine
+
+
+def generate_stream(
+        words: list[str], amount: int,
+        wpm: float = 200, error_rate: float = 0.05, seed: int = 0
+    ) -> list[tuple[int, str, str]]:
+    """Simulates a typist, who types the words of an engine created with the same seed
+
+    Args:
+        words (list[str]): the word list
+        amount (int): amount of events
+        wpm (float, optional): typing speed (5 characters per word). Defaults to 200.
+        error_rate (float, optional): share of typos. Defaults to 0.05.
+        seed (int, optional): seed of the word order and the typos. Defaults to 0.
+
+    Returns:
+        list[tuple[int, str, str]]: timestamp (ns), keysym and character per event
+    """
+    engine = create_engine(words, duration_seconds=1e9, seed=seed)
+    generator = random.Random(seed + 1)
+    interval_ns = int(60e9 / (wpm * 5))
+    timestamp_ns = 0
+    stream = []
+
+    def press(keysym, char):
+        nonlocal timestamp_ns
+        timestamp_ns += int(generator.expovariate(1 / interval_ns))
+        stream.append((timestamp_ns, keysym, char))
+        engine.process(keysym, char, timestamp_ns)
+
+    while len(stream) < amount:
+        word = engine.grid.get_current()
+        for char in word:
+            if generator.random() < error_rate:
+                typo = generator.choice("abcdefghijklmnopqrstuvwxyz")
+                press(typo, typo)
+                if generator.random() < 0.7:
+                    press("BackSpace", "")
+                else:
+                    continue
+            if char.isupper():
+                press("Shift_L", "")
+            press(char, char)
+        press("space", " ")
+
+    return stream[:amount]
+
+
+def load_stream(path: str) -> list[tuple[int, str, str]]:
+    """Loads a recorded stream ("timestamp_ns keysym" per line)
+
+    Args:
+        path (str): the file
+
+    Returns:
+        list[tuple[int, str, str]]: timestamp (ns), keysym and character per event
+    """
+    stream = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            timestamp, keysym = line.split()
+            char = keysym if len(keysym) == 1 else _KEYSYM_CHARS.get(keysym, "")
+            stream.append((int(timestamp), keysym, char))
+    return stream
+
+
+def save_stream(path: str, stream: list[tuple[int, str, str]]):
+    """Saves a stream, so it can be replayed later
+
+    Args:
+        path (str): the file
+        stream (list[tuple[int, str, str]]): timestamp (ns), keysym and character per event
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        for timestamp_ns, keysym, _ in stream:
+            file.write(f"{timestamp_ns} {keysym}\n")
+
+
+def replay(
+        engine: typing_engine.TypingEngine, stream: list[tuple[int, str, str]],
+        entry_text: bool = True
+    ) -> tuple[float, list[int]]:
+    """Replays a stream as fast as possible
+
+    Args:
+        engine (typing_engine.TypingEngine): a reset engine
+        stream (list[tuple[int, str, str]]): timestamp (ns), keysym and character per event
+        entry_text (bool, optional): passes the content of the input with every event like
+        the UI does. Otherwise the engine tracks the input. Defaults to True.
+
+    Returns:
+        tuple[float, list[int]]: total seconds and the latency (ns) of every event
+    """
+    process = engine.process
+    clock = time.perf_counter_ns
+    latencies = [0] * len(stream)
+    text = "" if entry_text else None
+
+    start = clock()
+    for i, (timestamp_ns, keysym, char) in enumerate(stream):
+        if entry_text:
+            # the entry of the UI contains the typed characters including the space
+            if keysym == "BackSpace":
+                text = text[:-1]
+            elif len(char) == 1 and char.isprintable():
+                text += char
+        before = clock()
+        result = process(keysym, char, timestamp_ns, text)
+        latencies[i] = clock() - before
+        if entry_text and result is not None and result.clear_input:
+            text = ""
+    return (clock() - start) / 1e9, latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the typing engine")
+    parser.add_argument("--stream", help="recorded stream instead of a synthetic one")
+    parser.add_argument("--save", help="saves the (synthetic) stream to this file")
+    parser.add_argument("--words", default="words.txt", help="word list")
+    parser.add_argument("--events", type=int, default=200000, help="amount of synthetic events")
+    parser.add_argument("--wpm", type=float, default=200, help="speed of the synthetic typist")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="typos of the synthetic typist")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget-us", type=float, default=50, help="p99 latency budget per event")
+    parser.add_argument("--tracked-input", action="store_true",
+                        help="let the engine track the input instead of passing the entry text")
+    arguments = parser.parse_args()
+
+    with open(arguments.words, "r", encoding="utf-8") as words_file:
+        word_list = [x.strip() for x in words_file if x.strip()]
+
+    if arguments.stream:
+        events = load_stream(arguments.stream)
+    else:
+        events = generate_stream(
+            word_list, arguments.events, arguments.wpm, arguments.error_rate, arguments.seed
+        )
+    if arguments.save:
+        save_stream(arguments.save, events)
+
+    # the countdown must not end during the replay
+    span_seconds = (events[-1][0] - events[0][0]) / 1e9 + 1 if events else 1
+    replay_engine = create_engine(word_list, span_seconds, arguments.seed)
+    total, event_latencies = replay(replay_engine, events, not arguments.tracked_input)
+
+    event_latencies.sort()
+    p50 = event_latencies[len(event_latencies) // 2] / 1000
+    p99 = event_latencies[int(len(event_latencies) * 0.99)] / 1000
+    words, words_wrong, keys, keys_wrong = replay_engine.get_result()
+
+    print(f"{len(events)} events in {total:.3f} seconds: {len(events) / total:,.0f} events/s")
+    print(
+        f"Latency per event: mean {statistics.fmean(event_latencies) / 1000:.2f} µs, "
+        f"p50 {p50:.2f} µs, p99 {p99:.2f} µs, max {event_latencies[-1] / 1000:.2f} µs"
+    )
+    print(f"Result: {words} words ({words_wrong} wrong), {keys} keys ({keys_wrong} wrong)")
+
+    if p99 > arguments.budget_us:
+        print(f"Over budget: p99 {p99:.2f} µs > {arguments.budget_us:.2f} µs")
+        sys.exit(1)
+    print(f"Within budget: p99 {p99:.2f} µs <= {arguments.budget_us:.2f} µs")
@@ -0,0 +1,177 @@
+"""Contains the typing logic of a speed typing test without any dependency on tkinter.
+
+The engine is driven by key events (keysym, character and monotonic timestamp), so it can be
+tested and benchmarked headless (see typing_benchmark.py). The UI (ui_test.RunTestFrame)
+only passes the events on and applies the returned changes to its widgets.
+Every word is aligned against the input keystroke by keystroke (see alignment.py), so only the
+keys which cause an error are counted as wrong and the errors are classified.
+
+This contains the following classes:
+- KeyResult
+- TypingEngine
+
+And the following global Constants:
+- INPUT_IDLE
+- INPUT_CORRECT
+- INPUT_WRONG
+
+"""
+
+import alignment
+import keystrokes
+import timing
+import word_grid
+
+INPUT_IDLE = "blue"
+INPUT_CORRECT = "green"
+INPUT_WRONG = "red"
+
+
+class KeyResult:
+    """Changes caused by a key event, which the UI has to apply."""
+    __slots__ = ["background", "changes", "clear_input", "started"]
+
+    def __init__(
+            self,
+            background: str, changes: list[tuple[int, int, str, str]],
+            clear_input: bool, started: bool
+        ):
+        # color of the input (INPUT_IDLE, INPUT_CORRECT or INPUT_WRONG)
+        self.background = background
+        # changed cells of the word grid (row, column, word, color)
+        self.changes = changes
+        # the word was submitted and the input has to be emptied
+        self.clear_input = clear_input
+        # the event started the countdown
+        self.started = started
+
+
+class TypingEngine:
+    """Scores the key events of a test run and moves through the words."""
+    def __init__(
+            self,
+            grid: word_grid.WordGridModel,
+            timer: timing.CountdownTimer,
+            metrics: keystrokes.MetricsEngine = None
+        ):
+        self.grid = grid
+        self.timer = timer
+        self.metrics = metrics or keystrokes.MetricsEngine()
+        self.words = 0
+        self.words_wrong = 0
+        self.substitutions = 0
+        self.insertions = 0
+        self.omissions = 0
+        self.corrected_typos = 0
+        self._aligner = None
+
+    def reset(self) -> list[tuple[int, int, str, str]]:
+        """Prepares the next test run
+
+        Returns:
+            list[tuple[int, int, str, str]]: changed cells of the word grid
+        """
+        self.words = 0
+        self.words_wrong = 0
+        self.substitutions = 0
+        self.insertions = 0
+        self.omissions = 0
+        self.corrected_typos = 0
+        self.metrics.reset()
+        self.timer.reset()
+        changes = self.grid.reset()
+        self._aligner = alignment.WordAligner(self.grid.get_current())
+        return changes
+
+    def get_input(self) -> str:
+        """Returns the input as the engine tracks it
+
+        Returns:
+            str: typed characters of the current word
+        """
+        return self._aligner.get_text()
+
+    def process(self, keysym: str, char: str, timestamp_ns: int, input_text: str = None) -> KeyResult:
+        """Processes a key event. The first event starts the countdown.
+
+        Args:
+            keysym (str): tkinter keysym, e.g. "a", "space" or "BackSpace"
+            char (str): produced character ("" for e.g. Shift or BackSpace)
+            timestamp_ns (int): monotonic timestamp of the event
+            input_text (str, optional): content of the input after the event. If it's None,
+            the input is tracked by the engine (characters are appended, BackSpace removes one).
+            Defaults to None.
+
+        Returns:
+            KeyResult: the changes or None if the countdown is over
+        """
+        if self.timer.is_expired(timestamp_ns):
+            return None
+
+        started = not self.timer.is_started()
+        if started:
+            self.timer.start(timestamp_ns)
+
+        aligner = self._aligner
+        if input_text is None:
+            if keysym == "BackSpace":
+                self.corrected_typos += aligner.pop()
+                errors = 0
+            elif char and char != " " and char.isprintable():
+                errors = aligner.push(char)
+            else:
+                errors = 0
+        else:
+            errors, corrected_typos = aligner.update(input_text.strip())
+            self.corrected_typos += corrected_typos
+
+        is_character = len(char) == 1 and char.isprintable()
+        changes = []
+        clear_input = False
+
+        if char == " ":
+            correct = aligner.get_distance() == 0
+            if not correct:
+                substitutions, insertions, omissions = aligner.get_edits()
+                self.substitutions += substitutions
+                self.insertions += insertions
+                self.omissions += omissions
+                self.words_wrong += 1
+            changes = self.grid.mark_current_word(correct)
+            self.words += 1
+            self._aligner = alignment.WordAligner(self.grid.get_current())
+            clear_input = True
+            background = INPUT_IDLE
+        else:
+            correct = errors == 0
+            background = INPUT_CORRECT if aligner.get_prefix_distance() == 0 else INPUT_WRONG
+
+        if is_character:
+            correctness = keystrokes.CORRECT if correct else keystrokes.WRONG
+        else:
+            correctness = keystrokes.NOT_A_CHARACTER
+        self.metrics.record(keysym, correctness, timestamp_ns)
+
+        return KeyResult(background, changes, clear_input, started)
+
+    def get_result(self) -> tuple[int, int, int, int]:
+        """Returns the result of the test run
+
+        Returns:
+            tuple[int, int, int, int]: words, wrong words, keys and wrong keys
+        """
+        return (self.words, self.words_wrong, self.metrics.keys, self.metrics.keys_wrong)
+
+    def get_errors(self) -> dict[str, int]:
+        """Returns the classified errors of the test run
+
+        Returns:
+            dict[str, int]: substitutions, insertions (extra characters) and omissions
+            (missing characters) in the submitted words and the typos corrected with BackSpace
+        """
+        return {
+            "Substitutions": self.substitutions,
+            "Insertions": self.insertions,
+            "Omissions": self.omissions,
+            "Corrected typos": self.corrected_typos
+        }
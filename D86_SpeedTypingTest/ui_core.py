@@ -14,11 +14,12 @@ And the following global Constants:
 
 """
 
-import random
 import tkinter as tk
 
 from typing import Callable
 
+import word_grid
+
 FONT_NAME = "Segoe UI"
 
 class Heading(tk.Label):
@@ -63,133 +64,170 @@ class Button(tk.Button):
         self.config(command=button_command)
 
 class Table(tk.Frame):
-    """This class defines a table structure, built on a frame, where labels represent the cells."""
-    def __init__(self, root, header:list[str], content: list[list[str]], *args, **kwargs):
+    """This class defines a table structure, built on a frame, where labels represent the cells.
+    The labels are reused between updates and only cells with a changed text are reconfigured.
+    If a page size is given, only one page of rows is shown at once."""
+    def __init__(
+            self, root,
+            header:list[str], content: list[list[str]],
+            page_size: int = None,
+            *args, **kwargs
+        ):
         super().__init__(root, *args, **kwargs)
         self.spacing = 2
+        self.page_size = page_size
+
+        self._header_labels = []
+        self._header_texts = []
+        self._rows = []
+        self._content = []
+        self._page = 0
+        self._paging = None
+        self._paging_label = None
 
         self.load_data(header, content)
 
     def load_data(self, header:list[str], content: list[list[str]]):
-        """Removes the existing entries from the table and draws a new one
+        """Shows new entries in the table (on the first page if paging is used)
 
         Args:
             header (list[str]): list of headers
             content (list[list[str]]): rows which include cells
         """
-        for child in self.winfo_children():
-            child.destroy()
-
         for i, cell in enumerate(header):
-            header_label = BoldLabel(self, cell, background="white")
-            header_label.grid(
-                row=0, column=i,
-                pady=self.spacing, padx=self.spacing,
-                sticky=tk.W+tk.E
-            )
-
-        for i, row in enumerate(content):
-            for j, cell in enumerate(row):
-                cell_label = Label(self, cell, background="white")
-                cell_label.grid(
-                    row=i+1, column=j,
-                    padx=self.spacing, pady=self.spacing,
+            if i == len(self._header_labels):
+                header_label = BoldLabel(self, cell, background="white")
+                header_label.grid(
+                    row=0, column=i,
+                    pady=self.spacing, padx=self.spacing,
                     sticky=tk.W+tk.E
                 )
+                self._header_labels.append(header_label)
+                self._header_texts.append(cell)
+            elif self._header_texts[i] != cell:
+                self._header_labels[i].configure(text=cell)
+                self._header_texts[i] = cell
+        for header_label in self._header_labels[len(header):]:
+            header_label.destroy()
+        del self._header_labels[len(header):]
+        del self._header_texts[len(header):]
+
+        self._content = content
+        self.show_page(0)
+
+    def get_page_count(self) -> int:
+        """Returns the amount of pages
+
+        Returns:
+            int: amount of pages (at least 1)
+        """
+        if self.page_size is None:
+            return 1
+        return max(1, -(-len(self._content) // self.page_size))
+
+    def show_page(self, page: int):
+        """Shows the rows of a page
+
+        Args:
+            page (int): index of the page, starting at 0
+        """
+        self._page = min(max(page, 0), self.get_page_count() - 1)
+        if self.page_size is None:
+            rows = self._content
+        else:
+            start = self._page * self.page_size
+            rows = self._content[start:start + self.page_size]
+
+        for i, row in enumerate(rows):
+            if i == len(self._rows):
+                self._rows.append(([], []))
+            labels, texts = self._rows[i]
+
+            for j, cell in enumerate(row):
+                if j == len(labels):
+                    cell_label = Label(self, cell, background="white")
+                    cell_label.grid(
+                        row=i+1, column=j,
+                        padx=self.spacing, pady=self.spacing,
+                        sticky=tk.W+tk.E
+                    )
+                    labels.append(cell_label)
+                    texts.append(cell)
+                elif texts[j] != cell:
+                    labels[j].configure(text=cell)
+                    texts[j] = cell
+            for cell_label in labels[len(row):]:
+                cell_label.destroy()
+            del labels[len(row):]
+            del texts[len(row):]
+
+        for labels, _ in self._rows[len(rows):]:
+            for cell_label in labels:
+                cell_label.destroy()
+        del self._rows[len(rows):]
+
+        self._update_paging()
+
+    def _update_paging(self):
+        if self.get_page_count() == 1:
+            if self._paging is not None:
+                self._paging.grid_remove()
+            return
+
+        if self._paging is None:
+            self._paging = tk.Frame(self)
+            Button(self._paging, "<", lambda: self.show_page(self._page - 1)).pack(side=tk.LEFT)
+            self._paging_label = Label(self._paging, "")
+            self._paging_label.pack(side=tk.LEFT, padx=self.spacing)
+            Button(self._paging, ">", lambda: self.show_page(self._page + 1)).pack(side=tk.LEFT)
+
+        self._paging_label.configure(text=f"{self._page + 1} / {self.get_page_count()}")
+        self._paging.grid(
+            row=self.page_size + 1, column=0,
+            columnspan=max(1, len(self._header_labels)),
+            pady=self.spacing
+        )
 
 class WordTable(tk.Frame):
     """Custom widget, which displays words during a speed test 
     with different formatting: green for correct words, 
-    red for mistakes, and blue for the current word."""
+    red for mistakes, and blue for the current word.
+    The state of the cells is kept in a view model (word_grid.WordGridModel),
+    so only the changed labels are reconfigured."""
     def __init__(
             self, root,
             words: list[str], amount_of_rows:int=3, amount_of_columns=6,
+            word_source: Callable[[], str] = None,
             **kwargs
         ):
         super().__init__(root, **kwargs)
 
-        self._words = words
-        self._rows = amount_of_rows
-        self._columns = amount_of_columns
+        self._model = word_grid.WordGridModel(
+            words, amount_of_rows, amount_of_columns, word_source
+        )
         self._grid = []
-        self._current_word = None
-        self._current_word_index = None
 
         for i in range(amount_of_rows):
             row = []
             for j in range(amount_of_columns):
-                cell = BoldLabel(self, "dummy", foreground="gray")
+                cell = BoldLabel(self, "dummy", foreground=word_grid.COLOR_PENDING)
                 cell.grid(row=i, column=j, sticky=tk.W)
                 row.append(cell)
             self._grid.append(row)
 
-    def reset_table(self):
-        """Resets the content and formatting of the table after a speed test run.
-        """
-        random.shuffle(self._words)
-        self._current_word = None
-        self._current_word_index = None
-
-        for row in self._grid:
-            for cell in row:
-                word = self._words.pop(0)
-                self._words.append(word)
-                cell.config(text=word)
-                cell.config(foreground="gray")
-        self._grid[0][0].config(foreground="blue")
-
-    def get_current(self) -> str:
-        """Gets the current selected word from the table
+    def get_model(self) -> word_grid.WordGridModel:
+        """Returns the view model, e.g. for the typing engine
 
         Returns:
-            str: current word
+            word_grid.WordGridModel: the view model
         """
-        if self._current_word is None:
-            self._current_word = self._grid[0][0].cget("text")
-            self._current_word_index = (0, 0)
-        return self._current_word
+        return self._model
 
-    def mark_current_word(self, is_correct: bool):
-        """Marks the current word and moves to the next. 
-        If the current word was typed correctly, it will be 
-        formatted in green otherwise red. The next 
-        word will be highlighted in blue
+    def apply_changes(self, changes: list[tuple[int, int, str, str]]):
+        """Pushes the changed cells of the view model to the labels
 
         Args:
-            is_correct (bool): indicator if the spelling was correct
+            changes (list[tuple[int, int, str, str]]): row, column, word and color
         """
-        r,c = self._current_word_index
-        current_label = self._grid[r][c]
-
-        if is_correct:
-            current_label.config(foreground="green")
-        else:
-            current_label.config(foreground="red")
-
-        if (c+1) < self._columns:
-            c = c + 1
-        elif r == 0:
-            r = 1
-            c = 0
-        else:
-            c = 0
-            for i in range(self._columns):
-                first = self._grid[0][i]
-                second = self._grid[1][i]
-                third = self._grid[2][i]
-
-                first.config(text=second.cget("text"))
-                first.config(foreground=second.cget("foreground"))
-
-                second.config(text=third.cget("text"))
-                second.config(foreground=third.cget("foreground"))
-
-                new_word = self._words.pop(0)
-                self._words.append(new_word)
-                third.config(text=new_word)
-
-        current_cell = self._grid[r][c]
-        current_cell.config(foreground="blue")
-
-        self._current_word = current_cell.cget("text")
-        self._current_word_index = (r, c)
+        for r, c, text, color in changes:
+            self._grid[r][c].configure(text=text, foreground=color)
@@ -1,7 +1,14 @@
-"""Contains the entry point (StartPage) of the application."""
+"""Contains the entry point (StartPage) of the application.
 
-import datetime as dt
+To show the window as fast as possible, the scoreboard is loaded after the window is shown
+and the test frame is created when the first test starts. Modules which are only needed for
+a test (e.g. the typing engine and the word selection) or for the profiling are imported
+when they're used, see startup_benchmark.py.
+"""
+
+import os
 import tkinter as tk
+from typing import Callable
 
 import data
 import ui_core as uic
@@ -10,57 +17,119 @@ import ui_test as uit
 
 class StartPage(tk.Tk):
     """Represents the main window, which shows a score board, the test or a result."""
-    def __init__(self, *args, **kwargs):
+    def __init__(
+            self, *args,
+            word_source: Callable[[], str] = None, data_file: str = None, profile: str = None,
+            **kwargs
+        ):
+        """Creates the main window
+
+        Args:
+            word_source (Callable[[], str], optional): picks the words of the tests,
+            e.g. word_index.WordIndex.sample. Defaults to None (adaptive selection from words.txt).
+            data_file (str, optional): database of the results. Defaults to None
+            (data.db in data.get_data_directory()).
+            profile (str, optional): enables the latency instrumentation, "1" or the path
+            of a trace file (see instrumentation.create). Defaults to None.
+        """
         super().__init__(*args, **kwargs)
 
-        default_pady = 5
+        # None if disabled; it wraps the handlers, so it's created before they're passed on
+        self._instrumentation = None
+        if profile or os.environ.get("SPEED_TYPING_PROFILE"):
+            import instrumentation
+
+            self._instrumentation = instrumentation.create(self, profile)
+        if self._instrumentation is not None:
+            for method_name in ["start_test", "finished_test", "close_test_result"]:
+                self._instrumentation.instrument(self, method_name)
+            self._instrumentation.watch_keys(self)
+
+        self._default_pady = 5
         self.title('Speed typing tester')
 
         self.minsize(600, 200)
         self.grid_columnconfigure(0, weight=1)
 
         self._header = uic.Heading(self, 'Speed typing tester')
-        self._header.grid(row=0, column=0, pady=default_pady)
+        self._header.grid(row=0, column=0, pady=self._default_pady)
 
-        self._scoreboard = uis.ScoreboardFrame(self)
-        self._scoreboard.grid(row=1, column=0, pady=default_pady)
-        self._scoreboard.refresh_table()
+        # the frames share the service, so the scoreboard sees the saved runs
+        self._data_service = data.DataService(data_file)
+
+        self._scoreboard = uis.ScoreboardFrame(self, self._data_service)
+        self._scoreboard.grid(row=1, column=0, pady=self._default_pady)
+        self.after_idle(self._scoreboard.refresh_table)
 
         self._test_start = uit.StartTestFrame(self, self.start_test)
-        self._test_start.grid(row=2, column=0, pady=default_pady)
+        self._test_start.grid(row=2, column=0, pady=self._default_pady)
 
-        self._test_run = uit.RunTestFrame(self, self.finished_test)
-        self._test_run.grid(row=3, column=0, pady=default_pady)
-        self._test_run.grid_remove()
+        self._test_run = None
+        self._word_selector = None
+        self._word_source = word_source
 
-        self._test_result = uit.TestResultFrame(self, self.close_test_result)
-        self._test_result.grid(row=4, column=0, pady=default_pady)
+        self._test_result = uit.TestResultFrame(
+            self, self._data_service, self.close_test_result
+        )
+        self._test_result.grid(row=4, column=0, pady=self._default_pady)
         self._test_result.grid_remove()
 
-        self.mainloop()
-
     def start_test(self):
         """Event handler for start test button"""
         self._scoreboard.grid_remove()
         self._test_start.grid_remove()
 
+        if self._test_run is None:
+            if self._word_source is None:
+                # hashlib and json of the n-gram index aren't needed before the first test
+                import word_selection
+
+                self._word_selector = word_selection.AdaptiveWordSelector.load()
+                self._word_source = self._word_selector.next_word
+            self._test_run = uit.RunTestFrame(
+                self, self.finished_test, self._word_source,
+                instrumentation=self._instrumentation
+            )
+            self._test_run.grid(row=3, column=0, pady=self._default_pady)
+        if self._word_selector is not None:
+            # practice the weak keys and bigrams of all previous runs
+            self._word_selector.update_weights(self._data_service.get_ngram_statistics())
         self._test_run.reset()
         self._test_run.grid()
 
     def finished_test(self):
         """This callback is used if a test run is finished 
-        and the window switches to the test result."""
+        and the window switches to the test result.
+        The key and bigram statistics are only saved together with the run."""
+        import getpass
+        import word_selection
+
         words, w_words, keys, w_keys = self._test_run.get_result()
+        timer = self._test_run.get_timer()
 
         summary = data.TestSummaryModel(
-            dt.datetime.now().strftime("%Y-%m-%d"),
-            words, w_words, keys, w_keys
+            timer.get_start_time().strftime("%Y-%m-%d"),
+            words, w_words, keys, w_keys,
+            getpass.getuser(),
+            timer.get_start_time().isoformat(timespec="milliseconds"),
+            timer.get_end_time().isoformat(timespec="milliseconds"),
+            round(timer.get_duration_seconds(), 6)
+        )
+        self._test_result.load(
+            summary, self._test_run.get_errors(),
+            word_selection.collect_ngram_statistics(self._test_run.get_metrics().log)
         )
-        self._test_result.load(summary)
 
         self._test_run.grid_remove()
         self._test_result.grid()
 
+    def destroy(self):
+        """Closes the window and writes the pending results."""
+        super().destroy()
+        self._data_service.close()
+        if self._instrumentation is not None:
+            self._instrumentation.close()
+
     def close_test_result(self):
         """Used to switch from test result to scoreboard"""
         self._scoreboard.refresh_table()
@@ -7,10 +7,10 @@ import ui_core as uic
 
 class ScoreboardFrame(tk.Frame):
     """Uses a table to display statistics about the best 5 test results"""
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    def __init__(self, root, data_service: data.DataService, *args, **kwargs):
+        super().__init__(root, *args, **kwargs)
 
-        self._data_service = data.DataService()
+        self._data_service = data_service
 
         self._scoreboard_header = uic.SubHeading(self, "Scoreboard")
         self._scoreboard_header.pack()
@@ -23,7 +23,7 @@ class ScoreboardFrame(tk.Frame):
         table_header = ["Keys", "Words", "Date"]
         table_data = []
 
-        for r in self._data_service.get_data()[:5]:
+        for r in self._data_service.get_top_entries(5):
             table_data.append([
                 f"({r.keys_correct} ✅ | {r.keys_wrong} ⛔) {r.keys} - {r.keys_accuracy} %",
                 f"({r.words_correct} ✅ | {r.words_wrong} ⛔) {r.words} - {r.words_accuracy} %",
@@ -5,8 +5,11 @@ This contains the following classes:
 - RunTestFrame
 - TestResultFrame
 
+The typing engine of RunTestFrame is imported when the frame is created, so the start page
+doesn't load it (see startup_benchmark.py).
 """
 
+import time
 import tkinter as tk
 from typing import Callable, Tuple
 
@@ -23,25 +26,35 @@ class StartTestFrame(tk.Frame):
 
 class RunTestFrame(tk.Frame):
     """This Component is used to execute a speed typing test."""
-    def __init__(self, root, finished_test: Callable[[], None], *args, **kwargs):
+    def __init__(
+            self, root,
+            finished_test: Callable[[], None],
+            word_source: Callable[[], str] = None,
+            duration_seconds: float = 60,
+            refresh_rate: float = 10,
+            *args,
+            instrumentation: "instrumentation.Instrumentation" = None,
+            **kwargs
+        ):
+        import timing
+        import typing_engine
+
         super().__init__(root, *args, **kwargs)
 
         default_pady = 5
         self._finished = finished_test
-        self._started = False
-        self._timer_start_value = 60
-        self._timer = self._timer_start_value
+        self._timer_start_value = duration_seconds
+        self._timer_text = None
         self._timer_job = None
-
-        self._count_keys = 0
-        self._count_words = 0
-        self._count_words_wrong = 0
-        self._count_keys_wrong = 0
+        self._idle_background = typing_engine.INPUT_IDLE
+        self._background = self._idle_background
 
         self.grid_columnconfigure(0, weight=1)
 
-        with open("words.txt", "r", encoding="utf-8") as file:
-            self.words = [x.strip() for x in file.readlines()]
+        self.words = []
+        if word_source is None:
+            with open("words.txt", "r", encoding="utf-8") as file:
+                self.words = [x.strip() for x in file.readlines()]
 
         self._header = uic.SubHeading(self, "Typing test")
         self._header.grid(row=0, column=0, pady=(default_pady, 0))
@@ -58,142 +71,203 @@ class RunTestFrame(tk.Frame):
         self._description.grid(row=1, column=0, pady=(0, default_pady))
 
         self._timer_label = uic.SubHeading(self, self._timer_start_value)
-        self._timer_label.grid(row=2, column=0, pady=2*default_pady)
+        self._timer_label.grid(row=2, column=0, pady=(2*default_pady, 0))
+
+        self._speed_label = uic.Label(self, "")
+        self._speed_label.grid(row=3, column=0, pady=(0, default_pady))
 
-        self._word_table = uic.WordTable(self, self.words)
-        self._word_table.grid(row=3, column=0, pady=default_pady)
+        self._word_table = uic.WordTable(self, self.words, word_source=word_source)
+        self._word_table.grid(row=4, column=0, pady=default_pady)
+
+        self._engine = typing_engine.TypingEngine(
+            self._word_table.get_model(),
+            timing.CountdownTimer(duration_seconds, refresh_rate)
+        )
 
         self._input_text = tk.StringVar(value="")
         self._input = tk.Entry(
             self,
             textvariable=self._input_text,
             justify="center",
-            background="blue",
+            background=self._background,
             foreground="white"
         )
+        if instrumentation is not None:
+            # before the binding, which would keep the original method
+            for method_name in ["pressed", "countdown"]:
+                instrumentation.instrument(self, method_name)
+            instrumentation.instrument(self._word_table, "apply_changes")
+            instrumentation.watch_keys(self._input)
         self._input.bind("<KeyRelease>", self.pressed)
-        self._input.grid(row=4, column=0, sticky=tk.W+tk.E, pady=default_pady)
+        self._input.grid(row=5, column=0, sticky=tk.W+tk.E, pady=default_pady)
 
     def pressed(self, event: tk.Event):
         """This event triggers when a key is pressed. 
         If the test isn't started, a new run begins. 
-        It checks the input for errors and moves to the next word if needed."""
+        The typing engine checks the input for errors and moves to the next word if needed.
+        Only keys which produce a character (e.g. not Shift or BackSpace) are counted."""
+        timestamp_ns = time.monotonic_ns()
         if self._input.cget("state") != "normal":
             return
 
-        if not self._started:
-            self._started = True
-            self.countdown()
-
-        input_text = self._input_text.get().strip()
-        current_word = self._word_table.get_current()
-
-        self._count_keys = self._count_keys + 1
+        result = self._engine.process(
+            event.keysym, event.char, timestamp_ns, self._input_text.get()
+        )
+        if result is None:
+            return
 
-        if event.char == " ":
-            if input_text == current_word:
-                self._word_table.mark_current_word(True)
-            else:
-                self._word_table.mark_current_word(False)
-                self._count_words_wrong = self._count_words_wrong + 1
-            self._count_words = self._count_words + 1
-            self._input.config(background="blue")
+        if result.started:
+            self.countdown()
+        if result.changes:
+            self._word_table.apply_changes(result.changes)
+        if result.clear_input:
             self._input_text.set("")
-        elif current_word.startswith(input_text):
-            self._input.config(background="green")
-        else:
-            self._input.config(background="red")
-
-            if len(event.keysym) == 1:
-                self._count_keys_wrong = self._count_keys_wrong + 1
+        if result.background != self._background:
+            self._input.config(background=result.background)
+            self._background = result.background
 
     def countdown(self):
-        """Updates the countdown and switches to test summary if the time is exceeded."""
-        self._timer = self._timer - 1
-        self._timer_label.config(text=str(self._timer))
+        """Updates the countdown and switches to test summary if the time is exceeded.
+        The remaining time is computed from the start, so late callbacks don't add up."""
+        now_ns = time.monotonic_ns()
+        timer = self._engine.timer
+        metrics = self._engine.metrics
+        timer_text = str(timer.get_remaining_seconds(now_ns))
+        if timer_text != self._timer_text:
+            self._timer_label.config(text=timer_text)
+            self._timer_text = timer_text
+        self._speed_label.config(
+            text=f"{metrics.get_wpm(now_ns):.0f} WPM | {metrics.get_cpm(now_ns):.0f} CPM"
+        )
 
-        if self._timer > 0:
-            self._timer_job = self.after(1000, self.countdown)
+        if not timer.is_expired(now_ns):
+            self._timer_job = self.after(timer.get_next_delay_ms(now_ns), self.countdown)
         else:
+            self._timer_job = None
+            timer.stop(now_ns)
             self._input.config(state="disabled")
             self._input_text.set("")
             self._finished()
 
     def get_result(self) -> Tuple[int, int, int, int]:
         """Returns the result of the last test run."""
-        return (
-            self._count_words,
-            self._count_words_wrong,
-            self._count_keys,
-            self._count_keys_wrong
-        )
+        return self._engine.get_result()
+
+    def get_errors(self) -> dict[str, int]:
+        """Returns the classified errors (e.g. omissions, corrected typos) of the last test run."""
+        return self._engine.get_errors()
+
+    def get_timer(self) -> "timing.CountdownTimer":
+        """Returns the timer with the precise start, end and duration of the last test run."""
+        return self._engine.timer
+
+    def get_metrics(self) -> "keystrokes.MetricsEngine":
+        """Returns the keystroke metrics (e.g. burst speed, latency histogram) of the last test run."""
+        return self._engine.metrics
 
     def reset(self):
         """Resets the component to be ready for the next speed typing test."""
-        self._count_keys = 0
-        self._count_words = 0
-        self._count_words_wrong = 0
-        self._count_keys_wrong = 0
-
-        self._timer = self._timer_start_value
-        self._timer_label.config(text=str(self._timer))
-        self._started = False
+        if self._timer_job is not None:
+            self.after_cancel(self._timer_job)
+            self._timer_job = None
+        self._word_table.apply_changes(self._engine.reset())
+
+        self._timer_text = str(self._engine.timer.get_remaining_seconds())
+        self._timer_label.config(text=self._timer_text)
+        self._speed_label.config(text="")
         self._input_text.set("")
         self._input.config(state="normal")
-        self._input.config(background="blue")
-        self._word_table.reset_table()
+        self._background = self._idle_background
+        self._input.config(background=self._background)
 
 class TestResultFrame(tk.Frame):
     """Displays the test result in a table"""
-    def __init__(self, root, close_results_callback: Callable[[], None], *args, **kwargs):
+    def __init__(
+            self, root,
+            data_service: data.DataService,
+            close_results_callback: Callable[[], None],
+            *args, **kwargs
+        ):
         super().__init__(root, *args, **kwargs)
 
-        self._data_service = data.DataService()
+        self._data_service = data_service
         self._summary = None
+        self._ngram_statistics = None
 
         self._close_results = close_results_callback
 
-    def load(self, summary: data.TestSummaryModel):
-        """Loads the submitted test results into a table.
-
-        Args:
-            summary (data.TestSummaryModel): test result
-        """
-        for child in self.winfo_children():
-            child.destroy()
-
-        if summary is None:
-            return
-
-        self._summary = summary
         uic.SubHeading(self, "Typing test summary").grid(row=0, column=0, columnspan=3)
 
         uic.BoldLabel(self, "Keys").grid(row=1, column=1, pady=(10,0))
         uic.BoldLabel(self, "Words").grid(row=1, column=2, pady=(10,0))
 
-        uic.BoldLabel(self, "Total").grid(row=2, column=0)
-        uic.Label(self, str(summary.keys)).grid(row=2, column=1)
-        uic.Label(self, str(summary.words)).grid(row=2, column=2)
-
-        uic.BoldLabel(self, "Correct").grid(row=3, column=0)
-        uic.Label(self, str(summary.keys_correct)).grid(row=3, column=1)
-        uic.Label(self, str(summary.words_correct)).grid(row=3, column=2)
-
-        uic.BoldLabel(self, "Mistakes").grid(row=4, column=0)
-        uic.Label(self, str(summary.keys_wrong)).grid(row=4, column=1)
-        uic.Label(self, str(summary.words_wrong)).grid(row=4, column=2)
+        # the grid is built once, load only updates the values
+        self._values = {}
+        for i, name in enumerate(["Total", "Correct", "Mistakes", "Accuracy"]):
+            uic.BoldLabel(self, name).grid(row=i+2, column=0)
+            for column in [1, 2]:
+                value_label = uic.Label(self, "")
+                value_label.grid(row=i+2, column=column)
+                self._values[(name, column)] = value_label
 
-        uic.BoldLabel(self, "Accuracy").grid(row=5, column=0)
-        uic.Label(self, f"{str(summary.keys_accuracy)} %").grid(row=5, column=1)
-        uic.Label(self, f"{str(summary.words_accuracy)} %").grid(row=5, column=2)
+        self._errors = uic.Label(self, "")
+        self._errors.grid(row=6, column=0, columnspan=3, pady=(10, 0))
 
         uic.Button(self, "Forget results", self._close_results).grid(
-            row=6, column=0,
+            row=7, column=0,
             sticky=tk.W, pady=10
         )
-        uic.Button(self, "Save run", self.save_run).grid(row=6, column=2, sticky=tk.E, pady=10)
+        uic.Button(self, "Save run", self.save_run).grid(row=7, column=2, sticky=tk.E, pady=10)
+
+    def load(
+            self, summary: data.TestSummaryModel, errors: dict[str, int] = None,
+            ngram_statistics: dict[str, list] = None
+        ):
+        """Loads the submitted test results into a table.
+
+        Args:
+            summary (data.TestSummaryModel): test result
+            errors (dict[str, int], optional): classified errors, see RunTestFrame.get_errors.
+            Defaults to None.
+            ngram_statistics (dict[str, list], optional): key and bigram statistics of the run,
+            which are only saved with the run (see word_selection.collect_ngram_statistics).
+            Defaults to None.
+        """
+        if summary is None:
+            return
+
+        self._summary = summary
+        self._ngram_statistics = ngram_statistics
+        values = {
+            ("Total", 1): str(summary.keys),
+            ("Total", 2): str(summary.words),
+            ("Correct", 1): str(summary.keys_correct),
+            ("Correct", 2): str(summary.words_correct),
+            ("Mistakes", 1): str(summary.keys_wrong),
+            ("Mistakes", 2): str(summary.words_wrong),
+            ("Accuracy", 1): f"{str(summary.keys_accuracy)} %",
+            ("Accuracy", 2): f"{str(summary.words_accuracy)} %"
+        }
+        for key, text in values.items():
+            self._values[key].configure(text=text)
+        self._errors.configure(
+            text=" | ".join(f"{name}: {amount}" for name, amount in (errors or {}).items())
+        )
 
     def save_run(self):
-        """Saves the test results using the data service"""
-        self._data_service.save_entry(self._summary)
+        """Saves the test results using the data service.
+        Forgotten runs don't change the practice words, only saved ones.
+        If an earlier run couldn't be written, the error is shown and the result stays open,
+        so the run can be saved again."""
+        import sqlite3
+
+        try:
+            self._data_service.save_entry(self._summary)
+        except sqlite3.Error as error:
+            from tkinter import messagebox
+
+            messagebox.showerror("Saving failed", f"An earlier run couldn't be saved: {error}")
+            return
+        if self._ngram_statistics:
+            self._data_service.save_ngram_statistics(self._ngram_statistics)
         self._close_results()
@@ -0,0 +1,145 @@
+"""Contains the view model of the word table (see ui_core.WordTable).
+
+The model keeps the words and colors of all cells in Python and returns only the cells
+which changed, so the widget never reads its state back from Tk and reconfigures
+each changed label once.
+
+This contains the following classes:
+- WordGridModel
+
+And the following global Constants:
+- COLOR_PENDING
+- COLOR_CURRENT
+- COLOR_CORRECT
+- COLOR_WRONG
+
+"""
+
+import random
+from collections import deque
+from typing import Callable
+
+COLOR_PENDING = "gray"
+COLOR_CURRENT = "blue"
+COLOR_CORRECT = "green"
+COLOR_WRONG = "red"
+
+
+class WordGridModel:
+    """Grid of words which scrolls line by line while the words are typed.
+    The current word moves through the first lines; afterwards the finished line scrolls up
+    (the last finished line stays visible above the current line).
+    """
+    def __init__(
+            self,
+            words: list[str], amount_of_rows: int = 3, amount_of_columns: int = 6,
+            word_source: Callable[[], str] = None
+        ):
+        """Creates the model
+
+        Args:
+            words (list[str]): words, which are shuffled and repeated
+            amount_of_rows (int, optional): Defaults to 3.
+            amount_of_columns (int, optional): Defaults to 6.
+            word_source (Callable[[], str], optional): picks the next word instead of
+            the shuffled words, e.g. word_selection.AdaptiveWordSelector.next_word. Defaults to None.
+        """
+        self.rows = amount_of_rows
+        self.columns = amount_of_columns
+        self._words = list(words)
+        self._stream = deque(self._words)
+        self._word_source = word_source
+        # line of the current word after which the grid scrolls
+        self._last_current_row = min(1, amount_of_rows - 1)
+        self._cells = [[("", COLOR_PENDING)] * amount_of_columns for _ in range(amount_of_rows)]
+        self._current = (0, 0)
+
+    def _next_word(self) -> str:
+        if self._word_source is not None:
+            return self._word_source()
+        word = self._stream.popleft()
+        self._stream.append(word)
+        return word
+
+    def _set_cells(self, cells: list[list[tuple[str, str]]]) -> list[tuple[int, int, str, str]]:
+        changes = []
+        for r, (old_row, new_row) in enumerate(zip(self._cells, cells)):
+            for c, (old, new) in enumerate(zip(old_row, new_row)):
+                if old != new:
+                    changes.append((r, c, new[0], new[1]))
+        self._cells = cells
+        return changes
+
+    def get_cell(self, row: int, column: int) -> tuple[str, str]:
+        """Returns the state of a cell
+
+        Args:
+            row (int): row of the cell
+            column (int): column of the cell
+
+        Returns:
+            tuple[str, str]: word and color
+        """
+        return self._cells[row][column]
+
+    def get_current(self) -> str:
+        """Gets the current word
+
+        Returns:
+            str: current word
+        """
+        r, c = self._current
+        return self._cells[r][c][0]
+
+    def reset(self, shuffle: bool = True) -> list[tuple[int, int, str, str]]:
+        """Fills the grid with new words for the next speed test run
+
+        Args:
+            shuffle (bool, optional): shuffles the words before (if there is no word source).
+            Defaults to True.
+
+        Returns:
+            list[tuple[int, int, str, str]]: changed cells (row, column, word, color)
+        """
+        if shuffle:
+            random.shuffle(self._words)
+        self._stream = deque(self._words)
+
+        cells = [
+            [(self._next_word(), COLOR_PENDING) for _ in range(self.columns)]
+            for _ in range(self.rows)
+        ]
+        cells[0][0] = (cells[0][0][0], COLOR_CURRENT)
+        self._current = (0, 0)
+        return self._set_cells(cells)
+
+    def mark_current_word(self, is_correct: bool) -> list[tuple[int, int, str, str]]:
+        """Marks the current word as correct or wrong and moves to the next word
+
+        Args:
+            is_correct (bool): indicator if the spelling was correct
+
+        Returns:
+            list[tuple[int, int, str, str]]: changed cells (row, column, word, color)
+        """
+        r, c = self._current
+        word = self._cells[r][c][0]
+        finished = (word, COLOR_CORRECT if is_correct else COLOR_WRONG)
+
+        if (c + 1) < self.columns or r < self._last_current_row:
+            # only the finished and the next cell change
+            self._cells[r][c] = finished
+            changes = [(r, c, finished[0], finished[1])]
+            r, c = (r, c + 1) if (c + 1) < self.columns else (r + 1, 0)
+            self._cells[r][c] = (self._cells[r][c][0], COLOR_CURRENT)
+            changes.append((r, c, self._cells[r][c][0], COLOR_CURRENT))
+            self._current = (r, c)
+            return changes
+
+        # the first line scrolls out and a new line is appended
+        self._cells[r][c] = finished
+        cells = [list(row) for row in self._cells[1:]]
+        cells.append([(self._next_word(), COLOR_PENDING) for _ in range(self.columns)])
+        cells[r][0] = (cells[r][0][0], COLOR_CURRENT)
+        self._current = (r, 0)
+        return self._set_cells(cells)
@@ -0,0 +1,326 @@
+"""Contains a precompiled, memory-mapped index for large dictionaries.
+
+A dictionary is a text file with one word per line, optionally followed by its frequency
+(separated by a tab or a space). Lists without frequencies are expected to be ordered by
+frequency, so the line number is used as rank. The words are divided into frequency bands
+(band 0 = most frequent words).
+
+The index file (dictionary + ".widx") contains the offset and length of every word in the
+dictionary, sorted by band and length, plus a table with the first entry of every
+(band, length) cell. Both files are memory-mapped, so opening a dictionary doesn't read it
+and the memory usage doesn't depend on its size. Sampling with a filter picks a matching cell
+(weighted by its amount of words) and then a word within the cell, both in O(1).
+
+Usage:
+py word_index.py build dictionary.txt [--bands 10]
+py word_index.py sample dictionary.txt [--count 20] [--min-length 3] [--max-length 8] [--bands 0-2]
+
+This contains the following classes:
+- WordIndex
+
+And the following global methods:
+- build_index
+- parse_bands
+
+"""
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import time
+from array import array
+
+from word_selection import AliasTable
+
+MAGIC = b"TWIX"
+VERSION = 1
+# magic, version, bands, max length, source size, source mtime, amount of words
+# (padded to 8 bytes, so the arrays behind it are aligned)
+HEADER = struct.Struct("<4sBBH4xQqQ4x")
+# in characters; the length filters use characters as well
+MAX_WORD_LENGTH = 255
+# the amount of bands is stored in one byte and every word gets a one byte band
+MAX_BANDS = 255
+
+
+def _get_index_path(source_path: str) -> str:
+    return source_path + ".widx"
+
+
+def _parse_line(line: bytes) -> tuple[bytes, float]:
+    parts = line.split()
+    if not parts:
+        return b"", None
+    frequency = None
+    if len(parts) > 1:
+        try:
+            frequency = float(parts[1])
+        except ValueError:
+            pass
+    return parts[0], frequency
+
+
+def build_index(source_path: str, index_path: str = None, bands: int = 10) -> str:
+    """Compiles the index of a dictionary. Lines with words longer than MAX_WORD_LENGTH
+    characters are skipped.
+
+    Args:
+        source_path (str): the dictionary
+        index_path (str, optional): Defaults to the dictionary path + ".widx".
+        bands (int, optional): amount of frequency bands. Defaults to 10.
+
+    Raises:
+        ValueError: if the amount of bands isn't between 1 and MAX_BANDS
+
+    Returns:
+        str: path of the index
+    """
+    if not 1 <= bands <= MAX_BANDS:
+        raise ValueError(f"The amount of bands must be between 1 and {MAX_BANDS}")
+    index_path = index_path or _get_index_path(source_path)
+    offsets = array("Q")
+    lengths = array("H")
+    character_lengths = array("B")
+    frequencies = array("d")
+    has_frequencies = False
+
+    with open(source_path, "rb") as file:
+        position = 0
+        for line in file:
+            word, frequency = _parse_line(line)
+            character_length = len(word.decode("utf-8", "replace"))
+            if 0 < character_length <= MAX_WORD_LENGTH:
+                offsets.append(position + line.index(word))
+                lengths.append(len(word))
+                character_lengths.append(character_length)
+                has_frequencies = has_frequencies or frequency is not None
+                frequencies.append(frequency if frequency is not None else 0.0)
+            position += len(line)
+
+    amount = len(offsets)
+    if has_frequencies:
+        ranks = array("Q", [0]) * amount
+        for rank, i in enumerate(sorted(range(amount), key=lambda x: -frequencies[x])):
+            ranks[i] = rank
+    else:
+        ranks = range(amount)
+    word_bands = bytes(min(bands - 1, rank * bands // max(amount, 1)) for rank in ranks)
+
+    # counting sort by (band, length in characters)
+    max_length = max(character_lengths, default=0)
+    columns = max_length + 1
+    cells = array("Q", [0]) * (bands * columns + 1)
+    for i in range(amount):
+        cells[word_bands[i] * columns + character_lengths[i] + 1] += 1
+    for i in range(1, len(cells)):
+        cells[i] += cells[i - 1]
+
+    next_positions = array("Q", cells[:-1])
+    sorted_offsets = array("Q", [0]) * amount
+    sorted_lengths = array("H", [0]) * amount
+    for i in range(amount):
+        cell = word_bands[i] * columns + character_lengths[i]
+        target = next_positions[cell]
+        next_positions[cell] += 1
+        sorted_offsets[target] = offsets[i]
+        sorted_lengths[target] = lengths[i]
+
+    status = os.stat(source_path)
+    with open(index_path, "wb") as file:
+        file.write(HEADER.pack(
+            MAGIC, VERSION, bands, max_length, status.st_size, status.st_mtime_ns, amount
+        ))
+        file.write(cells.tobytes())
+        file.write(sorted_offsets.tobytes())
+        file.write(sorted_lengths.tobytes())
+
+    return index_path
+
+
+def parse_bands(text: str) -> range:
+    """Parses a band filter, e.g. "2" or "0-3"
+
+    Args:
+        text (str): a band or an inclusive range of bands
+
+    Returns:
+        range: the bands
+    """
+    first, _, last = text.partition("-")
+    return range(int(first), int(last or first) + 1)
+
+
+class WordIndex:
+    """Random access to the words of a dictionary through its memory-mapped index."""
+    def __init__(self, source_path: str, index_path: str = None, seed: int = None):
+        """Opens the index, which must match the dictionary (see open).
+
+        Args:
+            source_path (str): the dictionary
+            index_path (str, optional): Defaults to the dictionary path + ".widx".
+            seed (int, optional): seed of the random generator. Defaults to None.
+
+        Raises:
+            ValueError: if the index doesn't belong to the dictionary
+        """
+        self._generator = random.Random(seed)
+        status = os.stat(source_path)
+        with open(index_path or _get_index_path(source_path), "rb") as file:
+            self._index = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.bands, self.max_length, size, mtime, self._amount = \
+            HEADER.unpack_from(self._index, 0)
+        if (magic, version, size, mtime) != (MAGIC, VERSION, status.st_size, status.st_mtime_ns):
+            self._index.close()
+            raise ValueError("The index doesn't belong to the dictionary")
+
+        self._source = b""
+        if status.st_size:
+            with open(source_path, "rb") as file:
+                self._source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        columns = self.max_length + 1
+        cells_end = HEADER.size + (self.bands * columns + 1) * 8
+        offsets_end = cells_end + self._amount * 8
+        self._view = memoryview(self._index)
+        self._cells = self._view[HEADER.size:cells_end].cast("Q")
+        self._offsets = self._view[cells_end:offsets_end].cast("Q")
+        self._lengths = self._view[offsets_end:offsets_end + self._amount * 2].cast("H")
+        self._filters = {}
+
+    @classmethod
+    def open(cls, source_path: str, bands: int = 10, seed: int = None):
+        """Opens the index of a dictionary and (re)builds it if it's missing or outdated.
+
+        Args:
+            source_path (str): the dictionary
+            bands (int, optional): amount of frequency bands for a new index. Defaults to 10.
+            seed (int, optional): seed of the random generator. Defaults to None.
+
+        Returns:
+            WordIndex: the opened index
+        """
+        try:
+            return cls(source_path, seed=seed)
+        except (OSError, ValueError, struct.error):
+            build_index(source_path, bands=bands)
+            return cls(source_path, seed=seed)
+
+    def __len__(self) -> int:
+        return self._amount
+
+    def get_word(self, i: int) -> str:
+        """Returns a word by its position in the index (ordered by band and length)
+
+        Args:
+            i (int): position of the word
+
+        Returns:
+            str: the word
+        """
+        offset = self._offsets[i]
+        return self._source[offset:offset + self._lengths[i]].decode("utf-8", "replace")
+
+    def _get_cells(self, min_length: int, max_length: int, bands: range) -> list[tuple[int, int]]:
+        columns = self.max_length + 1
+        max_length = self.max_length if max_length is None else min(max_length, self.max_length)
+        result = []
+        for band in bands if bands is not None else range(self.bands):
+            if not 0 <= band < self.bands:
+                continue
+            for length in range(max(min_length, 1), max_length + 1):
+                start = self._cells[band * columns + length]
+                end = self._cells[band * columns + length + 1]
+                if end > start:
+                    result.append((start, end - start))
+        return result
+
+    def count(self, min_length: int = 1, max_length: int = None, bands: range = None) -> int:
+        """Counts the words which match the filter
+
+        Args:
+            min_length (int, optional): minimal length. Defaults to 1.
+            max_length (int, optional): maximal length. Defaults to None.
+            bands (range, optional): frequency bands. Defaults to None (all bands).
+
+        Returns:
+            int: amount of words
+        """
+        return sum(x[1] for x in self._get_cells(min_length, max_length, bands))
+
+    def sample(self, min_length: int = 1, max_length: int = None, bands: range = None) -> str:
+        """Picks a random word which matches the filter in O(1)
+
+        Args:
+            min_length (int, optional): minimal length. Defaults to 1.
+            max_length (int, optional): maximal length. Defaults to None.
+            bands (range, optional): frequency bands. Defaults to None (all bands).
+
+        Raises:
+            ValueError: if no word matches the filter
+
+        Returns:
+            str: the word
+        """
+        key = (min_length, max_length, bands)
+        selection = self._filters.get(key)
+        if selection is None:
+            cells = self._get_cells(min_length, max_length, bands)
+            if not cells:
+                raise ValueError("No word matches the filter")
+            selection = (cells, AliasTable([x[1] for x in cells], self._generator))
+            self._filters[key] = selection
+
+        cells, table = selection
+        start, amount = cells[table.sample()]
+        return self.get_word(start + self._generator.randrange(amount))
+
+    def close(self):
+        """Releases the memory maps."""
+        self._cells.release()
+        self._offsets.release()
+        self._lengths.release()
+        self._view.release()
+        self._index.close()
+        if isinstance(self._source, mmap.mmap):
+            self._source.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds or samples a dictionary index")
+    parser.add_argument("command", choices=["build", "sample"])
+    parser.add_argument("dictionary", help="text file with one word (and frequency) per line")
+    parser.add_argument("--bands", default=None,
+                        help="build: amount of bands; sample: band filter, e.g. 0-2")
+    parser.add_argument("--count", type=int, default=20, help="amount of sampled words")
+    parser.add_argument("--min-length", type=int, default=1)
+    parser.add_argument("--max-length", type=int, default=None)
+    arguments = parser.parse_args()
+
+    start_time = time.perf_counter()
+    if arguments.command == "build":
+        try:
+            path = build_index(arguments.dictionary, bands=int(arguments.bands or 10))
+        except ValueError as error:
+            parser.error(str(error))
+        print(f"Built {path} in {time.perf_counter() - start_time:.2f} seconds")
+    else:
+        word_index = WordIndex.open(arguments.dictionary)
+        band_filter = parse_bands(arguments.bands) if arguments.bands else None
+        print(f"Opened {len(word_index)} words in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+        print(
+            f"{word_index.count(arguments.min_length, arguments.max_length, band_filter)} "
+            "words match the filter"
+        )
+
+        start_time = time.perf_counter()
+        sampled = [
+            word_index.sample(arguments.min_length, arguments.max_length, band_filter)
+            for _ in range(arguments.count)
+        ]
+        duration = time.perf_counter() - start_time
+        print(" ".join(sampled))
+        print(f"{duration * 1e6 / max(arguments.count, 1):.1f} µs per word")
+        word_index.close()
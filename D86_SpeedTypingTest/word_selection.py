@@ -0,0 +1,320 @@
+"""Contains the adaptive word selection, which prefers words with weak keys and bigrams.
+
+The statistics of every typed key and bigram (errors and latency) are collected from the
+keystroke log of a run (see keystrokes.py) and stored with the results (see data.py).
+An inverted index maps every key and bigram to the words which contain it. It's cached in the
+data directory (see data.get_data_directory) and only rebuilt if the word list changes.
+The data directory may be shared, so the cache holds no code: a JSON header line (version,
+sha256 of the word list, n-grams and the length of their id arrays) is followed by the raw ids.
+A cache which doesn't match the header or the word list is rebuilt.
+
+The probability of a word is proportional to 1 + the weakness of all its keys and bigrams.
+This is sampled as a mixture: an alias table picks either "any word" or one weak n-gram
+(weighted by weakness times the amount of words with it), then a word is picked uniformly
+from the chosen group. So picking a word is O(1) and updating the weights only depends
+on the amount of weak n-grams, not on the size of the word list.
+
+This contains the following classes:
+- AliasTable
+- AdaptiveWordSelector
+
+And the following global methods:
+- collect_ngram_statistics
+- build_ngram_index
+- read_ngram_index
+- write_ngram_index
+
+"""
+
+import hashlib
+import json
+import os.path
+import random
+import sys
+from array import array
+
+import data
+import keystrokes
+
+INDEX_VERSION = 2
+
+
+class AliasTable:
+    """Samples an index with given weights in O(1) (Vose's alias method)."""
+    def __init__(self, weights: list[float], generator: random.Random = None):
+        self._generator = generator or random.Random()
+        amount = len(weights)
+        total = sum(weights)
+        scaled = [x * amount / total for x in weights]
+
+        self._probabilities = [1.0] * amount
+        self._aliases = list(range(amount))
+        small = [i for i, x in enumerate(scaled) if x < 1]
+        large = [i for i, x in enumerate(scaled) if x >= 1]
+
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self._probabilities[less] = scaled[less]
+            self._aliases[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1
+            if scaled[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+
+    def sample(self) -> int:
+        """Picks a random index
+
+        Returns:
+            int: index of a weight
+        """
+        i = self._generator.randrange(len(self._probabilities))
+        if self._generator.random() < self._probabilities[i]:
+            return i
+        return self._aliases[i]
+
+
+def collect_ngram_statistics(log: keystrokes.KeystrokeLog) -> dict[str, list]:
+    """Collects the statistics of every typed key and bigram of a run.
+    The latency of a key is the time since the previous key of the same word.
+
+    Args:
+        log (keystrokes.KeystrokeLog): keystrokes of the run
+
+    Returns:
+        dict[str, list]: count, errors, amount of latencies and their sum (ms) per key/bigram
+    """
+    statistics = {}
+    previous = None
+    previous_ns = None
+
+    for timestamp_ns, keysym, correctness in log:
+        if correctness == keystrokes.NOT_A_CHARACTER or len(keysym) != 1:
+            # e.g. space, BackSpace or punctuation: the word (or the sequence) is interrupted
+            previous = None
+            continue
+
+        ngrams = [keysym] if previous is None else [keysym, previous + keysym]
+        for ngram in ngrams:
+            entry = statistics.setdefault(ngram, [0, 0, 0, 0.0])
+            entry[0] += 1
+            if correctness == keystrokes.WRONG:
+                entry[1] += 1
+            if previous is not None:
+                entry[2] += 1
+                entry[3] += (timestamp_ns - previous_ns) / 1e6
+
+        previous = keysym
+        previous_ns = timestamp_ns
+
+    return statistics
+
+
+def build_ngram_index(words: list[str]) -> dict[str, array]:
+    """Maps every key and bigram to the words which contain it
+
+    Args:
+        words (list[str]): the word list
+
+    Returns:
+        dict[str, array]: ids of the words per key/bigram (once per occurrence)
+    """
+    index = {}
+    for word_id, word in enumerate(words):
+        for i, key in enumerate(word):
+            index.setdefault(key, array("I")).append(word_id)
+            if i > 0:
+                index.setdefault(word[i - 1:i + 1], array("I")).append(word_id)
+    return index
+
+
+def write_ngram_index(path: str, index: dict[str, array], digest: str):
+    """Writes the index as JSON header line followed by the word ids
+
+    Args:
+        path (str): the cache file
+        index (dict[str, array]): ids of the words per key/bigram
+        digest (str): sha256 of the word list
+    """
+    header = {
+        "version": INDEX_VERSION,
+        "hash": digest,
+        "byteorder": sys.byteorder,
+        "itemsize": array("I").itemsize,
+        "ngrams": [[ngram, len(ids)] for ngram, ids in index.items()]
+    }
+    with open(path, "wb") as file:
+        file.write(json.dumps(header).encode("utf-8") + b"\n")
+        for ids in index.values():
+            file.write(ids.tobytes())
+
+
+def read_ngram_index(path: str, digest: str, amount_of_words: int) -> dict[str, array]:
+    """Reads an index written by write_ngram_index, if it belongs to the word list
+
+    Args:
+        path (str): the cache file
+        digest (str): sha256 of the word list
+        amount_of_words (int): every word id must be smaller
+
+    Returns:
+        dict[str, array]: the index or None if the cache is missing, outdated or invalid
+    """
+    try:
+        with open(path, "rb") as file:
+            header = json.loads(file.readline())
+            content = file.read()
+    except (OSError, ValueError):
+        return None
+
+    if not (
+        isinstance(header, dict)
+        and header.get("version") == INDEX_VERSION
+        and header.get("hash") == digest
+        and header.get("byteorder") == sys.byteorder
+        and header.get("itemsize") == array("I").itemsize
+        and isinstance(header.get("ngrams"), list)
+    ):
+        return None
+
+    ids = array("I")
+    if len(content) % ids.itemsize:
+        return None
+    ids.frombytes(content)
+    if ids and max(ids) >= amount_of_words:
+        return None
+
+    index = {}
+    offset = 0
+    for entry in header["ngrams"]:
+        if not (
+            isinstance(entry, list) and len(entry) == 2
+            and isinstance(entry[0], str) and type(entry[1]) is int and entry[1] >= 0
+        ):
+            return None
+        ngram, length = entry
+        index[ngram] = ids[offset:offset + length]
+        offset += length
+    if offset != len(ids):
+        return None
+    return index
+
+
+class AdaptiveWordSelector:
+    """Picks practice words, which contain the weak keys and bigrams of the past runs."""
+    def __init__(self, words: list[str], index: dict[str, array], seed: int = None):
+        self._words = words
+        self._index = index
+        self._generator = random.Random(seed)
+        self._groups = []
+        self._table = None
+        self._weak_ngrams = []
+
+    @classmethod
+    def load(cls, words_file: str = "words.txt", cache_file: str = None, seed: int = None):
+        """Loads the word list and its n-gram index. The index is read from the cache file
+        if it belongs to the same word list, otherwise it's built and cached.
+
+        Args:
+            words_file (str, optional): one word per line. Defaults to "words.txt".
+            cache_file (str, optional): Defaults to the name of the word file with the extension
+            ".ngrams" in the data directory. The index is only kept in memory if the cache
+            can't be written.
+            seed (int, optional): seed of the random generator. Defaults to None.
+
+        Returns:
+            AdaptiveWordSelector: the selector
+        """
+        with open(words_file, "rb") as file:
+            content = file.read()
+        words = [x.strip() for x in content.decode("utf-8").splitlines() if x.strip()]
+        digest = hashlib.sha256(content).hexdigest()
+
+        if cache_file is None:
+            name = os.path.splitext(os.path.basename(words_file))[0] + ".ngrams"
+            cache_file = os.path.join(data.get_data_directory(), name)
+
+        # an unreadable, truncated or foreign cache is rebuilt
+        index = read_ngram_index(cache_file, digest, len(words))
+        if index is None:
+            index = build_ngram_index(words)
+            try:
+                write_ngram_index(cache_file, index, digest)
+            except OSError:
+                # e.g. a read-only directory; the index is only used in memory
+                pass
+
+        return cls(words, index, seed)
+
+    def update_weights(
+            self,
+            statistics: dict[str, list],
+            strength: float = 1.0,
+            max_ngrams: int = 30,
+            min_count: int = 5
+        ):
+        """Derives the weakness of the keys and bigrams from their statistics.
+        An n-gram is weak if its error rate or latency is above the average of all n-grams
+        (of the same length), e.g. twice the average error rate adds a weakness of 1.
+
+        Args:
+            statistics (dict[str, list]): count, errors, amount of latencies and their sum (ms)
+            per key/bigram, see collect_ngram_statistics
+            strength (float, optional): factor of all weaknesses. Defaults to 1.0.
+            max_ngrams (int, optional): amount of weakest n-grams which are used. Defaults to 30.
+            min_count (int, optional): n-grams with less occurrences are ignored. Defaults to 5.
+        """
+        averages = {}
+        for length in [1, 2]:
+            entries = [x for k, x in statistics.items() if len(k) == length]
+            count = sum(x[0] for x in entries)
+            latencies = sum(x[2] for x in entries)
+            averages[length] = (
+                sum(x[1] for x in entries) / count if count else 0,
+                sum(x[3] for x in entries) / latencies if latencies else 0
+            )
+
+        weaknesses = []
+        for ngram, (count, errors, latency_count, latency_sum) in statistics.items():
+            if count < min_count or ngram not in self._index:
+                continue
+            error_rate, latency = averages[len(ngram)]
+            weakness = 0.0
+            if error_rate > 0:
+                weakness += max(0.0, errors / count / error_rate - 1)
+            if latency > 0 and latency_count:
+                weakness += max(0.0, latency_sum / latency_count / latency - 1)
+            if weakness > 0:
+                weaknesses.append((weakness * strength, ngram))
+
+        weaknesses.sort(reverse=True)
+        self._weak_ngrams = [(ngram, weakness) for weakness, ngram in weaknesses[:max_ngrams]]
+
+        # group 0 are all words with weight 1, the other groups add the weakness of an n-gram
+        self._groups = [None] + [self._index[ngram] for ngram, _ in self._weak_ngrams]
+        weights = [len(self._words)] + [
+            weakness * len(self._index[ngram]) for ngram, weakness in self._weak_ngrams
+        ]
+        self._table = AliasTable(weights, self._generator)
+
+    def get_weak_ngrams(self) -> list[tuple[str, float]]:
+        """Returns the n-grams which are practiced
+
+        Returns:
+            list[tuple[str, float]]: key/bigram and its weakness, weakest first
+        """
+        return self._weak_ngrams
+
+    def next_word(self) -> str:
+        """Picks the next practice word in O(1)
+
+        Returns:
+            str: the word
+        """
+        group = self._table.sample() if self._table is not None else 0
+        if group == 0:
+            return self._words[self._generator.randrange(len(self._words))]
+
+        word_ids = self._groups[group]
+        return self._words[word_ids[self._generator.randrange(len(word_ids))]]